@@ -0,0 +1,270 @@
+#!/usr/bin/python
+
+# measures how fast the crawler crawls a whole website, end to end
+# it generates a website, serves it from a local HTTP server, runs jick.py against it (as a separate process, so that its CPU time and memory
+# are measured on their own), and reports pages/sec, discoveries/sec, response times, CPU time and peak memory,
+# both on screen and as a JSON report, which records the commit it was run on, so runs on different versions can be compared
+# run from the repository root, e.g:
+# python benchmarks/bench_crawl.py --pages 2000 --fan-out 5 --latency 20 --report bench.json -- --concurrency 8
+# everything after "--" is passed on to jick.py, on top of --href --get --post --robots --site-map
+# the website:
+# --pages: how many pages it has (default 500)
+# --fan-out: how many other pages each page links to (default 5)
+# --form-variety: how many different GET and POST forms there are, spread over the pages (default 20)
+# --latency: how many milliseconds the server takes to answer each request (default 0)
+# --port: the port to serve it on (default 0, i.e any free port), which has to stay the same between runs for --cache-dir to find the pages it cached
+
+import os
+import sys
+import json
+import hashlib
+import time
+import platform
+import tempfile
+import threading
+import subprocess
+import http.server
+import socketserver
+
+repository = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# every <input> type that crawler_generator.compileIntelligentInput knows how to fill in
+input_types = ["text", "search", "password", "tel", "url", "hidden", "email", "date", "datetime-local", "time", "month", "week", "number", "range", "color"]
+
+def getOption(name, default):
+
+	if name in sys.argv:
+		try:
+			return int(sys.argv[sys.argv.index(name)+1])
+		except:
+			return default
+
+	return default
+
+pages = max(getOption("--pages", 500), 1)
+fan_out = max(getOption("--fan-out", 5), 1)
+form_variety = max(getOption("--form-variety", 20), 1)
+latency = max(getOption("--latency", 0), 0)
+port = max(getOption("--port", 0), 0)
+
+if "--report" in sys.argv:
+	try:
+		report_file = sys.argv[sys.argv.index("--report")+1]
+	except:
+		report_file = ""
+else:
+	report_file = ""
+
+if "--" in sys.argv:
+	crawler_arguments = sys.argv[sys.argv.index("--")+1:]
+else:
+	crawler_arguments = []
+
+# returns the form with the given number, which has one of every input type, plus radio buttons, checkboxes, a select and a textarea,
+# all with names of their own, so every form is a new form as far as the crawler is concerned
+def makeForm(number, method):
+
+	suffix = str(number)
+	form = "<form method='" + method + "' action='/" + method + "-form" + suffix + "'>"
+
+	for input_type in input_types:
+		form += "<input type='" + input_type + "' name='" + input_type.replace("-", "_") + suffix + "' maxlength='12' min='1' max='50' placeholder=''>"
+
+	form += "<input type='radio' name='radio" + suffix + "' value='a'><input type='radio' name='radio" + suffix + "' value='b'>"
+	form += "<input type='checkbox' name='checkbox" + suffix + "' value='yes'>"
+	form += "<select name='select" + suffix + "'><option value='1'>one</option><option value='2'>two</option><option value='3'>three</option></select>"
+	form += "<textarea name='textarea" + suffix + "' rows='4' cols='40'></textarea>"
+	form += "<input type='submit' value='Go'></form>"
+
+	return form
+
+def getPageUrl(number):
+
+	return "/page" + str(number) + "?p" + str(number) + "=1"
+
+# returns page number 'number', which links to fan_out other pages, and has one of the GET forms and one of the POST forms
+def makePage(number):
+
+	page = "<html><head><title>Page " + str(number) + "</title></head><body><h1>Page " + str(number) + "</h1><ul>"
+
+	for counter in range(1, fan_out + 1):
+		linked_number = (number * fan_out + counter) % pages
+		page += "<li><a href='" + getPageUrl(linked_number) + "'>Page " + str(linked_number) + "</a></li>"
+
+	page += "</ul>" + makeForm(number % form_variety, "get") + makeForm(number % form_variety, "post")
+	page += "<p>" + "Some text, to give the page a realistic size. " * 40 + "</p></body></html>"
+
+	return page
+
+def makeRobots(host):
+
+	return "User-agent: *\nDisallow: /private/\nAllow: " + getPageUrl(0) + "\nSitemap: http://" + host + "/sitemap.xml\n"
+
+# a sitemap index, which points to a sitemap of every page
+def makeSitemapIndex(host):
+
+	return "<?xml version='1.0' encoding='UTF-8'?><sitemapindex xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'><sitemap><loc>http://" + host + "/sitemap-pages.xml</loc></sitemap></sitemapindex>"
+
+def makeSitemap(host):
+
+	return "<?xml version='1.0' encoding='UTF-8'?><urlset xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>" + "".join(["<url><loc>http://" + host + getPageUrl(number).replace("&", "&amp;") + "</loc></url>" for number in range(0, pages)]) + "</urlset>"
+
+# how long the server took to answer each request (in seconds), and how many requests there were for pages (i.e not robots.txt or the sitemaps)
+response_times = []
+page_requests = [0]
+lock = threading.Lock()
+
+class SiteHandler(http.server.BaseHTTPRequestHandler):
+
+	protocol_version = "HTTP/1.1"
+
+	# the headers and the body are written separately, and without this, the second write waits on the client's delayed ACK (about 40 ms)
+	disable_nagle_algorithm = True
+
+	def log_message(self, *arguments):
+
+		pass
+
+	def answer(self):
+
+		start = time.perf_counter()
+		host = self.headers.get("Host", "127.0.0.1")
+		path = self.path.partition("?")[0]
+
+		if self.command == "POST":
+			self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+		if latency > 0:
+			time.sleep(latency / 1000)
+
+		if path == "/robots.txt":
+			content_type, body = "text/plain", makeRobots(host)
+		elif path == "/sitemap.xml":
+			content_type, body = "application/xml", makeSitemapIndex(host)
+		elif path == "/sitemap-pages.xml":
+			content_type, body = "application/xml", makeSitemap(host)
+		else:
+			try:
+				number = int(path.rpartition("page")[2]) % pages
+			except ValueError:
+				# a form submission, whose results page is one of the pages
+				number = sum([ord(character) for character in self.path]) % pages
+
+			content_type, body = "text/html; charset=utf-8", makePage(number)
+
+			with lock:
+				page_requests[0] += 1
+
+		body = body.encode()
+		etag = '"' + hashlib.md5(body).hexdigest() + '"'
+
+		# the website never changes, so a crawler that has cached a page (e.g with --cache-dir) is told it hasn't changed
+		if self.headers.get("If-None-Match") == etag:
+			self.send_response(304)
+			self.send_header("ETag", etag)
+			self.end_headers()
+			with lock:
+				response_times.append(time.perf_counter() - start)
+			return
+
+		self.send_response(200)
+		self.send_header("Content-Type", content_type)
+		self.send_header("Content-Length", str(len(body)))
+		self.send_header("ETag", etag)
+		self.end_headers()
+
+		try:
+			if self.command != "HEAD":
+				self.wfile.write(body)
+		except (BrokenPipeError, ConnectionResetError):
+			pass
+
+		with lock:
+			response_times.append(time.perf_counter() - start)
+
+	do_GET = answer
+	do_POST = answer
+	do_HEAD = answer
+
+class SiteServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+
+	daemon_threads = True
+
+	def handle_error(self, request, client_address):
+
+		pass
+
+def getPercentile(values, percentile):
+
+	if len(values) == 0:
+		return 0
+
+	values = sorted(values)
+	return values[min(int(len(values) * percentile / 100), len(values) - 1)]
+
+def getCommit():
+
+	try:
+		return subprocess.run(["git", "rev-parse", "HEAD"], cwd=repository, capture_output=True, text=True).stdout.strip()
+	except OSError:
+		return ""
+
+server = SiteServer(("127.0.0.1", port), SiteHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+start_url = "http://127.0.0.1:" + str(server.server_address[1]) + getPageUrl(0)
+
+output_directory = tempfile.mkdtemp()
+output_file = os.path.join(output_directory, "output.txt")
+command = [sys.executable, os.path.join(repository, "jick.py"), "--urls", start_url, "--href", "--get", "--post", "--robots", "--site-map", "--max-results", "1000000000", "--max-time", "3600", "--output", output_file] + crawler_arguments
+
+# the crawler is run as a separate process, and waited on with os.wait4, so that the CPU time and memory measured are only the crawler's
+start = time.perf_counter()
+crawler = subprocess.Popen(command, cwd=repository, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+crawler_output = crawler.stdout.read().decode(errors="replace")
+process_id, status, usage = os.wait4(crawler.pid, 0)
+elapsed = time.perf_counter() - start
+server.shutdown()
+
+discovered = 0
+if os.path.exists(output_file):
+	discovered = sum([1 for line in open(output_file, "r")])
+	os.remove(output_file)
+os.rmdir(output_directory)
+
+# ru_maxrss is in kilobytes on Linux, but in bytes on macOS
+peak_rss = usage.ru_maxrss * 1024
+if platform.system() == "Darwin":
+	peak_rss = usage.ru_maxrss
+
+report = {
+	"commit":getCommit(),
+	"time":time.strftime("%Y-%m-%dT%H:%M:%S"),
+	"python":platform.python_version(),
+	"platform":platform.platform(),
+	"site":{"pages":pages, "fan_out":fan_out, "form_variety":form_variety, "latency_ms":latency},
+	"crawler_arguments":crawler_arguments,
+	"exit_status":os.waitstatus_to_exitcode(status),
+	"elapsed_seconds":round(elapsed, 3),
+	"page_requests":page_requests[0],
+	"requests":len(response_times),
+	"discovered_urls":discovered,
+	"pages_per_second":round(page_requests[0] / elapsed, 2),
+	"discoveries_per_second":round(discovered / elapsed, 2),
+	"response_time_p50_ms":round(getPercentile(response_times, 50) * 1000, 2),
+	"response_time_p99_ms":round(getPercentile(response_times, 99) * 1000, 2),
+	"cpu_user_seconds":round(usage.ru_utime, 3),
+	"cpu_system_seconds":round(usage.ru_stime, 3),
+	"peak_rss_mb":round(peak_rss / 1024 / 1024, 1),
+}
+
+print(crawler_output.strip())
+print("")
+print(str(report["page_requests"]) + " pages and " + str(report["requests"] - report["page_requests"]) + " other requests in " + str(report["elapsed_seconds"]) + " s: " + str(report["pages_per_second"]) + " pages/s, " + str(report["discoveries_per_second"]) + " discoveries/s (" + str(discovered) + " URLs)")
+print("response time (at the server): p50 " + str(report["response_time_p50_ms"]) + " ms, p99 " + str(report["response_time_p99_ms"]) + " ms")
+print("crawler: " + str(report["cpu_user_seconds"]) + " s user + " + str(report["cpu_system_seconds"]) + " s system CPU, peak RSS " + str(report["peak_rss_mb"]) + " MB")
+
+if report_file:
+	handler = open(report_file, "w")
+	handler.write(json.dumps(report, indent=1) + "\n")
+	handler.close()
+	print("report written to " + report_file)
@@ -0,0 +1,147 @@
+#!/usr/bin/python
+
+# crawls a sample website (kept in memory, so no requests are sent), with and without --skip-duplicates,
+# and counts how many requests were sent, how many pages were harvested, and how much CPU time the crawl took
+# the website is a shop, whose pages are linked to with tracking parameters, session IDs, sort orders and view options,
+# none of which change what is on the page (apart from the order it is in)
+# run from the repository root: python benchmarks/bench_dedup.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler_index
+import crawler_engine
+import crawler_frontier
+import crawler_fingerprint
+
+from urllib import parse
+
+host = "shop.example.com"
+categories = ["books", "music", "films", "games", "toys", "garden", "kitchen", "tools"]
+
+# the extra parameters each link may be given, none of which change the page
+extra_parameters = [("ref", "nav"), ("utm_source", "newsletter"), ("sort", "price"), ("view", "grid"), ("sid", "A81F2C9B7D")]
+
+class FakeResponse:
+
+	def __init__(self, url, text):
+
+		self.url = url
+		self.text = text
+		self.status_code = 200
+		self.headers = {"Content-Type":"text/html; charset=utf-8"}
+
+class FakeCookies:
+
+	def clear(self):
+
+		pass
+
+# stands in for a requests session, answering every request from the sample website
+class FakeSession:
+
+	def __init__(self):
+
+		self.cookies = FakeCookies()
+		self.requests = 0
+
+	def get(self, url, timeout=5, proxies={}, headers=None):
+
+		self.requests += 1
+		return FakeResponse(url, makePage(url))
+
+	def post(self, url, data={}, timeout=5, proxies={}, headers=None):
+
+		self.requests += 1
+		return FakeResponse(url, makePage(url))
+
+# returns a link to the given path and parameters, with some of the extra parameters added, depending on variant
+def makeLink(path, parameters, variant):
+
+	parameters = list(parameters)
+	for index in range(0, len(extra_parameters)):
+		if variant & (1 << index):
+			parameters.append(extra_parameters[index])
+
+	if len(parameters) == 0:
+		return path
+
+	return path + "?" + parse.urlencode(parameters)
+
+def makePage(url):
+
+	parsed_url = parse.urlsplit(url)
+	parameters = dict(parse.parse_qsl(parsed_url.query))
+	path = parsed_url.path
+
+	# the items on the page, in the order the sort parameter asks for
+	if path == "/category":
+		title = parameters.get("name", "all")
+		items = [title + " item " + str(counter) for counter in range(0, 30)]
+	elif path == "/item":
+		title = "item " + parameters.get("id", "0")
+		items = ["review " + str(counter) + " of " + title for counter in range(0, 10)]
+	else:
+		title = "home"
+		items = ["offer " + str(counter) for counter in range(0, 12)]
+
+	if parameters.get("sort") == "price":
+		items.reverse()
+
+	# which of the extra parameters the page was requested with, which decides which ones its own links have,
+	# so that every page links to a couple of combinations of them that haven't been seen before
+	variant = sum([1 << index for index in range(0, len(extra_parameters)) if extra_parameters[index][0] in parameters])
+	category_variants = [0, (variant * 3 + 1) % 32]
+	item_variants = [0, (variant * 5 + 2) % 32]
+
+	page = "<html><head><title>" + title + "</title></head><body><div class='nav'>"
+	for index in range(0, len(categories)):
+		page += "<a href='" + makeLink("/category", [("name", categories[index])], category_variants[index % 2]) + "'>" + categories[index] + "</a> "
+	page += "</div><form action='/search' method='get'><input type='text' name='q'><select name='in'><option>all</option><option>books</option></select></form><ul>"
+
+	for index in range(0, len(items)):
+		page += "<li><a href='" + makeLink("/item", [("id", str(index))], item_variants[index % 2]) + "'>" + items[index] + "</a> in stock, free delivery on orders over 20 pounds</li>"
+
+	page += "</ul><div class='footer'>" + "Terms and conditions, privacy policy, cookies, accessibility, contact us. " * 20 + "</div></body></html>"
+	return page
+
+# crawls the sample website, and returns the session (which counts the requests), the discovered URLs and the page index (if any)
+def crawlShop(skip_duplicates):
+
+	session = FakeSession()
+	discovered_urls = crawler_index.DiscoveredUrls()
+	frontier = crawler_frontier.Frontier(discovered_urls)
+	harvest_options = {"scheme":"https", "host":host, "href":True, "iframe":False, "submit_get_forms":True, "submit_post_forms":False}
+
+	if skip_duplicates:
+		page_index = crawler_fingerprint.PageIndex(discovered_urls)
+	else:
+		page_index = None
+
+	crawler_engine.visitUrl(session, crawler_index.Url("GET", "https://" + host + "/"), discovered_urls, harvest_options, page_index=page_index)
+	crawler_engine.crawlSerially(session, discovered_urls, harvest_options, start_time=time.time(), max_time=600, max_results=100000, frontier=frontier, page_index=page_index)
+
+	return session, discovered_urls, page_index
+
+for skip_duplicates in [False, True]:
+
+	start = time.process_time()
+	session, discovered_urls, page_index = crawlShop(skip_duplicates)
+	elapsed = time.process_time() - start
+
+	paths = set([url.type + " " + url.origin + url.path for url in discovered_urls])
+
+	if skip_duplicates:
+		print("--skip-duplicates:")
+	else:
+		print("default:")
+
+	print("    " + str(session.requests).rjust(5) + " requests, " + str(len(discovered_urls)).rjust(5) + " URLs discovered, on " + str(len(paths)) + " paths, " + str(round(elapsed * 1000)).rjust(6) + " ms of CPU time")
+
+	if page_index is not None:
+		print("    " + str(page_index.pages).rjust(5) + " pages harvested, " + str(page_index.duplicates) + " skipped as duplicates, " + str(len(discovered_urls.ignored_signatures)) + " URLs not requested because of ignored parameters")
+		print("    harvesting took " + str(round(page_index.harvest_time / page_index.pages * 1000, 2)) + " ms per page, fingerprinting " + str(round(page_index.fingerprint_time / (page_index.pages + page_index.duplicates) * 1000, 2)) + " ms per page")
+		print("    ignored parameters: " + ", ".join([path + " " + ",".join(sorted(names)) for (url_type, path), names in sorted(discovered_urls.ignored_parameters.items())]))
@@ -0,0 +1,116 @@
+#!/usr/bin/python
+
+# fetches every URL of a sample website, served by a local HTTP server, with and without download limits (see crawler_download),
+# and counts how many bytes were downloaded, how long it took, and how much memory the biggest response body took
+# the website has ordinary pages, a huge page, PDFs and images (some of which are served without a file extension), and a gzipped page
+# run from the repository root: python benchmarks/bench_download.py
+
+import os
+import sys
+import gzip
+import time
+import threading
+import http.server
+import socketserver
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+import crawler_index
+import crawler_engine
+import crawler_download
+
+page = ("<html><body>" + "<p><a href='/page'>a link</a> and some text to go with it</p>" * 200 + "</body></html>").encode()
+huge_page = ("<html><body>" + "<p><a href='/page'>a link</a> and some text to go with it</p>" * 100000 + "</body></html>").encode()
+pdf = b"%PDF-1.4\n" + os.urandom(2000000)
+image = b"\x89PNG\r\n\x1a\n" + os.urandom(300000)
+
+# path: (content type, body, whether to gzip it)
+site = {
+	"/page":("text/html; charset=utf-8", page, False),
+	"/huge":("text/html", huge_page, False),
+	"/gzipped":("text/html", huge_page, True),
+	"/report.pdf":("application/pdf", pdf, False),
+	"/download?id=1":("application/pdf", pdf, False),
+	"/photo.png":("image/png", image, False),
+	"/thumbnail?id=1":("image/png", image, False),
+}
+
+class SiteHandler(http.server.BaseHTTPRequestHandler):
+
+	protocol_version = "HTTP/1.1"
+
+	# the headers and the body are written separately, and without this, the second write waits on the client's delayed ACK (about 40 ms)
+	disable_nagle_algorithm = True
+
+	def log_message(self, *arguments):
+
+		pass
+
+	def sendHeaders(self):
+
+		content_type, body, compress = site.get(self.path, site["/page"])
+		if compress:
+			body = gzip.compress(body)
+
+		self.send_response(200)
+		self.send_header("Content-Type", content_type)
+		self.send_header("Content-Length", str(len(body)))
+		if compress:
+			self.send_header("Content-Encoding", "gzip")
+		self.end_headers()
+
+		return body
+
+	def do_HEAD(self):
+
+		self.sendHeaders()
+
+	def do_GET(self):
+
+		body = self.sendHeaders()
+		try:
+			self.wfile.write(body)
+		except (BrokenPipeError, ConnectionResetError):
+			# the crawler hung up, which is the point
+			pass
+
+class SiteServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+
+	daemon_threads = True
+
+	def handle_error(self, request, client_address):
+
+		# the crawler hanging up in the middle of a response is expected
+		pass
+
+# fetches every URL of the sample website, 5 times over, and returns how long it took, the size of the biggest body, and the download limits (if any)
+def fetchSite(port, download_limits):
+
+	session = requests.session()
+	biggest_body = 0
+	start = time.perf_counter()
+
+	for repeat in range(0, 5):
+		for path in site:
+			http_response = crawler_engine.fetchUrl(session, crawler_index.Url("GET", "http://127.0.0.1:" + str(port) + path), 5, {}, download_limits)
+			biggest_body = max(biggest_body, len(http_response.content))
+
+	return time.perf_counter() - start, biggest_body
+
+server = SiteServer(("127.0.0.1", 0), SiteHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+port = server.server_address[1]
+
+for name, download_limits in [("no limits", None), ("content type only", crawler_download.DownloadLimits()), ("--max-size 1000000", crawler_download.DownloadLimits(1000000)), ("--max-size 1000000 --probe-binary", crawler_download.DownloadLimits(1000000, True))]:
+
+	elapsed, biggest_body = fetchSite(port, download_limits)
+	print(name + ":")
+
+	if download_limits is None:
+		total_size = sum([len(gzip.compress(body)) if compress else len(body) for content_type, body, compress in site.values()]) * 5
+		print("    " + str(round(total_size / 1024)).rjust(7) + " KB downloaded, in " + str(round(elapsed * 1000)).rjust(5) + " ms, biggest body " + str(round(biggest_body / 1024)) + " KB")
+	else:
+		print("    " + str(round(download_limits.bytes_downloaded / 1024)).rjust(7) + " KB downloaded, in " + str(round(elapsed * 1000)).rjust(5) + " ms, biggest body " + str(round(biggest_body / 1024)) + " KB, " + str(download_limits.skipped) + " skipped by content type, " + str(download_limits.probed) + " by HEAD request, " + str(download_limits.truncated) + " cut off, at least " + str(round(download_limits.bytes_saved / 1024)) + " KB saved")
+
+server.shutdown()
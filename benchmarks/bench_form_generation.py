@@ -0,0 +1,56 @@
+#!/usr/bin/python
+
+# measures how many forms per second crawler_generator can generate the submissions of (as many as form_parameters.ini says), on forms with
+# hundreds of fields of every kind, and how much of that is compiling the form (see crawler_generator.compileForm) rather than generating from it
+# run from the repository root (which is where form_parameters.ini is read from): python benchmarks/bench_form_generation.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler_functions
+import crawler_generator
+
+from lxml import html
+
+input_types = ["text", "search", "password", "tel", "url", "hidden", "email", "date", "datetime-local", "time", "month", "week", "number", "range", "color"]
+
+# returns a form with 'fields' fields, cycling through every input type, plus checkboxes, radio buttons, textareas and selects
+def generateForm(fields, form_type="GET"):
+
+	page = "<html><body><form method='" + form_type.lower() + "' action='/form'>"
+	for field in range(0, fields):
+		kind = field % (len(input_types) + 4)
+		if kind < len(input_types):
+			page += "<input type='" + input_types[kind] + "' name='input" + str(field) + "' maxlength='20'/>"
+		elif kind == len(input_types):
+			page += "<input type='checkbox' name='check" + str(field) + "'/>"
+		elif kind == len(input_types) + 1:
+			page += "<input type='radio' name='radio" + str(field) + "' value='a'/><input type='radio' name='radio" + str(field) + "' value='b'/>"
+		elif kind == len(input_types) + 2:
+			page += "<textarea name='textarea" + str(field) + "' rows='4' cols='40'></textarea>"
+		else:
+			page += "<select name='select" + str(field) + "'><option value='1'>1</option><option value='2' selected>2</option></select>"
+	page += "</form></body></html>"
+
+	return crawler_functions.getForms(html.fromstring(page), form_type, "https", "www.example.com")[0]
+
+for fields in [10, 100, 300, 1000]:
+
+	form = generateForm(fields)
+	submissions = crawler_generator.plans["GET"].submissions
+	repeats = max(20, 20000 // fields)
+
+	start = time.perf_counter()
+	for counter in range(0, repeats):
+		crawler_generator.generateFormSubmissions(form, submissions, "GET")
+	elapsed = time.perf_counter() - start
+
+	start = time.perf_counter()
+	for counter in range(0, repeats):
+		crawler_generator.compileForm(form, "GET")
+	compile_elapsed = time.perf_counter() - start
+
+	print(str(fields).rjust(5) + " fields, " + str(submissions) + " submissions: " + str(round(repeats / elapsed)).rjust(7) + " forms/s, " + str(round(elapsed / repeats * 1000, 3)).rjust(8) + " ms/form (" + str(round(compile_elapsed / elapsed * 100)) + "% of it compiling)")
@@ -0,0 +1,53 @@
+#!/usr/bin/python
+
+# counts how many times HTML is parsed, and how long it takes, to harvest form-heavy pages
+# run from the repository root: python benchmarks/bench_forms.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler_functions
+
+from lxml import html
+
+parse_count = 0
+original_fromstring = html.fromstring
+
+# counts every call to lxml.html.fromstring, which is what the crawler parses HTML with
+def countingFromstring(*args, **kwargs):
+
+	global parse_count
+	parse_count += 1
+	return original_fromstring(*args, **kwargs)
+
+html.fromstring = countingFromstring
+
+def generatePage(forms, fields):
+
+	page = "<html><body>"
+	for counter in range(0, forms):
+		page += "<form method='" + ["get", "post"][counter % 2] + "' action='/form" + str(counter) + "'>"
+		for field in range(0, fields):
+			page += "<input type='text' name='text" + str(field) + "' maxlength='20'/><input type='checkbox' name='check" + str(field) + "'/>"
+			page += "<input type='radio' name='radio" + str(field) + "' value='a'/><input type='radio' name='radio" + str(field) + "' value='b'/>"
+			page += "<select name='select" + str(field) + "'><option value='1'>1</option><option value='2' selected>2</option></select>"
+			page += "<textarea name='textarea" + str(field) + "' rows='2' cols='10'></textarea>"
+		page += "</form>"
+	page += "</body></html>"
+	return page
+
+for forms, fields in [(1, 5), (10, 5), (10, 20), (50, 10)]:
+
+	page = generatePage(forms, fields)
+	repeats = 20
+
+	parse_count = 0
+	start = time.perf_counter()
+	for counter in range(0, repeats):
+		crawler_functions.harvestAllData(page, "https", "www.example.com", False, False, True, True, [])
+	elapsed = time.perf_counter() - start
+
+	print(str(forms).rjust(3) + " forms x " + str(fields).rjust(2) + " fields: " + str(parse_count // repeats).rjust(3) + " parses/page, " + str(round(elapsed / repeats * 1000, 2)).rjust(8) + " ms/page")
@@ -0,0 +1,47 @@
+#!/usr/bin/python
+
+# measures the per-URL cost of lining up and taking URLs from each frontier, as the number of URLs waiting grows
+# run from the repository root: python benchmarks/bench_frontier.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler_index
+import crawler_frontier
+
+sources = ["href", "href", "href", "iframe", "get", "post"]
+
+# generates n unique URLs, spread over 100 path prefixes and a range of depths and sources
+def generateUrls(n):
+
+	urls = []
+	for counter in range(0, n):
+		urls.append(crawler_index.Url("GET", "https://www.example.com/section" + str(counter % 100) + "/page.php?p" + str(counter) + "=1", counter % 7, sources[counter % len(sources)]))
+
+	return urls
+
+# returns how long it took to discover all the URLs, and then to take every one of them back out of the frontier
+def benchmarkFrontier(frontier_class, n):
+
+	urls = generateUrls(n)
+	discovered_urls = crawler_index.DiscoveredUrls()
+	frontier = frontier_class(discovered_urls, path_quota=n)
+
+	start = time.perf_counter()
+	discovered_urls.extend(urls)
+	push_elapsed = time.perf_counter() - start
+
+	start = time.perf_counter()
+	while frontier.pop() is not None:
+		pass
+	pop_elapsed = time.perf_counter() - start
+
+	return push_elapsed, pop_elapsed
+
+for frontier_class in [crawler_frontier.Frontier, crawler_frontier.PriorityFrontier]:
+	for n in [1000, 10000, 100000, 1000000]:
+		push_elapsed, pop_elapsed = benchmarkFrontier(frontier_class, n)
+		print(frontier_class.__name__.ljust(16) + str(n).rjust(8) + " URLs: " + str(round(push_elapsed / n * 1000000, 3)).rjust(8) + " us/push (including the seen index), " + str(round(pop_elapsed / n * 1000000, 3)).rjust(8) + " us/pop")
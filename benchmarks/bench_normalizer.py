@@ -0,0 +1,157 @@
+#!/usr/bin/python
+
+# checks crawler_normalizer.normalizeUrl against the test corpus in normalizer_corpus.txt,
+# and then crawls 3 sample websites (kept in memory, so no requests are sent) to count how many fetches are wasted,
+# i.e on a page that was already fetched under another spelling, or on a page that doesn't exist because a link was resolved wrongly,
+# once with the old link resolution (crawler_functions.getAbsoluteUrl) and once with the normalizer
+# run from the repository root: python benchmarks/bench_normalizer.py
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler_functions
+import crawler_normalizer
+
+from lxml import html
+
+# returns how many of the corpus cases pass, and how many there are, printing every one that fails
+def checkCorpus(filename):
+
+	passed = 0
+	total = 0
+
+	for line in open(filename, "r", encoding="utf-8"):
+
+		if line.startswith("#") or not line.strip():
+			continue
+
+		base_url, link, expected_url = line.rstrip("\n").split("\t")
+		normalized_url = str(crawler_normalizer.normalizeUrl(link, base_url))
+		total += 1
+
+		if normalized_url == expected_url:
+			passed += 1
+		else:
+			print("FAILED: " + repr(link) + " against " + base_url + " gave " + normalized_url + ", expected " + expected_url)
+
+	return passed, total
+
+def makePage(links, base_href=None):
+
+	page = "<html><head>"
+	if base_href is not None:
+		page += "<base href='" + base_href + "'>"
+	page += "</head><body>" + "".join(["<a href='" + link + "'>link</a>" for link in links]) + "</body></html>"
+	return page
+
+# documentation: nested directories, linked to each other with relative paths, "./", "../" and "#fragments"
+def makeDocsSite():
+
+	pages = {}
+	for section in range(0, 10):
+		for page_number in range(0, 6):
+
+			if page_number == 0:
+				path = "/docs/s" + str(section) + "/index.html"
+			else:
+				path = "/docs/s" + str(section) + "/page" + str(page_number) + ".html"
+
+			links = ["page" + str(page_number % 5 + 1) + ".html", "./page" + str((page_number + 1) % 5 + 1) + ".html#intro", "../s" + str((section + 1) % 10) + "/index.html"]
+			links += ["/docs/s" + str(section) + "/index.html", "#top", "HTTPS://DOCS.EXAMPLE.COM:443/docs/s0/index.html"]
+			pages["https://docs.example.com" + path] = makePage(links)
+
+	return "https://docs.example.com/docs/s0/index.html", pages
+
+# a shop, whose pages all have <base href="/shop/">, so that "item?id=3" means /shop/item?id=3 wherever it is linked from
+def makeShopSite():
+
+	pages = {}
+	pages["https://shop.example.com/shop/"] = makePage(["item?id=" + str(item) for item in range(0, 30)] + ["cart"], "/shop/")
+	pages["https://shop.example.com/shop/cart"] = makePage(["./", "//shop.example.com/shop/cart"], "/shop/")
+
+	for item in range(0, 30):
+		links = ["item?id=" + str((item + 1) % 30), "./item?id=" + str((item + 2) % 30) + "#reviews", "cart", "//shop.example.com/shop/"]
+		pages["https://shop.example.com/shop/item?id=" + str(item)] = makePage(links, "/shop/")
+
+	return "https://shop.example.com/shop/", pages
+
+# a wiki, whose page titles are linked to with every spelling of their percent-encoding
+def makeWikiSite():
+
+	titles = ["Caf%C3%A9", "~user", "A%20B", "Main"] + ["Page" + str(counter) for counter in range(0, 20)]
+	spellings = {"Caf%C3%A9":["Caf%C3%A9", "Caf%c3%a9", "Café"], "~user":["~user", "%7Euser", "%7euser"], "A%20B":["A%20B", "A B"]}
+
+	pages = {}
+	for index in range(0, len(titles)):
+		links = []
+		for title in ["Caf%C3%A9", "~user", "A%20B"]:
+			links.append("/wiki/" + spellings[title][index % len(spellings[title])])
+		links.append("/wiki/" + titles[(index + 1) % len(titles)])
+		links.append("https://wiki.example.com/wiki/" + titles[(index + 5) % len(titles)] + "#History")
+		pages["https://wiki.example.com/wiki/" + titles[index]] = makePage(links)
+
+	return "https://wiki.example.com/wiki/Main", pages
+
+# crawls a sample website, visiting every distinct URL found (as a crawler that keys on the URL itself does)
+# resolve is given each link and the page's URL, and returns the URL to fetch (or None to skip the link)
+# returns how many URLs were fetched, how many of those were already fetched under another spelling, and how many don't exist
+def crawlSite(start_url, pages, resolve):
+
+	host = crawler_normalizer.normalizeUrl(start_url, start_url).split("/")[2]
+	queue = [start_url]
+	fetched = set([start_url])
+	fetched_pages = set()
+	duplicates = 0
+	missing = 0
+
+	while len(queue) > 0:
+
+		url = queue.pop(0)
+
+		# this is how the server sees the URL, i.e without the fragment, and with any spelling of the same page going to the same page
+		page_url = crawler_normalizer.normalizeUrl(url, url)
+
+		if page_url not in pages:
+			missing += 1
+			continue
+
+		if page_url in fetched_pages:
+			duplicates += 1
+			continue
+
+		fetched_pages.add(page_url)
+		tree = html.fromstring(pages[page_url].encode(), parser=crawler_functions.html_parser)
+
+		for link in tree.xpath("//a/@href"):
+
+			link_url = resolve(link, url, tree)
+			if link_url is None or not crawler_functions.isValidHost(host, link_url) or link_url in fetched:
+				continue
+
+			fetched.add(link_url)
+			queue.append(link_url)
+
+	return len(fetched), duplicates, missing
+
+def resolveOldStyle(link, page_url, tree):
+
+	return crawler_functions.getAbsoluteUrl("https", page_url.split("/")[2], link)
+
+def resolveNormalized(link, page_url, tree):
+
+	return crawler_normalizer.normalizeUrl(link, crawler_functions.getBaseUrl(tree, page_url=page_url))
+
+passed, total = checkCorpus(os.path.join(os.path.dirname(os.path.abspath(__file__)), "normalizer_corpus.txt"))
+print("corpus: " + str(passed) + " of " + str(total) + " cases pass")
+print("")
+
+for name, makeSite in [("docs", makeDocsSite), ("shop", makeShopSite), ("wiki", makeWikiSite)]:
+
+	start_url, pages = makeSite()
+	print(name + " (" + str(len(pages)) + " pages):")
+
+	for resolution, resolve in [("old", resolveOldStyle), ("normalized", resolveNormalized)]:
+		fetches, duplicates, missing = crawlSite(start_url, pages, resolve)
+		print("    " + resolution.ljust(12) + str(fetches).rjust(5) + " fetches, " + str(duplicates).rjust(4) + " of the same page again, " + str(missing).rjust(4) + " of pages that don't exist")
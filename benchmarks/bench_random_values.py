@@ -0,0 +1,47 @@
+#!/usr/bin/python
+
+# measures how fast random values for text inputs and textareas are generated, at the lengths the form generator uses:
+# 9 characters (an <input type='text'> without a maxlength), 49 (a textarea without rows and cols) and 599 (a textarea with rows='30' cols='40')
+# - one character at a time: how they used to be built, with random.choice for every character
+# - random.choices: the whole string from a single call
+# - RandomPool: crawler_generator.RandomPool, which cuts them from a pool of random characters (seeded, and from os.urandom)
+# run from the repository root: python benchmarks/bench_random_values.py
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler_generator
+
+chars = crawler_generator.letters_and_numbers
+
+def generateOneAtATime(length):
+
+	value = ""
+	for counter in range(0, length):
+		value += random.choice(chars)
+	return value
+
+def generateWithChoices(length):
+
+	return "".join(random.choices(chars, k=length))
+
+seeded_pool = crawler_generator.RandomPool(seed=1)
+urandom_pool = crawler_generator.RandomPool()
+
+for length in [9, 49, 599]:
+
+	values = max(1000, 2000000 // length)
+	print(str(values) + " values of " + str(length) + " characters:")
+
+	for name, generate in [("one at a time", generateOneAtATime), ("random.choices", generateWithChoices), ("RandomPool (seeded)", lambda length: seeded_pool.getString(chars, length)), ("RandomPool (os.urandom)", lambda length: urandom_pool.getString(chars, length))]:
+
+		start = time.perf_counter()
+		for counter in range(0, values):
+			generate(length)
+		elapsed = time.perf_counter() - start
+
+		print("    " + name.ljust(25) + str(round(values / elapsed)).rjust(10) + " values/s, " + str(round(values * length / elapsed / 1000000, 1)).rjust(7) + " M characters/s")
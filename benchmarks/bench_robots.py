@@ -0,0 +1,72 @@
+#!/usr/bin/python
+
+# measures how many URLs a second can be checked against a robots.txt with 10, 100 and 1000 Allow and Disallow rules
+# (a third of them with wildcards), and how long it takes to parse it:
+# - crawler_robots.RobotsRules, which walks a trie of the rules along each URL's path
+# - urllib.robotparser, the standard library's parser, which tries each rule in turn (and doesn't support wildcards)
+# (the 2 don't allow quite the same URLs, since robotparser takes the first rule that matches, rather than the longest, and has no wildcards)
+# run from the repository root: python benchmarks/bench_robots.py
+
+import os
+import sys
+import time
+import random
+
+from urllib import robotparser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler_robots
+
+sections = ["products", "category", "search", "account", "blog", "news", "help", "static", "media", "api"]
+
+# returns a robots.txt with the given number of rules, under a handful of sections, like a big website's
+def generateRobots(rules, generator):
+
+	lines = ["User-agent: *"]
+
+	for rule in range(0, rules):
+
+		path = "/" + generator.choice(sections) + "/" + "section" + str(rule)
+		if rule % 3 == 0:
+			path += "/*.php"
+		elif rule % 3 == 1:
+			path += "/"
+
+		lines.append(("Allow: " if rule % 5 == 0 else "Disallow: ") + path)
+
+	return "\n".join(lines) + "\n"
+
+def generatePaths(count, rules, generator):
+
+	return ["/" + generator.choice(sections) + "/section" + str(generator.randrange(0, rules * 2)) + "/page" + str(number) + ".php?id=" + str(number) for number in range(0, count)]
+
+generator = random.Random(1)
+
+for rules in [10, 100, 1000]:
+
+	robots_text = generateRobots(rules, generator)
+	paths = generatePaths(100000, rules, generator)
+	print(str(rules) + " rules, " + str(len(paths)) + " URLs:")
+
+	start = time.perf_counter()
+	robots_rules = crawler_robots.RobotsRules(robots_text, "jick")
+	parse_elapsed = time.perf_counter() - start
+
+	start = time.perf_counter()
+	allowed = sum([1 for path in paths if robots_rules.isAllowed(path)])
+	elapsed = time.perf_counter() - start
+
+	print("    " + "RobotsRules".ljust(15) + str(round(len(paths) / elapsed)).rjust(9) + " URLs/s, " + str(allowed).rjust(6) + " allowed, parsed in " + str(round(parse_elapsed * 1000, 2)) + " ms")
+
+	start = time.perf_counter()
+	parser = robotparser.RobotFileParser()
+	parser.parse(robots_text.splitlines())
+	parse_elapsed = time.perf_counter() - start
+
+	# (it is only given the URLs' paths, so that it isn't timed parsing whole URLs)
+	start = time.perf_counter()
+	allowed = sum([1 for path in paths if parser.can_fetch("jick", path)])
+	elapsed = time.perf_counter() - start
+
+	print("    " + "robotparser".ljust(15) + str(round(len(paths) / elapsed)).rjust(9) + " URLs/s, " + str(allowed).rjust(6) + " allowed, parsed in " + str(round(parse_elapsed * 1000, 2)) + " ms")
@@ -0,0 +1,40 @@
+#!/usr/bin/python
+
+# measures how many links a second can be checked against the crawl's scope, on links spread over 200 hosts:
+# - isValidHost: crawler_functions.isValidHost, with a single host, which is how links were checked before there were scopes
+# - Scope (hosts): crawler_scope.Scope, with 50 host names and 10 "*.domain" wildcards
+# - Scope (hosts + paths): the same, plus 20 include paths and 20 exclude paths
+# run from the repository root: python benchmarks/bench_scope.py
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler_scope
+import crawler_functions
+
+generator = random.Random(1)
+
+hosts = ["www" + str(number) + ".example" + str(number % 20) + ".com" for number in range(0, 200)]
+sections = ["blog", "shop", "search", "account", "news", "help", "static", "media", "api", "docs"]
+
+links = ["https://" + generator.choice(hosts) + "/" + generator.choice(sections) + "/item" + str(number) + (".pdf" if number % 10 == 0 else ".html") + "?id=" + str(number) for number in range(0, 500000)]
+
+scope_hosts = hosts[:50] + ["*.example" + str(number) + ".com" for number in range(0, 10)]
+include_paths = ["/" + section + "/item" + str(number) for section in sections for number in range(1, 3)]
+exclude_paths = ["/" + section + "/*.pdf$" for section in sections] + ["/" + section + "/private" for section in sections]
+
+def checkWithIsValidHost(link):
+
+	return crawler_functions.isValidHost(hosts[0], link)
+
+for name, isInScope in [("isValidHost", checkWithIsValidHost), ("Scope (hosts)", crawler_scope.Scope(scope_hosts).isInScope), ("Scope (hosts + paths)", crawler_scope.Scope(scope_hosts, include_paths, exclude_paths).isInScope)]:
+
+	start = time.perf_counter()
+	in_scope = sum([1 for link in links if isInScope(link)])
+	elapsed = time.perf_counter() - start
+
+	print(name.ljust(22) + str(round(len(links) / elapsed)).rjust(9) + " links/s, " + str(in_scope).rjust(7) + " of " + str(len(links)) + " in scope")
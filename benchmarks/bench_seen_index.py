@@ -0,0 +1,39 @@
+#!/usr/bin/python
+
+# measures the per-URL cost of checking and recording discovered URLs in the seen index
+# run from the repository root: python benchmarks/bench_seen_index.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler_index
+
+# generates n URLs, cycling through a small number of parameter signatures, like a real crawl does
+def generateUrls(n):
+
+	urls = []
+	for counter in range(0, n):
+		parameter_names = ["p" + str(counter % 5000), "q" + str(counter % 7)]
+		urls.append(crawler_index.Url("GET", "https://www.example.com/page" + str(counter) + ".php?" + parameter_names[0] + "=1&" + parameter_names[1] + "=2"))
+
+	return urls
+
+def benchmarkIndex(n):
+
+	urls = generateUrls(n)
+	discovered_urls = crawler_index.DiscoveredUrls()
+
+	start = time.perf_counter()
+	for url in urls:
+		if not discovered_urls.isOld(url):
+			discovered_urls.append(url)
+	elapsed = time.perf_counter() - start
+
+	return elapsed
+
+for n in [1000, 10000, 100000, 1000000]:
+	elapsed = benchmarkIndex(n)
+	print(str(n).rjust(8) + " URLs: " + str(round(elapsed, 3)).rjust(8) + " s total, " + str(round(elapsed / n * 1000000, 3)).rjust(8) + " us/URL")
@@ -0,0 +1,131 @@
+#!/usr/bin/python
+
+# measures how fast, and in how much memory, a big sitemap is read, by serving a generated sitemap with --urls URLs in it (default 1000000)
+# from a local HTTP server (gzipped, with --gzip), and reading it:
+# - with crawler_sitemap.SitemapReader, which parses it as it arrives
+# - the way it used to be read, i.e downloading the whole of it, and parsing it all at once with lxml.html.fromstring
+# the URLs are only counted, not kept, so the memory is only what reading the sitemap takes
+# (the reader is run first, since the peak memory of the process only ever goes up)
+# run from the repository root: python benchmarks/bench_sitemap.py --urls 1000000
+
+import os
+import sys
+import gzip
+import zlib
+import time
+import resource
+import threading
+import http.server
+import socketserver
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+import crawler_sitemap
+
+from lxml import html
+
+if "--urls" in sys.argv:
+	try:
+		urls = int(sys.argv[sys.argv.index("--urls")+1])
+	except:
+		urls = 1000000
+else:
+	urls = 1000000
+
+use_gzip = "--gzip" in sys.argv
+
+sitemap_start = b"<?xml version='1.0' encoding='UTF-8'?><urlset xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>"
+sitemap_end = b"</urlset>"
+
+# yields the sitemap a piece at a time, so that the benchmark itself doesn't take up more memory than what it is measuring
+def generateSitemap():
+
+	yield sitemap_start
+
+	for start in range(0, urls, 1000):
+		yield b"".join([b"<url><loc>https://www.example.com/products/item" + str(number).encode() + b".html?id=" + str(number).encode() + b"</loc><lastmod>2024-01-01</lastmod><changefreq>daily</changefreq></url>" for number in range(start, min(start + 1000, urls))])
+
+	yield sitemap_end
+
+class SitemapHandler(http.server.BaseHTTPRequestHandler):
+
+	protocol_version = "HTTP/1.1"
+
+	def log_message(self, *arguments):
+
+		pass
+
+	def do_GET(self):
+
+		self.send_response(200)
+		self.send_header("Content-Type", "application/xml")
+		self.send_header("Transfer-Encoding", "chunked")
+		self.end_headers()
+
+		if use_gzip:
+			compressor = zlib.compressobj(wbits=31)
+
+		try:
+			for chunk in generateSitemap():
+				if use_gzip:
+					chunk = compressor.compress(chunk)
+				self.writeChunk(chunk)
+
+			if use_gzip:
+				self.writeChunk(compressor.flush())
+
+			self.wfile.write(b"0\r\n\r\n")
+		except (BrokenPipeError, ConnectionResetError):
+			pass
+
+	def writeChunk(self, chunk):
+
+		if len(chunk) > 0:
+			self.wfile.write(hex(len(chunk))[2:].encode() + b"\r\n" + chunk + b"\r\n")
+
+class SitemapServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+
+	daemon_threads = True
+
+# returns the peak memory of this process so far, in MB
+def getPeakMemory():
+
+	return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def readWithSitemapReader(sitemap_url):
+
+	counted = [0]
+
+	def addUrl(body):
+		counted[0] += 1
+		return True
+
+	crawler_sitemap.SitemapReader(requests.session(), 30).read([sitemap_url], addUrl)
+	return counted[0]
+
+def readAllAtOnce(sitemap_url):
+
+	body = requests.get(sitemap_url, timeout=30).content
+	if use_gzip:
+		body = gzip.decompress(body)
+
+	tree = html.fromstring(body)
+	return len(tree.xpath("//url/loc"))
+
+server = SitemapServer(("127.0.0.1", 0), SitemapHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+sitemap_url = "http://127.0.0.1:" + str(server.server_address[1]) + "/sitemap.xml"
+
+print(str(urls) + " URLs" + (", gzipped" if use_gzip else "") + ", " + str(round(getPeakMemory())) + " MB peak memory before reading it:")
+
+for name, read in [("SitemapReader", readWithSitemapReader), ("all at once", readAllAtOnce)]:
+
+	memory_before = getPeakMemory()
+	start = time.perf_counter()
+	counted = read(sitemap_url)
+	elapsed = time.perf_counter() - start
+
+	print("    " + name.ljust(15) + str(counted).rjust(9) + " URLs, " + str(round(elapsed, 2)).rjust(6) + " s, " + str(round(counted / elapsed)).rjust(8) + " URLs/s, peak memory +" + str(round(getPeakMemory() - memory_before)) + " MB")
+
+server.shutdown()
@@ -0,0 +1,63 @@
+#!/usr/bin/python
+
+# measures crawler_generator.stripRedundancies, and extracting the links from a page, on big index pages and sitemaps
+# the old quadratic implementation is included for comparison
+# run from the repository root: python benchmarks/bench_strip_redundancies.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler_index
+import crawler_functions
+import crawler_generator
+
+from lxml import html
+
+# how stripRedundancies used to work, on URL dictionaries, which can't be hashed
+def stripRedundanciesQuadratic(array):
+
+	new_array = []
+	for item in array:
+		if new_array.count(item) == 0:
+			new_array.append(item)
+
+	return new_array
+
+# generates n links, where every 4th one repeats an earlier one, as on an index page that links to everything from more than one place
+def generateLinks(n):
+
+	links = []
+	for counter in range(0, n):
+		if counter % 4 == 3:
+			links.append(links[counter - 3])
+		else:
+			links.append("/page" + str(counter) + "?id=" + str(counter))
+
+	return links
+
+def generatePage(links):
+
+	return "<html><body>" + "".join(["<a href='" + link + "'>link</a>" for link in links]) + "</body></html>"
+
+def timeFunction(function):
+
+	start = time.perf_counter()
+	function()
+	return time.perf_counter() - start
+
+for n in [1000, 10000, 50000, 200000]:
+
+	links = generateLinks(n)
+	records = [crawler_index.Url("GET", "https://www.example.com" + link) for link in links]
+	dictionaries = [{"type":"GET", "body":"https://www.example.com" + link} for link in links]
+	tree = html.fromstring(generatePage(links).encode())
+
+	print(str(n).rjust(6) + " links:")
+	# the quadratic version takes over a minute on 50000 links
+	if n <= 10000:
+		print("    stripRedundancies (quadratic, dictionaries)".ljust(52) + str(round(timeFunction(lambda: stripRedundanciesQuadratic(dictionaries)) * 1000, 1)).rjust(10) + " ms")
+	print("    stripRedundancies (Url records)".ljust(52) + str(round(timeFunction(lambda: crawler_generator.stripRedundancies(records)) * 1000, 1)).rjust(10) + " ms")
+	print("    extractLinks".ljust(52) + str(round(timeFunction(lambda: crawler_functions.extractLinks(tree, "a", "href", "https", "www.example.com")) * 1000, 1)).rjust(10) + " ms")
@@ -0,0 +1,152 @@
+#!/usr/bin/python
+
+# fetches the same URLs from a local HTTP server, from --threads threads at once (default 32), the way crawler_engine.crawlConcurrently does,
+# with a few different sessions, and counts how many connections the server had to accept, how long it took, and how many bytes came over the wire
+# - no keep-alive: every request on a new connection
+# - default session: a plain requests.session(), whose connection pool only keeps 10 connections per host,
+#   so with more requests than that in flight, the connections over 10 are thrown away after each request
+# - crawler_transport session: crawler_transport.getSession, with the pool sized to the number of requests in flight
+# it also times looking up a host name, with and without crawler_transport.DnsCache
+# the server takes --latency milliseconds to answer each request (default 2), and gzips its responses when asked to
+# run from the repository root: python benchmarks/bench_transport.py
+
+import os
+import sys
+import gzip
+import time
+import socket
+import threading
+import http.server
+import socketserver
+
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+import crawler_index
+import crawler_engine
+import crawler_download
+import crawler_transport
+
+if "--latency" in sys.argv:
+	try:
+		latency = int(sys.argv[sys.argv.index("--latency")+1])
+	except:
+		latency = 2
+else:
+	latency = 2
+
+if "--threads" in sys.argv:
+	try:
+		threads = int(sys.argv[sys.argv.index("--threads")+1])
+	except:
+		threads = 32
+else:
+	threads = 32
+
+requests_sent = 2000
+page = ("<html><body>" + "<p><a href='/page'>a link</a> and some text to go with it</p>" * 200 + "</body></html>").encode()
+gzipped_page = gzip.compress(page)
+
+# how many connections the server has accepted
+connections = [0]
+lock = threading.Lock()
+
+class SiteHandler(http.server.BaseHTTPRequestHandler):
+
+	protocol_version = "HTTP/1.1"
+
+	# the headers and the body are written separately, and without this, the second write waits on the client's delayed ACK (about 40 ms)
+	disable_nagle_algorithm = True
+
+	def setup(self):
+
+		http.server.BaseHTTPRequestHandler.setup(self)
+		with lock:
+			connections[0] += 1
+
+	def log_message(self, *arguments):
+
+		pass
+
+	def do_GET(self):
+
+		if latency > 0:
+			time.sleep(latency / 1000)
+
+		if "gzip" in self.headers.get("Accept-Encoding", ""):
+			body = gzipped_page
+		else:
+			body = page
+
+		self.send_response(200)
+		self.send_header("Content-Type", "text/html")
+		self.send_header("Content-Length", str(len(body)))
+		if body is gzipped_page:
+			self.send_header("Content-Encoding", "gzip")
+		if self.close_connection:
+			# so that the client doesn't put the connection back in its pool
+			self.send_header("Connection", "close")
+		self.end_headers()
+
+		try:
+			self.wfile.write(body)
+		except (BrokenPipeError, ConnectionResetError):
+			pass
+
+class SiteServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+
+	daemon_threads = True
+	request_queue_size = 128
+
+	def handle_error(self, request, client_address):
+
+		pass
+
+def getDefaultSession():
+
+	session = requests.session()
+	session.headers.update({"User-Agent":"bench"})
+	return session
+
+def getClosingSession():
+
+	session = getDefaultSession()
+	session.headers.update({"Connection":"close"})
+	return session
+
+# fetches requests_sent URLs with the given session, from 'threads' threads at once, and returns how long it took and how many bytes were downloaded
+def fetchAll(session, host, port):
+
+	download_limits = crawler_download.DownloadLimits()
+	urls = [crawler_index.Url("GET", "http://" + host + ":" + str(port) + "/page?id=" + str(number)) for number in range(0, requests_sent)]
+
+	start = time.perf_counter()
+	with ThreadPoolExecutor(max_workers=threads) as executor:
+		list(executor.map(lambda url: crawler_engine.fetchUrl(session, url, 5, {}, download_limits), urls))
+
+	return time.perf_counter() - start, download_limits.bytes_downloaded
+
+server = SiteServer(("127.0.0.1", 0), SiteHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+port = server.server_address[1]
+
+print(str(requests_sent) + " requests, " + str(threads) + " in flight at once, " + str(latency) + " ms server latency:")
+
+for name, session in [("no keep-alive", getClosingSession()), ("default session", getDefaultSession()), ("crawler_transport session", crawler_transport.getSession("bench", threads))]:
+
+	connections[0] = 0
+	elapsed, bytes_downloaded = fetchAll(session, "127.0.0.1", port)
+	print("    " + name.ljust(26) + str(round(elapsed * 1000)).rjust(6) + " ms, " + str(round(requests_sent / elapsed)).rjust(5) + " requests/s, " + str(connections[0]).rjust(5) + " connections, " + str(round(bytes_downloaded / 1024)).rjust(6) + " KB")
+
+# looking up "localhost" goes through the resolver (e.g /etc/hosts, or nsswitch) every time, unless it is cached
+dns_cache = crawler_transport.DnsCache()
+for name, resolve in [("uncached", socket.getaddrinfo), ("DnsCache", dns_cache.getaddrinfo)]:
+
+	start = time.perf_counter()
+	for repeat in range(0, 1000):
+		resolve("localhost", port, 0, socket.SOCK_STREAM)
+	print("1000 lookups of localhost, " + name.ljust(9) + str(round((time.perf_counter() - start) * 1000, 1)).rjust(7) + " ms")
+
+server.shutdown()
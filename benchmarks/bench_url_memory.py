@@ -0,0 +1,75 @@
+#!/usr/bin/python
+
+# measures how much memory a million discovered URLs take, as crawler_index.Url records and as the dictionaries the crawler used to keep,
+# and how long it takes to check whether a URL has already been discovered
+# run from the repository root: python benchmarks/bench_url_memory.py
+
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler_index
+
+from urllib import parse
+
+# how the signature used to be worked out, by parsing the URL every time it was compared
+def getDictionarySignature(url, parameter_value_pattern=re.compile("\\=.*")):
+
+	parameters = parse.urlparse(url["body"]).query.split("&")
+
+	for index in range(0, len(parameters)):
+		parameters[index] = parameter_value_pattern.sub("", parameters[index])
+
+	parameters.sort()
+
+	return (url["type"], tuple(parameters))
+
+# generates n URLs, each one with its own parameter names, so every one of them is new (as every discovered URL is)
+def generateBodies(n):
+
+	return ["https://www.example.com/catalog/section" + str(counter % 50) + "/item" + str(counter) + ".php?id" + str(counter) + "=" + str(counter * 7) + "&ref=home" for counter in range(0, n)]
+
+# returns how many bytes the records, and the set of their signatures, take up, per URL
+def measureMemory(bodies, makeRecord, getSignature):
+
+	tracemalloc.start()
+	start = tracemalloc.get_traced_memory()[0]
+
+	records = []
+	signatures = set()
+	for body in bodies:
+		record = makeRecord(body)
+		records.append(record)
+		signatures.add(getSignature(record))
+
+	used = tracemalloc.get_traced_memory()[0] - start
+	tracemalloc.stop()
+
+	return used / len(bodies)
+
+# returns how long it takes to check whether each URL is already in the set of signatures, in microseconds per URL
+def measureChecks(records, getSignature):
+
+	signatures = set([getSignature(record) for record in records])
+
+	start = time.perf_counter()
+	for record in records:
+		getSignature(record) in signatures
+	return (time.perf_counter() - start) / len(records) * 1000000
+
+n = 1000000
+bodies = generateBodies(n)
+
+dictionary_bytes = measureMemory(bodies, lambda body: {"type":"GET", "body":body}, getDictionarySignature)
+record_bytes = measureMemory(bodies, lambda body: crawler_index.Url("GET", body), crawler_index.getUrlSignature)
+
+dictionaries = [{"type":"GET", "body":body} for body in bodies[0:100000]]
+records = [crawler_index.Url("GET", body) for body in bodies[0:100000]]
+
+print("average URL length: " + str(round(sum([len(body) for body in bodies]) / n, 1)) + " characters")
+print("dictionaries:".ljust(16) + str(round(dictionary_bytes * n / 1024 / 1024)).rjust(6) + " MB per million URLs (including the signature index), " + str(round(measureChecks(dictionaries, getDictionarySignature), 2)).rjust(6) + " us per seen-check")
+print("Url records:".ljust(16) + str(round(record_bytes * n / 1024 / 1024)).rjust(6) + " MB per million URLs (including the signature index), " + str(round(measureChecks(records, crawler_index.getUrlSignature), 2)).rjust(6) + " us per seen-check")
@@ -0,0 +1,64 @@
+#!/usr/bin/python
+
+# measures how page extraction scales with the number of worker processes (see the --workers option)
+# run from the repository root: python benchmarks/bench_workers.py [directory of saved .html pages]
+# if no directory is given, a corpus of form-heavy pages is generated instead
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler_functions
+
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+harvest_options = {"scheme":"https", "host":"www.example.com", "href":True, "iframe":True, "submit_get_forms":True, "submit_post_forms":True}
+
+def generatePage(number):
+
+	page = "<html><body>"
+	for counter in range(0, 200):
+		page += "<a href='/page" + str(number) + "/" + str(counter) + "?id" + str(counter) + "=1'>link</a>"
+	for counter in range(0, 5):
+		page += "<form method='get' action='/search" + str(counter) + "'><input type='text' name='q" + str(counter) + "'/><input type='email' name='email'/>"
+		page += "<input type='radio' name='sort' value='asc'/><input type='radio' name='sort' value='desc'/>"
+		page += "<select name='category'><option value='1'>1</option><option value='2'>2</option></select><textarea name='comment' rows='4' cols='40'></textarea></form>"
+		page += "<form method='post' action='/submit" + str(counter) + "'><input type='text' name='name'/><input type='password' name='password'/><input type='checkbox' name='remember'/></form>"
+	page += "</body></html>"
+	return page
+
+def loadCorpus():
+
+	if len(sys.argv) > 1:
+		pages = []
+		for filename in sorted(os.listdir(sys.argv[1])):
+			pages.append(open(os.path.join(sys.argv[1], filename), errors="replace").read())
+		return pages
+
+	return [generatePage(number) for number in range(0, 200)]
+
+pages = loadCorpus()
+baseline = None
+
+for workers in [1, 2, 4, 8]:
+
+	if workers > 2 * os.cpu_count():
+		break
+
+	with ProcessPoolExecutor(max_workers=workers) as process_pool:
+		# warm up the workers first, so process start-up isn't counted
+		list(process_pool.map(partial(crawler_functions.extractPageData, **harvest_options), pages[0:workers]))
+
+		start = time.perf_counter()
+		list(process_pool.map(partial(crawler_functions.extractPageData, **harvest_options), pages, chunksize=4))
+		elapsed = time.perf_counter() - start
+
+	if baseline is None:
+		baseline = elapsed
+
+	print(str(workers).rjust(2) + " workers: " + str(round(len(pages) / elapsed, 1)).rjust(8) + " pages/s, speed-up " + str(round(baseline / elapsed, 2)) + "x")
+
+print(str(os.cpu_count()) + " CPU(s) available")
@@ -0,0 +1,166 @@
+import json
+import sqlite3
+import crawler_index
+
+# what a previous crawl discovered, read back from its output (in any of the formats of crawler_output), so that a crawl can be run as a diff against it
+# filenames are read in order: the first is usually a full output, and each of the others a diff that was written against the ones before it
+# (i.e a diff's added URLs are added to the baseline, and its removed ones are taken out of it), so a daily diff can be run against yesterday's baseline
+# the URLs in the baseline are the seeds of the crawl: they are put in the discovered URLs before the crawl starts, so every URL with the same signature
+# as one of them already counts as discovered (see crawler_index.getUrlSignature), and they are all visited again
+# the seeds that were added by the last diff (i.e whose signatures were new last time) are put first, so they are visited before the others
+# it is one of the listeners of crawler_index.DiscoveredUrls, and passes every URL that was discovered on to the output,
+# unless it has the same signature as one of the seeds, which makes the output only the URLs that were added since the baseline
+# and at the end of the crawl, the seeds whose signatures weren't found again on any page are the removed ones (see getRemovedUrls)
+class Baseline:
+
+	def __init__(self, filenames):
+
+		self.urls = {} # maps (type, body) to the change it was last read with: "" for a URL in a full output, or "+" for an added one
+		self.signatures = set() # the (host, signature) of every seed, see crawler_index.DiscoveredUrls.getSeenKey
+		self.discovered_urls = None
+		self.output_sink = None
+		self.added = 0
+
+		for filename in filenames:
+			self.load(filename)
+
+	def load(self, filename):
+
+		handler = open(filename, "rb")
+		is_sqlite = handler.read(16) == b"SQLite format 3\x00"
+		handler.close()
+
+		if is_sqlite:
+			entries = readSqlite(filename)
+		else:
+			entries = readLines(filename)
+
+		# the "+" of the diffs before the last one don't count, since those URLs weren't new last time
+		for key in self.urls:
+			self.urls[key] = ""
+
+		for change, url_type, body in entries:
+			if change == "-":
+				self.urls.pop((url_type, body), None)
+			else:
+				self.urls[(url_type, body)] = change
+
+	def __len__(self):
+
+		return len(self.urls)
+
+	# returns the seeds, the ones that were added by the last diff first, in the order they were read in
+	def getSeeds(self):
+
+		new_seeds = []
+		seeds = []
+
+		for (url_type, body), change in self.urls.items():
+			if change == "+":
+				new_seeds.append(crawler_index.Url(url_type, body, source="baseline_new"))
+			else:
+				seeds.append(crawler_index.Url(url_type, body, source="baseline"))
+
+		return new_seeds + seeds
+
+	# puts the seeds in the discovered URLs, and from then on passes the URLs discovered after them on to output_sink
+	def seed(self, discovered_urls, output_sink):
+
+		seeds = self.getSeeds()
+
+		discovered_urls += seeds
+		discovered_urls.unconfirmed_signatures.update([discovered_urls.getSeenKey(url) for url in seeds])
+		self.signatures.update([discovered_urls.getSeenKey(url) for url in seeds])
+
+		self.discovered_urls = discovered_urls
+		self.output_sink = output_sink
+		discovered_urls.listeners.append(self)
+
+		return seeds
+
+	# carries on with a crawl that was seeded from this baseline (see crawler_state.CrawlState), whose discovered URLs start with the seeds
+	# confirmed_signatures are the (host, signature) of the seeds that had been found again before it was stopped
+	# the URLs that had been added since the baseline are passed on to output_sink again, which has been started over
+	# returns the seeds, or None if they aren't the ones the crawl was seeded with, i.e the baseline's files have changed since
+	def resume(self, discovered_urls, output_sink, confirmed_signatures):
+
+		seeds = self.getSeeds()
+		if [url for url in discovered_urls if url.source in ["baseline_new", "baseline"]] != seeds:
+			return None
+
+		self.signatures.update([discovered_urls.getSeenKey(url) for url in seeds])
+		discovered_urls.unconfirmed_signatures.update(self.signatures - confirmed_signatures)
+
+		self.discovered_urls = discovered_urls
+		self.output_sink = output_sink
+
+		for url in discovered_urls[len(seeds):]:
+			self.recordDiscovered(url)
+
+		discovered_urls.listeners.append(self)
+
+		return seeds
+
+	def recordDiscovered(self, url):
+
+		if self.discovered_urls.getSeenKey(url) not in self.signatures:
+			self.added += 1
+			self.output_sink.recordDiscovered(url)
+
+	def recordVisited(self, visited):
+
+		self.output_sink.recordVisited(visited)
+
+	# returns the seeds whose signatures weren't found again, which only means they are gone if the crawl ran to the end
+	def getRemovedUrls(self, discovered_urls, seeds):
+
+		return [url for url in seeds if discovered_urls.getSeenKey(url) in discovered_urls.unconfirmed_signatures]
+
+# returns the (change, type, body) of each URL in a file written by crawler_output.TextSink or JsonLinesSink, where the change is "+", "-", or "" for a full output
+# lines that can't be read (e.g the last line, if the crawler was stopped in the middle of writing it) are skipped
+def readLines(filename):
+
+	entries = []
+	handler = open(filename, "r")
+
+	for line in handler:
+
+		line = line.strip()
+
+		if line.startswith("{"):
+			try:
+				entry = json.loads(line)
+				entries.append(({"added":"+", "removed":"-"}.get(entry.get("change"), ""), entry["type"], entry["body"]))
+			except (ValueError, KeyError, AttributeError):
+				pass
+			continue
+
+		change = ""
+		if line[:2] in ["+ ", "- "]:
+			change = line[0]
+			line = line[2:]
+
+		url_type, space, body = line.partition(" ")
+		if space and body:
+			entries.append((change, url_type, body))
+
+	handler.close()
+
+	return entries
+
+# returns the (change, type, body) of each URL in a database written by crawler_output.SqliteSink, from its 'urls' table, or its 'changes' table if it is a diff
+def readSqlite(filename):
+
+	connection = sqlite3.connect(filename)
+	tables = [row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+
+	if "changes" in tables:
+		rows = connection.execute("SELECT CASE change WHEN 'removed' THEN '-' ELSE '+' END, type, body FROM changes ORDER BY rowid").fetchall()
+	elif "urls" in tables:
+		rows = connection.execute("SELECT '', type, body FROM urls ORDER BY rowid").fetchall()
+	else:
+		rows = []
+
+	connection.close()
+
+	return rows
@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import crawler_metrics
+import crawler_normalizer
+
+# an on-disk cache of what was found on each page, so that a crawl of a website that was crawled before only has to harvest what has changed since
+# for each page, it keeps the ETag and Last-Modified headers it was served with, a hash of its body, and its page data (see crawler_functions.extractPageData)
+# along with its fingerprint (see crawler_fingerprint), if it had one
+# GET requests for pages that are in the cache are sent with If-None-Match and If-Modified-Since headers (see getHeaders),
+# and if the server answers 304 Not Modified, or sends the same page again, the page data is taken from the cache, instead of the page being parsed again
+# entries are keyed by their method and normalized URL (see crawler_normalizer), and by 'variant', which is whatever else the page data depends on
+# (i.e the harvest options, since e.g a page harvested without --get doesn't have any GET form submissions in its page data)
+# the cache is kept to max_size bytes (of page data) by evicting the least recently used entries
+# it is a SQLite database, in a file called cache.sqlite, in the given directory
+# (pages are requested on more than one thread at once, when crawling concurrently, so the database is only used under a lock)
+class HttpCache:
+
+	def __init__(self, directory, max_size=100*1024*1024, variant=""):
+
+		os.makedirs(directory, exist_ok=True)
+
+		self.max_size = max_size
+		self.variant = variant
+		self.lock = threading.Lock()
+
+		self.connection = sqlite3.connect(os.path.join(directory, "cache.sqlite"), check_same_thread=False)
+		self.connection.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body_hash TEXT NOT NULL, page_data TEXT NOT NULL, fingerprint TEXT, size INTEGER NOT NULL, last_used REAL NOT NULL)")
+		self.connection.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+		self.connection.commit()
+
+		self.size = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+		self.uncommitted = 0
+		self.last_commit = time.time()
+
+		self.not_modified = 0 # pages the server answered 304 Not Modified for
+		self.unchanged = 0 # pages the server sent again, which were the same as before
+		self.stored = 0
+		self.evicted = 0
+
+	def getKey(self, url):
+
+		normalized_url = crawler_normalizer.normalizeUrl(url.body, url.body) or url.body
+		return hashlib.blake2b((url.type + " " + normalized_url + " " + self.variant).encode(), digest_size=16).hexdigest()
+
+	def load(self, key):
+
+		with self.lock:
+			return self.connection.execute("SELECT etag, last_modified, body_hash, page_data, fingerprint FROM entries WHERE key = ?", (key,)).fetchone()
+
+	# returns the headers to send along with the request for url, to only have the page sent if it has changed since it was cached
+	def getHeaders(self, url):
+
+		if url.type != "GET":
+			return {}
+
+		entry = self.load(self.getKey(url))
+		if entry is None:
+			return {}
+
+		etag, last_modified = entry[0], entry[1]
+		headers = {}
+
+		if etag:
+			headers["If-None-Match"] = etag
+		if last_modified:
+			headers["If-Modified-Since"] = last_modified
+
+		return headers
+
+	# returns the page data and fingerprint of the page at url, from the cache, if the response says it hasn't changed, or else None
+	# (the fingerprint is None if the page was cached without one)
+	def getPage(self, url, http_response, html_text):
+
+		key = self.getKey(url)
+		entry = self.load(key)
+
+		if entry is None:
+			return None
+
+		if http_response.status_code == 304:
+			self.not_modified += 1
+			crawler_metrics.count("cache_not_modified")
+		elif http_response.status_code == 200 and html_text and entry[2] == getBodyHash(html_text):
+			self.unchanged += 1
+			crawler_metrics.count("cache_unchanged")
+		else:
+			return None
+
+		with self.lock:
+			self.connection.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+			self.commitIfDue()
+
+		page_data = [tuple(page_url) for page_url in json.loads(entry[3])]
+
+		if entry[4] is None:
+			return page_data, None
+
+		exact_hash, simhash = json.loads(entry[4])
+		return page_data, (bytes.fromhex(exact_hash), simhash)
+
+	# caches the page data (and fingerprint, if there is one) of a page that was harvested, unless the response wasn't a 200 OK
+	def store(self, url, http_response, html_text, page_data, fingerprint=None):
+
+		if http_response.status_code != 200:
+			return
+
+		page_data_text = json.dumps(page_data)
+
+		if fingerprint is not None:
+			fingerprint_text = json.dumps([fingerprint[0].hex(), fingerprint[1]])
+		else:
+			fingerprint_text = None
+
+		size = len(page_data_text)
+		key = self.getKey(url)
+
+		with self.lock:
+
+			old_entry = self.connection.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+			if old_entry is not None:
+				self.size -= old_entry[0]
+
+			self.connection.execute("INSERT OR REPLACE INTO entries (key, etag, last_modified, body_hash, page_data, fingerprint, size, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+				(key, http_response.headers.get("ETag"), http_response.headers.get("Last-Modified"), getBodyHash(html_text), page_data_text, fingerprint_text, size, time.time()))
+
+			self.size += size
+			self.stored += 1
+
+			if self.size > self.max_size:
+				self.evict()
+
+			self.commitIfDue()
+
+		crawler_metrics.count("cache_stored")
+
+	# evicts the least recently used entries, until the cache is down to 90% of max_size, so that it doesn't have to evict again on the very next page
+	# (only called with the lock held)
+	def evict(self):
+
+		while self.size > self.max_size * 0.9:
+
+			oldest_entries = self.connection.execute("SELECT key, size FROM entries ORDER BY last_used LIMIT 100").fetchall()
+			if len(oldest_entries) == 0:
+				self.size = 0
+				break
+
+			for key, size in oldest_entries:
+
+				self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+				self.size -= size
+				self.evicted += 1
+
+				if self.size <= self.max_size * 0.9:
+					break
+
+	# committing is what writes to disk, so it is only done every 100 changes, or every 5 seconds
+	# (only called with the lock held)
+	def commitIfDue(self):
+
+		self.uncommitted += 1
+
+		if self.uncommitted >= 100 or time.time() - self.last_commit >= 5:
+			self.connection.commit()
+			self.uncommitted = 0
+			self.last_commit = time.time()
+
+	def close(self):
+
+		with self.lock:
+			self.connection.commit()
+			self.connection.close()
+
+def getBodyHash(html_text):
+
+	return hashlib.blake2b(html_text.encode(errors="replace"), digest_size=16).hexdigest()
@@ -0,0 +1,145 @@
+import threading
+
+# the content types that are worth harvesting, i.e that lxml can find links and forms in
+html_content_types = ["text/html", "application/xhtml+xml"]
+
+# file extensions that almost never turn out to be HTML pages, which are worth sending a HEAD request for first (see DownloadLimits.probeUrl)
+binary_extensions = set(["7z", "avi", "bin", "bmp", "bz2", "dmg", "doc", "docx", "exe", "flac", "gif", "gz", "ico", "iso", "jar", "jpeg", "jpg",
+	"m4a", "mkv", "mov", "mp3", "mp4", "mpeg", "msi", "odt", "ogg", "otf", "pdf", "png", "ppt", "pptx", "rar", "svg", "tar", "tgz", "tif", "tiff",
+	"ttf", "wav", "webm", "webp", "woff", "woff2", "xls", "xlsx", "xz", "zip"])
+
+# how much of a response body is read at a time
+chunk_size = 65536
+
+# returns True if the response's Content-Type header says it is HTML, or doesn't say what it is
+def isHtmlContentType(http_response):
+
+	content_type = http_response.headers.get("Content-Type")
+	if not content_type:
+		return True
+
+	return content_type.partition(";")[0].strip().lower() in html_content_types
+
+# returns True if the path ends in one of the binary_extensions, e.g "/files/report.pdf"
+def hasBinaryExtension(path):
+
+	filename = path.rpartition("/")[2]
+	return "." in filename and filename.rpartition(".")[2].lower() in binary_extensions
+
+# returns the size of the response body, according to its Content-Length header, or None if it doesn't have one
+def getContentLength(http_response):
+
+	try:
+		return int(http_response.headers.get("Content-Length"))
+	except (TypeError, ValueError):
+		return None
+
+# decides how much of each response is downloaded, so that the crawler doesn't download (and then try to parse) images, PDFs, and huge files
+# responses are streamed, so that as soon as their headers arrive, anything that isn't HTML can be dropped, and the connection closed,
+# and a body that is bigger than max_size bytes is cut off there, and only what was read of it is harvested (0 means no limit)
+# if probe is True, GET URLs which look like binary files (see binary_extensions) are sent a HEAD request first, and only requested if it says they are HTML
+# it also counts how many bytes were downloaded, and roughly how many weren't, for reporting at the end of the crawl
+# (responses are read on more than one thread at once, when crawling concurrently, so the counts are kept under a lock)
+class DownloadLimits:
+
+	def __init__(self, max_size=0, probe=False):
+
+		self.max_size = max_size
+		self.probe = probe
+		self.lock = threading.Lock()
+
+		self.bytes_downloaded = 0
+		self.bytes_saved = 0 # only counts what the Content-Length headers of the dropped and cut off responses said was left of them
+		self.skipped = 0 # responses that weren't downloaded, because they weren't HTML
+		self.truncated = 0 # responses that were cut off at max_size
+		self.probed = 0 # URLs that were only sent a HEAD request
+
+	# the same as session.get() for a discovered URL (see crawler_engine.fetchUrl), except that only as much of the response is downloaded as these limits allow
+	# the response's body is empty if it wasn't downloaded, so there is nothing to harvest in it
+	def get(self, session, url, timeout=5, proxy={}, headers=None):
+
+		if self.probe and hasBinaryExtension(url.path):
+			http_response = self.probeUrl(session, url.body, timeout, proxy)
+			if http_response is not None:
+				return http_response
+
+		return self.download(session.get(url.body, timeout=timeout, proxies=proxy, headers=headers, stream=True))
+
+	# the same as get(), for session.post()
+	def post(self, session, url, post_parameters, timeout=5, proxy={}, headers=None):
+
+		return self.download(session.post(url, data=post_parameters, timeout=timeout, proxies=proxy, headers=headers, stream=True))
+
+	# sends a HEAD request for a URL that looks like a binary file, and returns the response if it turns out not to be worth requesting,
+	# or None if it is (or if the server doesn't answer HEAD requests properly)
+	def probeUrl(self, session, url, timeout=5, proxy={}):
+
+		http_response = session.head(url, timeout=timeout, proxies=proxy, allow_redirects=True)
+
+		if http_response.status_code >= 400:
+			return None
+
+		if isHtmlContentType(http_response):
+			return None
+
+		with self.lock:
+			self.probed += 1
+			self.bytes_saved += getContentLength(http_response) or 0
+
+		# the body is what requests reads response.text and response.content from
+		http_response._content = b""
+		return http_response
+
+	# reads the body of a streamed response, unless it isn't HTML, and only up to max_size bytes of it
+	def download(self, http_response):
+
+		content_length = getContentLength(http_response)
+
+		if not isHtmlContentType(http_response):
+			http_response.close()
+			http_response._content = b""
+
+			with self.lock:
+				self.skipped += 1
+				self.bytes_saved += content_length or 0
+
+			return http_response
+
+		chunks = []
+		size = 0
+
+		while self.max_size == 0 or size < self.max_size:
+
+			# never more than is left under max_size, so that a body that is smaller than a chunk isn't read in full anyway
+			chunk = readChunk(http_response, chunk_size if self.max_size == 0 else min(chunk_size, self.max_size - size))
+			if not chunk:
+				break
+
+			chunks.append(chunk)
+			size += len(chunk)
+
+		# what was read, as it came over the wire (i.e before it was decompressed, if it was compressed)
+		wire_size = http_response.raw.tell()
+
+		# a body that ends right at max_size was read in full, which its Content-Length header (if it has one) tells us
+		truncated = self.max_size > 0 and size >= self.max_size and (content_length is None or wire_size < content_length)
+
+		# this hands the connection back to the connection pool if the whole body was read, and otherwise closes it
+		http_response.close()
+		http_response._content = b"".join(chunks)[:self.max_size or None]
+
+		with self.lock:
+			self.bytes_downloaded += wire_size
+
+			if truncated:
+				self.truncated += 1
+				if content_length is not None:
+					self.bytes_saved += max(content_length - wire_size, 0)
+
+		return http_response
+
+# reads up to 'size' more bytes of a streamed response's body, or returns b"" once all of it has been read
+# (through iter_content, so that a failed read raises the same requests exceptions as reading the body any other way does)
+def readChunk(http_response, size):
+
+	return next(http_response.iter_content(size), b"")
@@ -0,0 +1,496 @@
+import time
+import asyncio
+import requests
+import crawler_frontier
+import crawler_fingerprint
+import crawler_functions
+import crawler_index
+import crawler_metrics
+import crawler_robots
+import crawler_scheduler
+
+from lxml import etree
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# request failures that are worth trying again, i.e timeouts and failed connections
+retriable_exceptions = (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
+
+# the same as sendRequest, except that it counts the request, its response's status class (e.g "responses_2xx") or the error it failed with,
+# and records how long it took, and how many requests are in flight (see crawler_metrics)
+# if there is an HTTP cache (see crawler_cache.HttpCache), pages that are in it are only sent again if they have changed
+def fetchUrl(session, url, timeout=5, proxy={}, download_limits=None, http_cache=None):
+
+	fetch_start = time.perf_counter()
+	crawler_metrics.adjust("in_flight", 1)
+
+	if http_cache is not None:
+		headers = http_cache.getHeaders(url)
+	else:
+		headers = None
+
+	try:
+		http_response = sendRequest(session, url, timeout, proxy, download_limits, headers)
+	except Exception as exception:
+		crawler_metrics.count(crawler_metrics.getErrorName(exception))
+		raise
+	finally:
+		crawler_metrics.adjust("in_flight", -1)
+		crawler_metrics.recordTime("fetch", time.perf_counter() - fetch_start)
+
+	if http_response is not None:
+		crawler_metrics.count("requests")
+		crawler_metrics.count("responses_" + str(http_response.status_code)[0] + "xx")
+
+	return http_response
+
+# sends the HTTP request for a single discovered URL, and returns the response
+# GET URLs are requested as they are, and POST URLs have their query string sent as the request body instead
+# if there are download limits (see crawler_download.DownloadLimits), only as much of the response is downloaded as they allow
+# returns None if the URL can't be requested, e.g an unknown URL type or a malformed POST URL
+# headers are sent along with the request, on top of the session's own
+def sendRequest(session, url, timeout=5, proxy={}, download_limits=None, headers=None):
+
+	if url.type == "GET":
+		if download_limits is not None:
+			return download_limits.get(session, url, timeout, proxy, headers)
+		return session.get(url.body, timeout=timeout, proxies=proxy, headers=headers)
+
+	elif url.type == "POST":
+
+		if url.query is None:
+			return None
+
+		direct_url = url.origin + url.path
+		post_parameters = crawler_functions.getDictionaryFromQueryString(url.query)
+
+		if download_limits is not None:
+			return download_limits.post(session, direct_url, post_parameters, timeout, proxy, headers)
+		return session.post(direct_url, data=post_parameters, timeout=timeout, proxies=proxy, headers=headers)
+
+	# this should never happen, but just in case
+	return None
+
+# harvests a response and adds whatever it finds to discovered_urls, at the given depth (see addNewUrls)
+# if there is a page index (see crawler_fingerprint.PageIndex), pages which are duplicates of one that has already been harvested are skipped
+# if there is an HTTP cache (see crawler_cache.HttpCache), pages that haven't changed since they were cached aren't parsed again, and the others are cached
+# (url is the discovered URL the response is for, which the page index and the HTTP cache need to know)
+# returns False if the page couldn't be harvested, e.g because lxml isn't able to parse it
+def harvestResponse(http_response, discovered_urls, harvest_options, depth=1, url=None, page_index=None, http_cache=None):
+
+	html_text = str(http_response.text)
+
+	if http_cache is not None and url is not None:
+		cached_page = http_cache.getPage(url, http_response, html_text)
+		if cached_page is not None:
+			page_data, fingerprint = cached_page
+			if page_index is None or fingerprint is None or not checkPage(page_index, url, fingerprint):
+				addNewUrls(discovered_urls, crawler_functions.filterPageData(page_data, discovered_urls), depth)
+			return True
+
+	if not html_text:
+		# e.g a response that wasn't downloaded, because it wasn't HTML (see crawler_download.DownloadLimits)
+		return False
+
+	fingerprint = None
+
+	if page_index is not None:
+		fingerprint = getPageFingerprint(html_text, page_index)
+		if checkPage(page_index, url, fingerprint):
+			# the page is the same as (or nearly the same as) one that has already been harvested, so there is nothing new on it
+			return True
+
+	harvest_start = time.perf_counter()
+
+	# if the crawl is being profiled (see crawler_metrics.profiler), this is the part of it that is
+	crawler_metrics.startProfiling()
+
+	try:
+		if http_cache is not None and url is not None:
+			page_data = crawler_functions.extractPageData(html_text, page_url=http_response.url, **harvest_options)
+			http_cache.store(url, http_response, html_text, page_data, fingerprint)
+			new_urls = crawler_functions.filterPageData(page_data, discovered_urls)
+		else:
+			new_urls = crawler_functions.harvestAllData(html_text, old_urls=discovered_urls, page_url=http_response.url, **harvest_options)
+	except (ValueError, etree.LxmlError):
+		# just in case the HTML document is weird (or empty) and lxml isn't able to parse it
+		return False
+	finally:
+		crawler_metrics.stopProfiling()
+
+	addNewUrls(discovered_urls, new_urls, depth)
+
+	if page_index is not None:
+		page_index.recordHarvestTime(time.perf_counter() - harvest_start)
+
+	return True
+
+# the same as crawler_fingerprint.getPageFingerprint, except that the time it takes is recorded in the page index, and as part of "dedup" (see crawler_metrics)
+def getPageFingerprint(html_text, page_index):
+
+	fingerprint_start = time.perf_counter()
+	fingerprint = crawler_fingerprint.getPageFingerprint(html_text)
+	elapsed = time.perf_counter() - fingerprint_start
+
+	page_index.recordFingerprintTime(elapsed)
+	crawler_metrics.recordTime("dedup", elapsed)
+
+	return fingerprint
+
+# the same as page_index.checkPage, except that the time it takes is recorded as part of "dedup" (see crawler_metrics)
+def checkPage(page_index, url, fingerprint):
+
+	check_start = time.perf_counter()
+	duplicate = page_index.checkPage(url, fingerprint)
+	crawler_metrics.recordTime("dedup", time.perf_counter() - check_start)
+
+	return duplicate
+
+# the same as crawler_functions.extractPageData, run in a worker process, except that it also returns how long it took,
+# and whatever metrics the worker recorded while it was at it, for the crawler's own process to add to its own (see crawler_metrics.Metrics.take)
+def extractTimedPageData(html_text, **harvest_options):
+
+	extract_start = time.perf_counter()
+	page_data = crawler_functions.extractPageData(html_text, **harvest_options)
+
+	return page_data, time.perf_counter() - extract_start, crawler_metrics.metrics.take()
+
+# adds newly found URLs to discovered_urls, recording their depth, i.e how many links away from the start URLs they were found
+# (the start URLs themselves are at depth 0, so whatever is found on them is at depth 1, and so on)
+def addNewUrls(discovered_urls, new_urls, depth=1):
+
+	for new_url in new_urls:
+		new_url.depth = depth
+
+	discovered_urls += new_urls
+
+# returns the reason to stop crawling ("max-time" or "max-results"), or None if we can keep going
+def getStopReason(discovered_urls, start_time, max_time, max_results):
+
+	if int(time.time()) - start_time > max_time:
+		return "max-time"
+
+	if len(discovered_urls) >= max_results:
+		return "max-results"
+
+	return None
+
+# visits every discovered URL, one at a time, harvesting each page before requesting the next one
+# the frontier (see crawler_frontier) decides which URL to visit next, and by default that is the order they were discovered in
+# URLs which have already been visited (e.g if this crawl is being resumed from a crawl state) are skipped
+# the robots.txt of each website the frontier is holding URLs back for (see crawler_frontier.Frontier.getHeldOrigins) is fetched before the next URL is visited
+# returns why the crawl stopped: "max-time", "max-results" or "finished"
+def crawlSerially(session, discovered_urls, harvest_options, timeout=5, proxy={}, use_cookies=False, scheduler=None, start_time=0, max_time=600, max_results=300, frontier=None, page_index=None, download_limits=None, http_cache=None):
+
+	if frontier is None:
+		frontier = crawler_frontier.Frontier(discovered_urls)
+
+	while True:
+
+		for origin in frontier.getHeldOrigins():
+			frontier.addRules(origin, frontier.robots.fetchRules(origin))
+
+		position = frontier.pop()
+		if position is None:
+			break
+
+		harvested = visitUrl(session, discovered_urls[position], discovered_urls, harvest_options, timeout, proxy, use_cookies, scheduler, page_index, download_limits, http_cache)
+
+		# if the crawler is interrupted in the middle of visiting a URL, that URL doesn't count as visited
+		discovered_urls.recordVisited(position)
+
+		if not harvested:
+			continue
+
+		# and now to determine whether or not to exit
+		stop_reason = getStopReason(discovered_urls, start_time, max_time, max_results)
+		if stop_reason:
+			return stop_reason
+
+	return "finished"
+
+# fetches and harvests a single URL, adding whatever it finds to discovered_urls
+# returns False if the page couldn't be fetched or harvested
+def visitUrl(session, url, discovered_urls, harvest_options, timeout=5, proxy={}, use_cookies=False, scheduler=None, page_index=None, download_limits=None, http_cache=None):
+
+	try:
+		http_response = fetchUrlPolitely(session, url, timeout, proxy, scheduler, download_limits, http_cache)
+	except:
+		# this will probably only happen due to an HTTP timeout
+		return False
+
+	if http_response is None:
+		return False
+
+	crawler_functions.manageSession(use_cookies=use_cookies, session=session)
+
+	return harvestResponse(http_response, discovered_urls, harvest_options, url.depth + 1, url, page_index, http_cache)
+
+# the same as fetchUrl, except that it first waits until the scheduler (see crawler_scheduler.HostScheduler) allows a request to the URL's host
+# and if the request fails in a way that is worth trying again, it retries it (as many times as the scheduler allows), backing off each time
+def fetchUrlPolitely(session, url, timeout=5, proxy={}, scheduler=None, download_limits=None, http_cache=None):
+
+	if scheduler is None:
+		return fetchUrl(session, url, timeout, proxy, download_limits, http_cache)
+
+	host = crawler_scheduler.getUrlHost(url)
+	attempt = 0
+
+	while True:
+
+		scheduler.wait(host)
+		request_start = time.time()
+
+		try:
+			http_response = fetchUrl(session, url, timeout, proxy, download_limits, http_cache)
+		except retriable_exceptions:
+			scheduler.release(host, None, time.time() - request_start)
+			if not scheduler.shouldRetry(attempt):
+				raise
+		except:
+			scheduler.release(host, None, time.time() - request_start)
+			raise
+		else:
+			scheduler.release(host, http_response, time.time() - request_start)
+			if http_response is None or not scheduler.shouldRetry(attempt, http_response):
+				return http_response
+
+		time.sleep(scheduler.getBackoff(attempt))
+		attempt += 1
+
+# fetches a single URL on one of the executor's threads, once there are fewer than 'concurrency' requests in flight (the in_flight semaphore),
+# and then once the scheduler allows a request to the URL's host
+# (in that order, so that the requests lined up ahead of time don't all claim their host's next turns before any of them can be sent)
+# waiting only holds up this request, and not the other requests, or the harvesting of pages that have already arrived
+# requests are retried in the same way as fetchUrlPolitely
+async def fetchAsync(loop, executor, in_flight, session, url, timeout=5, proxy={}, use_cookies=False, scheduler=None, download_limits=None, http_cache=None):
+
+	host = crawler_scheduler.getUrlHost(url)
+	attempt = 0
+
+	while True:
+
+		http_response = None
+		retry = False
+
+		async with in_flight:
+
+			if scheduler is not None:
+				await scheduler.acquire(host)
+
+			request_start = time.time()
+
+			try:
+				http_response = await loop.run_in_executor(executor, fetchUrl, session, url, timeout, proxy, download_limits, http_cache)
+			except asyncio.CancelledError:
+				# the crawl is stopping, which says nothing about how the host is coping
+				if scheduler is not None:
+					scheduler.cancel(host)
+				raise
+			except retriable_exceptions:
+				retry = scheduler is not None and scheduler.shouldRetry(attempt)
+			except Exception:
+				pass
+			else:
+				retry = http_response is not None and scheduler is not None and scheduler.shouldRetry(attempt, http_response)
+
+			if scheduler is not None:
+				scheduler.release(host, http_response, time.time() - request_start)
+
+		if not retry:
+			break
+
+		await asyncio.sleep(scheduler.getBackoff(attempt))
+		attempt += 1
+
+	if http_response is None:
+		return None
+
+	if not use_cookies:
+		session.cookies.clear()
+
+	return http_response
+
+# fetches the robots.txt of the website at origin on one of the executor's threads, for the robots policy (see crawler_robots.RobotsPolicy),
+# in the same way as fetchAsync, i.e once there are fewer than 'concurrency' requests in flight, and the scheduler allows a request to its host
+# returns its rules, which are the ones for an unreachable robots.txt if it couldn't be fetched (see crawler_robots.fetchRobots)
+async def fetchRobotsAsync(loop, executor, in_flight, robots, origin, scheduler=None):
+
+	host = crawler_scheduler.getUrlHost(crawler_index.Url("GET", origin))
+	http_response = None
+
+	async with in_flight:
+
+		if scheduler is not None:
+			await scheduler.acquire(host)
+
+		request_start = time.time()
+
+		try:
+			http_response = await loop.run_in_executor(executor, partial(robots.session.get, origin + "/robots.txt", timeout=robots.timeout, proxies=robots.proxy, stream=True))
+		except asyncio.CancelledError:
+			if scheduler is not None:
+				scheduler.cancel(host)
+			raise
+		except requests.RequestException:
+			pass
+
+		if scheduler is not None:
+			scheduler.release(host, http_response, time.time() - request_start)
+
+	if http_response is None:
+		return crawler_robots.getUnreachableRules()
+
+	return await loop.run_in_executor(executor, crawler_robots.readRobots, http_response, robots.user_agent)
+
+# fetches a single URL, and then (if there is a process pool) has one of the worker processes extract the page data from it
+# returns the HTTP response if there is no process pool, and if there is, the page data from crawler_functions.extractPageData
+# along with the page's fingerprint, if there is a page index (see crawler_fingerprint.PageIndex), or else None
+# (or if there is an HTTP cache, and the page hasn't changed since it was cached, the page data and fingerprint from the cache)
+# returns None if the page couldn't be fetched or parsed
+async def fetchAndExtract(loop, executor, in_flight, process_pool, session, url, harvest_options, timeout=5, proxy={}, use_cookies=False, scheduler=None, page_index=None, download_limits=None, http_cache=None):
+
+	http_response = await fetchAsync(loop, executor, in_flight, session, url, timeout, proxy, use_cookies, scheduler, download_limits, http_cache)
+
+	if http_response is None or process_pool is None:
+		return http_response
+
+	html_text = str(http_response.text)
+
+	if http_cache is not None:
+		cached_page = http_cache.getPage(url, http_response, html_text)
+		if cached_page is not None:
+			return cached_page
+
+	if not html_text:
+		return None
+
+	fingerprint = None
+
+	if page_index is not None:
+		fingerprint = getPageFingerprint(html_text, page_index)
+
+		# the page index only ever grows, so a page which is already a duplicate will still be one when its turn to be harvested comes,
+		# and there is no need to have a worker extract anything from it
+		if page_index.findDuplicate(url, fingerprint) is not None:
+			return None, fingerprint
+
+	try:
+		page_data, elapsed, worker_metrics = await loop.run_in_executor(process_pool, partial(extractTimedPageData, html_text, page_url=http_response.url, **harvest_options))
+	except (ValueError, etree.LxmlError):
+		# just in case the HTML document is weird (or empty) and lxml isn't able to parse it
+		return None
+
+	crawler_metrics.metrics.merge(worker_metrics)
+
+	if page_index is not None:
+		page_index.recordHarvestTime(elapsed)
+
+	if http_cache is not None:
+		http_cache.store(url, http_response, html_text, page_data, fingerprint)
+
+	return page_data, fingerprint
+
+# the same as crawlSerially, except that up to 'concurrency' requests are in flight at any time
+# (and a few times as many are lined up, so that if some of them have to wait on the scheduler, the rest can go ahead)
+# responses are still harvested one at a time, and in the same order the frontier handed them out in (which is also the order they are recorded as visited in),
+# so with the default frontier, for the same website this discovers the same URLs as crawlSerially does, just without waiting on each round-trip
+# the robots.txt of each website the frontier is holding URLs back for is fetched alongside the requests, and its URLs are lined up once it has arrived
+# if workers > 0, the pages are parsed (and forms are generated) by that many worker processes,
+# and this process only has to check which of the URLs they found are new
+async def crawlConcurrently(session, discovered_urls, harvest_options, concurrency=8, timeout=5, proxy={}, use_cookies=False, scheduler=None, start_time=0, max_time=600, max_results=300, workers=0, frontier=None, page_index=None, download_limits=None, http_cache=None):
+
+	if frontier is None:
+		frontier = crawler_frontier.Frontier(discovered_urls)
+
+	loop = asyncio.get_running_loop()
+	executor = ThreadPoolExecutor(max_workers=concurrency)
+	in_flight = asyncio.Semaphore(concurrency)
+	lookahead = concurrency * 4
+
+	if workers > 0:
+		# the worker processes start their metrics over, rather than with a copy of this process's (see crawler_metrics.resetMetrics)
+		process_pool = ProcessPoolExecutor(max_workers=workers, initializer=crawler_metrics.resetMetrics)
+	else:
+		process_pool = None
+
+	pending = {} # maps each request that has been lined up to the order it was lined up in
+	positions = {} # the position in discovered_urls of each URL that has been lined up but not harvested yet, also by that order
+	responses = {} # responses (or page data) which have arrived but have not been harvested yet, also by that order
+	robots_requests = {} # maps the origin of each website whose robots.txt is being fetched to its request
+	next_fetch = next_harvest = 0
+
+	try:
+		while True:
+
+			while len(pending) < lookahead:
+
+				position = frontier.pop()
+				if position is None:
+					break
+
+				task = asyncio.ensure_future(fetchAndExtract(loop, executor, in_flight, process_pool, session, discovered_urls[position], harvest_options, timeout, proxy, use_cookies, scheduler, page_index, download_limits, http_cache))
+				pending[task] = next_fetch
+				positions[next_fetch] = position
+				next_fetch += 1
+
+			for origin in frontier.getHeldOrigins():
+				if origin not in robots_requests:
+					robots_requests[origin] = asyncio.ensure_future(fetchRobotsAsync(loop, executor, in_flight, frontier.robots, origin, scheduler))
+
+			if len(pending) == 0 and len(robots_requests) == 0:
+				# every discovered URL has been fetched and harvested, and the last pages didn't yield anything new
+				return "finished"
+
+			# don't wait on the in-flight requests for any longer than the crawl is allowed to run for
+			remaining_time = max(start_time + max_time - time.time(), 0) + 1
+			done, _ = await asyncio.wait(list(pending) + list(robots_requests.values()), timeout=remaining_time, return_when=asyncio.FIRST_COMPLETED)
+
+			if len(done) == 0:
+				return "max-time"
+
+			for origin, task in list(robots_requests.items()):
+				if task in done:
+					del robots_requests[origin]
+					frontier.addRules(origin, task.result())
+
+			for task in done:
+				if task in pending:
+					responses[pending.pop(task)] = task.result()
+
+			while next_harvest in responses:
+
+				result = responses.pop(next_harvest)
+				position = positions.pop(next_harvest)
+				next_harvest += 1
+
+				if result is None:
+					discovered_urls.recordVisited(position)
+					continue
+
+				url = discovered_urls[position]
+
+				if process_pool is not None:
+					page_data, fingerprint = result
+					if fingerprint is None or page_index is None or not checkPage(page_index, url, fingerprint):
+						addNewUrls(discovered_urls, crawler_functions.filterPageData(page_data, discovered_urls), url.depth + 1)
+					harvested = True
+				else:
+					harvested = harvestResponse(result, discovered_urls, harvest_options, url.depth + 1, url, page_index, http_cache)
+
+				discovered_urls.recordVisited(position)
+
+				if not harvested:
+					continue
+
+				stop_reason = getStopReason(discovered_urls, start_time, max_time, max_results)
+				if stop_reason:
+					return stop_reason
+
+	finally:
+		# whatever was lined up but not harvested doesn't count as visited, so a resumed crawl will visit it again
+		for task in list(pending) + list(robots_requests.values()):
+			task.cancel()
+		executor.shutdown(wait=False, cancel_futures=True)
+		if process_pool is not None:
+			process_pool.shutdown(wait=False, cancel_futures=True)
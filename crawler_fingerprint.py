@@ -0,0 +1,150 @@
+import re
+import hashlib
+
+# the words (and numbers, tag and attribute names, etc) a page is made of, as far as telling pages apart goes
+token_pattern = re.compile("\\w+")
+
+# 2 pages count as near-duplicates if their SimHashes differ in at most this many of their 64 bits
+max_distance = 3
+
+# the SimHash is summed up in 32-bit lanes of one big integer, 1 lane per bit (see getSpreadHash)
+lane_width = 32
+lane_mask = (1 << lane_width) - 1
+
+# each byte value spread out into 8 lanes, i.e bit i of the byte becomes 1 << (i * lane_width)
+spread_bytes = [sum([1 << (bit * lane_width) for bit in range(0, 8) if byte & (1 << bit)]) for byte in range(0, 256)]
+
+# the spread hash of every token seen so far, since most tokens turn up on most pages of a website
+# it is emptied when it gets too big, so that random tokens (e.g session IDs) can't make it grow forever
+spread_hashes = {}
+max_spread_hashes = 200000
+
+# returns the fingerprint of a page: an exact hash of the whole page, and a 64-bit SimHash of the set of tokens in it
+# 2 pages which only differ by a handful of tokens (e.g a session ID, a timestamp, or the order things are listed in) have SimHashes which differ in only a few bits
+# the hashes don't depend on the process they are worked out in (unlike Python's own hash()), so worker processes can work them out too
+def getPageFingerprint(html_text):
+
+	exact_hash = hashlib.blake2b(html_text.encode(), digest_size=16).digest()
+
+	tokens = set(token_pattern.findall(html_text))
+	if len(spread_hashes) > max_spread_hashes:
+		spread_hashes.clear()
+
+	# adding up the spread hashes counts, for every bit, how many of the tokens' hashes have that bit set, all at once
+	totals = sum([spread_hashes.get(token) or getSpreadHash(token) for token in tokens])
+
+	simhash = 0
+	for bit in range(0, 64):
+		if ((totals >> (bit * lane_width)) & lane_mask) * 2 > len(tokens):
+			simhash |= 1 << bit
+
+	return exact_hash, simhash
+
+# returns a token's 64-bit hash, with each of its bits spread out into its own lane (see spread_bytes), and remembers it
+def getSpreadHash(token):
+
+	spread_hash = 0
+	for position, byte in enumerate(hashlib.blake2b(token.encode(), digest_size=8).digest()):
+		spread_hash |= spread_bytes[byte] << (position * 8 * lane_width)
+
+	spread_hashes[token] = spread_hash
+	return spread_hash
+
+# the number of bits 2 SimHashes differ in
+def getDistance(simhash, other_simhash):
+
+	return (simhash ^ other_simhash).bit_count()
+
+# keeps the fingerprints of every page that has been harvested, so that pages which are (near-)duplicates of one of them can be skipped,
+# rather than being parsed, having their forms generated, and having every URL on them checked all over again
+# a page is a duplicate if it is exactly the same as any harvested page, or if it is a near-duplicate of a harvested page with the same URL type and path
+# (since 2 URLs with the same parameter names are already the same URL, as far as the crawler is concerned, see crawler_index.getUrlSignature,
+# near-duplicates are always URLs with the same path and a few more or fewer parameters, e.g a session ID, or a sort order)
+# when a URL turns out to be a duplicate of one with fewer parameters, the extra parameters evidently don't change the page,
+# so they are recorded as ignored at that path in discovered_urls (see crawler_index.DiscoveredUrls.isOld),
+# and URLs which only differ from an already discovered one by those parameters are not discovered, and so not requested, any more
+# near-duplicates are found without comparing against every page, by splitting each SimHash into max_distance + 1 blocks,
+# one of which has to be the same in both SimHashes if they differ in at most max_distance bits (as in Manku et al., "Detecting Near-Duplicates for Web Crawling")
+class PageIndex:
+
+	def __init__(self, discovered_urls):
+
+		self.discovered_urls = discovered_urls
+		self.exact_hashes = {} # maps each exact hash to the URL of the page it belongs to
+		self.blocks = [{} for counter in range(0, max_distance + 1)] # maps (type, path, block) to the SimHashes and URLs that have that block
+		self.block_width = 64 // (max_distance + 1)
+
+		self.pages = 0 # how many pages were harvested
+		self.duplicates = 0 # how many pages were skipped, as duplicates of a harvested page
+		self.harvest_time = 0 # how long it took to harvest the pages that were harvested
+		self.fingerprint_time = 0 # how long it took to work out the fingerprints of all of them
+
+	# returns the URL of the harvested page which the page at url is a duplicate of, or None if it isn't a duplicate
+	def findDuplicate(self, url, fingerprint):
+
+		exact_hash, simhash = fingerprint
+
+		if exact_hash in self.exact_hashes:
+			return self.exact_hashes[exact_hash]
+
+		for block_number, block_key in enumerate(self.getBlockKeys(url, simhash)):
+			for other_simhash, other_url in self.blocks[block_number].get(block_key, []):
+				if getDistance(simhash, other_simhash) <= max_distance:
+					return other_url
+
+		return None
+
+	# returns True if the page at url is a duplicate, in which case whatever it tells us about the website's parameters is learned
+	# otherwise, the page is recorded, as one that is about to be harvested
+	def checkPage(self, url, fingerprint):
+
+		duplicate_url = self.findDuplicate(url, fingerprint)
+
+		if duplicate_url is not None:
+			self.duplicates += 1
+			self.learnIgnoredParameters(url, duplicate_url)
+			return True
+
+		exact_hash, simhash = fingerprint
+		self.exact_hashes[exact_hash] = url
+		for block_number, block_key in enumerate(self.getBlockKeys(url, simhash)):
+			self.blocks[block_number].setdefault(block_key, []).append((simhash, url))
+
+		self.pages += 1
+		return False
+
+	def getBlockKeys(self, url, simhash):
+
+		path = url.origin + url.path
+		return [(url.type, path, (simhash >> (block_number * self.block_width)) & ((1 << self.block_width) - 1)) for block_number in range(0, max_distance + 1)]
+
+	# if url has the same type and path as duplicate_url, and all of its parameters plus some more, the extra parameters are ignored at that path from now on
+	def learnIgnoredParameters(self, url, duplicate_url):
+
+		if url.type != duplicate_url.type or url.origin + url.path != duplicate_url.origin + duplicate_url.path:
+			return
+
+		# (a URL without a query string has a single parameter name, "")
+		parameter_names = set(url.getParameterNames()) - set([""])
+		duplicate_parameter_names = set(duplicate_url.getParameterNames()) - set([""])
+
+		if parameter_names > duplicate_parameter_names:
+			self.discovered_urls.ignoreParameters(url, parameter_names - duplicate_parameter_names)
+		elif duplicate_parameter_names > parameter_names:
+			self.discovered_urls.ignoreParameters(url, duplicate_parameter_names - parameter_names)
+
+	def recordHarvestTime(self, elapsed):
+
+		self.harvest_time += elapsed
+
+	def recordFingerprintTime(self, elapsed):
+
+		self.fingerprint_time += elapsed
+
+	# roughly how long harvesting the duplicates would have taken, going by how long the average harvested page took
+	def getHarvestTimeSkipped(self):
+
+		if self.pages == 0:
+			return 0
+
+		return self.duplicates * self.harvest_time / self.pages
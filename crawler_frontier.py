@@ -0,0 +1,192 @@
+import math
+import heapq
+
+from collections import deque
+
+# how much each source of a URL counts against it, when PriorityFrontier decides which URL to visit next
+# a form yields several URLs with the same parameter names, which is usually less new ground than a link does
+# and the URLs of a previous crawl whose signatures were new in it are the likeliest to have changed again (see crawler_baseline)
+source_costs = {
+	"href":0,
+	"sitemap":0,
+	"robots":0,
+	"baseline_new":-1,
+	"baseline":0,
+	"iframe":0.5,
+	"get":1,
+	"post":1.5,
+}
+
+# returns the part of a URL's path that path quotas are kept by, i.e the first segment of the path, along with the website it is on,
+# since each website being crawled has its own, e.g ("https://www.example.com", "/calendar") for https://www.example.com/calendar/2024/01?view=month
+def getPathPrefix(url):
+
+	return (url.origin, "/" + url.path.lstrip("/").split("/", 1)[0])
+
+# decides which discovered URL to visit next
+# this one visits them in the order they were discovered, which is how the crawler has always worked
+# max_depth: URLs more than this many links away from the start URLs are never visited (a negative number means no limit)
+# path_quota: never visit more than this many URLs with the same path prefix (see getPathPrefix, 0 means no limit)
+# robots: a crawler_robots.RobotsPolicy, if the URLs robots.txt disallows are never to be visited (None means every URL is allowed)
+# the URLs of a website whose robots.txt hasn't been fetched yet are held back (see getHeldOrigins) until its rules are added with addRules
+# URLs that are skipped because of these limits, or robots.txt, are still discovered (and written to the output), they just aren't visited
+# it is one of the listeners of crawler_index.DiscoveredUrls, so it hears about every URL as it is discovered
+class Frontier:
+
+	def __init__(self, discovered_urls, max_depth=-1, path_quota=0, robots=None):
+
+		self.discovered_urls = discovered_urls
+		self.max_depth = max_depth
+		self.path_quota = path_quota
+		self.robots = robots
+		self.path_visits = {}
+		self.skipped = 0
+		self.held = {} # maps each origin whose robots.txt is needed to the (position, priority) of the URLs held back for it
+		self.queue = deque()
+
+		# when a crawl is being resumed, every URL that hasn't been visited yet is lined up again
+		for position in range(0, len(discovered_urls)):
+			self.addUrl(position, discovered_urls[position])
+
+		discovered_urls.listeners.append(self)
+
+	def __len__(self):
+
+		return len(self.queue)
+
+	def recordDiscovered(self, url):
+
+		self.addUrl(len(self.discovered_urls) - 1, url)
+
+	def recordVisited(self, position):
+
+		pass
+
+	# lines up the URL at the given position, unless it has already been visited, is too deep, or robots.txt disallows it
+	def addUrl(self, position, url):
+
+		priority = self.getPriority(url)
+
+		if self.discovered_urls.isVisited(position):
+			self.countVisit(url)
+			return
+
+		if self.max_depth >= 0 and url.depth > self.max_depth:
+			self.skipped += 1
+			return
+
+		if self.robots is not None:
+
+			if self.robots.needsRules(url.origin):
+				self.held.setdefault(url.origin, []).append((position, priority))
+				return
+
+			if not self.robots.isAllowed(url):
+				# (the policy counts how many URLs it has disallowed)
+				return
+
+		self.push(position, priority)
+
+	# returns the origins of the websites whose robots.txt has to be fetched before the URLs held back for them can be lined up
+	def getHeldOrigins(self):
+
+		return list(self.held)
+
+	# adds the robots.txt rules of the website at origin to the robots policy, and lines up the URLs that were held back for them
+	# (in the order they were discovered, and with the priority they got then), unless robots.txt disallows them
+	def addRules(self, origin, rules):
+
+		self.robots.addRules(origin, rules)
+
+		for position, priority in self.held.pop(origin, []):
+			if self.robots.isAllowed(self.discovered_urls[position]):
+				self.push(position, priority)
+
+	# returns the position of the next URL to visit (which is then counted as visited, as far as the path quotas go),
+	# or None if there is nothing left to visit
+	def pop(self):
+
+		while len(self) > 0:
+
+			position = self.popNext()
+			url = self.discovered_urls[position]
+
+			if self.path_quota > 0 and self.path_visits.get(getPathPrefix(url), 0) >= self.path_quota:
+				self.skipped += 1
+				continue
+
+			self.countVisit(url)
+			return position
+
+		return None
+
+	def countVisit(self, url):
+
+		if self.path_quota > 0:
+			path_prefix = getPathPrefix(url)
+			self.path_visits[path_prefix] = self.path_visits.get(path_prefix, 0) + 1
+
+	# called with every discovered URL, in the order they were discovered, see PriorityFrontier
+	def getPriority(self, url):
+
+		return 0
+
+	def push(self, position, priority):
+
+		self.queue.append(position)
+
+	def popNext(self):
+
+		return self.queue.popleft()
+
+# a Frontier that visits the most promising URLs first, rather than in the order they were discovered
+# so that one deep section of a website (e.g a calendar, or endless pages of search results) can't use up the whole crawl
+# every URL gets a priority when it is discovered (the lower, the sooner it is visited), which adds up:
+# its depth, i.e how many links away from the start URLs it is
+# the cost of its source (see source_costs)
+# how crowded its path prefix already is, i.e how many URLs with the same prefix were discovered before it
+# minus how many parameter names it has that no URL of the same type had before it
+# URLs with the same priority are visited in the order they were discovered
+# the URLs are kept in a heap, so lining one up, or taking the next one, takes O(log n) time
+class PriorityFrontier(Frontier):
+
+	def __init__(self, discovered_urls, max_depth=-1, path_quota=0, robots=None):
+
+		self.heap = []
+		self.parameter_names = set()
+		self.path_prefixes = {}
+
+		Frontier.__init__(self, discovered_urls, max_depth, path_quota, robots)
+
+	def __len__(self):
+
+		return len(self.heap)
+
+	def getPriority(self, url):
+
+		path_prefix = getPathPrefix(url)
+
+		new_parameter_names = 0
+		for parameter_name in url.getParameterNames():
+
+			parameter_name = (url.type, parameter_name)
+			if parameter_name[1] and parameter_name not in self.parameter_names:
+				self.parameter_names.add(parameter_name)
+				new_parameter_names += 1
+
+		crowding = self.path_prefixes.get(path_prefix, 0)
+		self.path_prefixes[path_prefix] = crowding + 1
+
+		priority = url.depth + source_costs.get(url.source, 0)
+		priority += 0.5 * math.log2(1 + crowding)
+		priority -= 0.5 * min(new_parameter_names, 4)
+
+		return priority
+
+	def push(self, position, priority):
+
+		heapq.heappush(self.heap, (priority, position))
+
+	def popNext(self):
+
+		return heapq.heappop(self.heap)[1]
@@ -1,20 +1,51 @@
 import re
-import configparser
 import crawler_generator
+import crawler_index
+import crawler_metrics
+import crawler_normalizer
+import crawler_output
+import crawler_scope
 
-from lxml import html
+from lxml import html, etree
 from urllib import parse
-from time import sleep
-from random import choice
+from time import sleep, perf_counter
+from random import uniform
 
-config = configparser.ConfigParser()
-config.read("form_parameters.ini")
+# every XPath query the crawler uses, compiled once, rather than being built and compiled again on every page
+# anything that varies from call to call is passed in as an XPath variable, e.g xpath_queries["forms"](tree, method="get")
+xpath_queries = {
+	"forms":etree.XPath("//form[@method=$method and @action]"),
+	"base":etree.XPath("//base[@href]"),
+}
 
-get_submissions = int(config["GET"]["Submissions"])
-post_submissions = int(config["POST"]["Submissions"])
+# XPath can't take element or attribute names as variables, so the link queries are compiled once for each tag and attribute pair
+link_xpath_queries = {
+	("a", "href"):etree.XPath("//a[@href]"),
+	("iframe", "src"):etree.XPath("//iframe[@src]"),
+}
+
+# pages are decoded to text by requests, and encoded again as UTF-8 for lxml, so lxml has to be told that is what it is getting
+# otherwise, without a <meta charset> tag, it takes it to be Latin-1, and every non-ASCII character (e.g in a link) comes out garbled
+# (pages are only ever parsed by one thread at a time, in any one process, so they can share this parser)
+html_parser = html.HTMLParser(encoding="utf-8")
+
+absolute_url_pattern = re.compile("^https?\\:\\/\\/")
+leading_slash_pattern = re.compile("^\\/")
+
+# returns the compiled XPath query for links in the given tag and attribute, compiling it the first time it is needed
+def getLinkXPath(tag="a", attr="href"):
+
+	if (tag, attr) not in link_xpath_queries:
+		link_xpath_queries[(tag, attr)] = etree.XPath("//" + tag + "[@" + attr + "]")
+
+	return link_xpath_queries[(tag, attr)]
 
 # returns True or False, depending on whether the supplied URL matches the host
-def isValidHost(host, url):
+# or, if there is a scope (see crawler_scope.Scope), whether the URL is in it
+def isValidHost(host, url, scope=None):
+
+	if scope is not None:
+		return scope.isInScope(url)
 
 	parsed_url = parse.urlparse(url)
 	if parsed_url.hostname == host:
@@ -24,8 +55,7 @@ def isValidHost(host, url):
 # returns True or False, depending on whether the supplied URL is absolute or not
 def isAbsoluteUrl(url):
 
-	scheme_pattern = "^https?\\:\\/\\/"
-	if re.search(scheme_pattern, url):
+	if absolute_url_pattern.search(url):
 		return True
 	return False
 
@@ -33,38 +63,25 @@ def isAbsoluteUrl(url):
 def getAbsoluteUrl(scheme, host, url):
 
 	if not isAbsoluteUrl(url):
-		return scheme + "://" + host + "/" + re.sub("^\\/", "", url)
+		return scheme + "://" + host + "/" + leading_slash_pattern.sub("", url)
 	return url
 
 # returns True if the given URL has already been recorded, and false if not
 # if it returns False, we will want to add the URL to our list of discovered URLs
-# It only examines the URL type (e.g if it's a "GET" or "POST" URL) as well as the parameter names
+# It only examines the URL type (e.g if it's a "GET" or "POST" URL) as well as the parameter names (see crawler_index.getUrlSignature)
 # This means if 2 URLs have all the same parameter names but different parameter values, this function will still return True
 # Also, if 2 URLs have the same path, but 1 is a GET request and the other uses POST, this function will return False
 def isOldUrl(old_urls, url):
 
-	parsed_url = parse.urlparse(url["body"])
-	parameters = parsed_url.query.split("&")
+	if isinstance(old_urls, crawler_index.DiscoveredUrls):
+		return old_urls.isOld(url)
 
-	for index in range(0, len(parameters)):
-		parameters[index] = re.sub("\\=.*", "", parameters[index]) # replace all parameter values with a null string, so we just have parameter names
-
-	parameters.sort() # this is necessary, so it will produce the same string, every time
+	# a plain list of URLs has no index, so we will have to compare against every one of them
+	signature = crawler_index.getUrlSignature(url)
 
 	for old_url in old_urls:
 
-		if old_url["type"] != url["type"]:
-			continue
-
-		old_parsed_url = parse.urlparse(old_url["body"])
-		old_parameters = old_parsed_url.query.split("&")
-
-		for index in range(0, len(old_parameters)):
-			old_parameters[index] = re.sub("\\=.*", "", old_parameters[index])
-
-		old_parameters.sort()
-
-		if parameters == old_parameters:
+		if crawler_index.getUrlSignature(old_url) == signature:
 			return True
 
 	return False
@@ -97,25 +114,53 @@ def manageSession(use_cookies=True, min_delay=0, max_delay=0, session=0):
 	if not use_cookies:
 		session.cookies.clear()
 
+	delay = getBrowserDelay(min_delay, max_delay)
+	if delay:
+		sleep(delay)
+
+# returns how long to wait (in seconds) after a request, a random value between the minimum and maximum delay
+# the delays don't have to be whole numbers, e.g 0.2 and 0.5
+def getBrowserDelay(min_delay=0, max_delay=0):
+
 	if min_delay < max_delay:
-		sleep(choice(range(min_delay, max_delay)))
+		return uniform(min_delay, max_delay)
+	return 0
+
+# returns the URL the links on a page are relative to, i.e its <base href> if it has one, or otherwise the page's own URL
+# page_url is the URL the page was fetched from (after any redirects), and if it isn't known, the links are taken to be relative to the root of the host
+def getBaseUrl(tree, scheme="https", host="www.example.com", page_url=None):
+
+	if page_url is None:
+		page_url = scheme + "://" + host + "/"
+
+	base_tags = xpath_queries["base"](tree)
+	if len(base_tags) > 0:
+		return parse.urljoin(page_url, base_tags[0].attrib["href"].strip())
+
+	return page_url
 
 # given the HTML text, extracts links given a tag and attribute name, e.g "a" and "href" or "iframe" and "src"
-def extractLinks(tree, tag="a", attr="href", scheme="https", host="www.example.com", old_urls=[]):
+# source is recorded against each link (see crawler_index.Url)
+# every link is normalized (see crawler_normalizer.normalizeUrl) against base_url, which defaults to the root of the host
+# and only links on the host are kept, unless there are scope rules (see crawler_scope.getScope), in which case only links in scope are
+def extractLinks(tree, tag="a", attr="href", scheme="https", host="www.example.com", old_urls=[], source="href", base_url=None, sort_parameters=False, scope=None):
 
 	links_found = []
-	xpath_query = "//" + tag + "[@" + attr + "]"
-	xpath_results = tree.xpath(xpath_query)
+	xpath_results = getLinkXPath(tag, attr)(tree)
+
+	if scope is not None:
+		scope = crawler_scope.getScope(scope)
+
+	if base_url is None:
+		base_url = scheme + "://" + host + "/"
 
 	for xpath_result in xpath_results:
 
-		absolute_link = getAbsoluteUrl(scheme, host, xpath_result.attrib[attr])
-		if not isValidHost(host, absolute_link):
+		absolute_link = crawler_normalizer.normalizeUrl(xpath_result.attrib[attr], base_url, sort_parameters)
+		if absolute_link is None or not isValidHost(host, absolute_link, scope):
 			continue
 
-		complete_link = {}
-		complete_link["type"] = "GET"
-		complete_link["body"] = absolute_link
+		complete_link = crawler_index.Url("GET", absolute_link, source=source)
 
 		if isOldUrl(old_urls, complete_link):
 			continue
@@ -125,83 +170,35 @@ def extractLinks(tree, tag="a", attr="href", scheme="https", host="www.example.c
 	links_found = crawler_generator.stripRedundancies(links_found)
 	return links_found
 
-# extract URLs from robots.txt
-def extractRobotsUrls(scheme, host, session, timeout=3, old_urls=[], proxy={}):
-
-	host = re.sub("\\/.*$", "", host)
-	url = scheme + "://" + host + "/robots.txt"
-
-	try:
-		http_response = session.get(url, timeout=timeout, proxies=proxy)
-		crawler_functions.manageSession(use_cookies=use_cookies, min_delay=min_delay, max_delay=max_delay, session=session)
-	except:
-		return []
-
-	url_exp = "llow\\:\\s+[a-zA-Z0-9\\/\\-\\?\\&\\=\\%\\*\\.]+"
-	found_url_paths = re.findall(url_exp, http_response.text)
-
-	completed_urls = []
-
-	for index in range(0, len(found_url_paths)):
-		url_path = re.sub("^llow\\:\\s+", "", found_url_paths[index])
-
-		if isOldUrl(old_urls, {"type":"GET", "body":scheme + "://" + host + url_path}):
-			continue
-
-		completed_urls.append({"type":"GET", "body":getAbsoluteUrl(scheme, host, url_path)})
-
-	completed_urls = crawler_generator.stripRedundancies(completed_urls)
-
-	return completed_urls
-
-# parses HTML for sitemap data, useful for crawling /sitemap.xml pages
-def extractSiteMap(session, scheme="https", host="www.example.com", old_urls=[], timeout=3, proxy={}):
-
-	pages_found = []
-	xpath_query = "//sitemap/loc"
-	url = scheme + "://" + re.sub("\\/.+$", "", host) + "/sitemap.xml"
-
-	try:
-		http_response = session.get(url, timeout=timeout, proxies=proxy)
-		crawler_functions.manageSession(use_cookies=use_cookies, min_delay=min_delay, max_delay=max_delay, session=session)
-	except:
-		return []
-
-	try:
-		http_response_text = http_response.text
-		http_response_text = http_response_text.encode()
-	except:
-		pass
-
-	tree = html.fromstring(http_response_text)
-	xpath_results = tree.xpath(xpath_query)
+# returns a list of form descriptors (see getFormDescriptor), for every form that hasn't already been discovered,
+# as long as the action path is either relative or references the given host (or is in scope, see extractLinks)
+# form_type = either 'get' or 'post'
+def extractForms(tree, form_type="GET", scheme="https", host="www.example.com", old_urls=[], base_url=None, scope=None):
 
-	for xpath_result in xpath_results:
+	forms_found = []
 
-		text_content = xpath_result.text_content()
+	for form in getForms(tree, form_type, scheme, host, base_url, scope):
 
-		if not re.search("^(http|https|ftp)\\:\\/\\/", text_content):
-			# just in case some other garbage is put inside of the <sitemap><loc> tags, that is not a valid URL
+		if isOldUrl(old_urls, crawler_index.Url(form["type"], form["key"])):
 			continue
 
-		if not isValidHost(host, text_content):
-			continue
+		forms_found.append(form)
 
-		if isOldUrl(old_urls, {"type":"GET", "body":text_content}):
-			continue
+	return forms_found
 
-		pages_found.append({"type":"GET", "body":text_content})
+# returns a list of form descriptors, for every form whose action path is either relative or references the given host
+# whether or not it has already been discovered
+# the action is normalized, and checked against the scope rules, in the same way as links are (see extractLinks)
+def getForms(tree, form_type="GET", scheme="https", host="www.example.com", base_url=None, scope=None):
 
-	pages_found = crawler_generator.stripRedundancies(pages_found)
-	return pages_found
+	forms_found = []
+	xpath_results = xpath_queries["forms"](tree, method=form_type.lower())
 
-# returns a list of HTML texts, containing all of the data in a <form> tag, as long as the action path is either relative or references the given host
-# form_type = either 'get' or 'post'
-def extractForms(tree, form_type="GET", scheme="https", host="www.example.com", old_urls=[]):
+	if scope is not None:
+		scope = crawler_scope.getScope(scope)
 
-	forms_found = []
-	xpath_query = "//form[@method='" + form_type.lower() + "' and @action]"
-	xpath_results = tree.xpath(xpath_query)
+	if base_url is None:
+		base_url = scheme + "://" + host + "/"
 
 	for xpath_result in xpath_results:
 
@@ -213,8 +210,8 @@ def extractForms(tree, form_type="GET", scheme="https", host="www.example.com",
 			# which would be an invalid HTML form, and shouldn't happen
 			# nonetheless, we don't want an invalid HTML form to crash our crawler because of inadequate error-handling on our part
 
-		absolute_form_url = getAbsoluteUrl(scheme, host, form_action)
-		if not isValidHost(host, absolute_form_url):
+		absolute_form_url = crawler_normalizer.normalizeUrl(form_action, base_url)
+		if absolute_form_url is None or not isValidHost(host, absolute_form_url, scope):
 			continue
 
 		if "?" not in absolute_form_url:
@@ -223,178 +220,188 @@ def extractForms(tree, form_type="GET", scheme="https", host="www.example.com",
 		if "=" in absolute_form_url and not absolute_form_url.endswith("&"):
 			absolute_form_url += "&"
 
-		# and now we want to extract all the parameter names from this form
-		# and make sure that there isn't already a discovered URL that uses all of these same parameter names
-
-		dummy_parameters = ""
-		xpath_subquery = "//input[@name] | //textarea[@name] | //select[@name]"
-		xpath_subresults = xpath_result.xpath(xpath_subquery)
+		forms_found.append(getFormDescriptor(xpath_result, form_type, absolute_form_url))
 
-		for xpath_subresult in xpath_subresults:
-			dummy_parameters += xpath_subresult.attrib["name"] + "=null&"
-
-		dummy_parameters = re.sub("\\&$", "", dummy_parameters)
-		complete_url = {}
-		complete_url["type"] = form_type.upper()
-		complete_url["body"] = absolute_form_url + dummy_parameters
+	return forms_found
 
-		if isOldUrl(old_urls, complete_url):
+# returns a dictionary describing everything we need to know about a form, in order to submit it
+# it is built in a single pass over the form's own elements, straight from the parsed page,
+# so it can then be used for every one of the form's submissions without looking at the HTML again
+# "type": "GET" or "POST"
+# "action": the absolute URL the form is submitted to, ready to have the parameter string appended to it
+# "key": a dummy URL, using all of the form's parameter names, which is what we compare against the discovered URLs
+# to decide whether the form has already been found
+# "inputs", "checkboxes" and "textareas": the attributes of each of those tags
+# "radios": a list of (name, [values]) pairs, one for each group of radio buttons
+# "selects": a list of dictionaries with the name of each <select> tag, the values of all of its options, and the values of its selected options
+def getFormDescriptor(form, form_type="GET", action=""):
+
+	parameter_names = []
+	inputs = []
+	checkboxes = []
+	radio_groups = {}
+	textareas = []
+	selects = []
+
+	for element in form.iter("input", "textarea", "select"):
+
+		if "name" not in element.attrib:
 			continue
 
-		forms_found.append(html.tostring(xpath_result))
+		attributes = dict(element.attrib)
+		parameter_names.append(attributes["name"])
 
-	return forms_found
+		if element.tag == "textarea":
+			textareas.append(attributes)
 
-# does everything
-# or at least everything you tell it to do
-# extracts hrefs, iframes, generates and submits GET and POST forms
-def harvestAllData(html_text, scheme="https", host="www.example.com", href=False, iframe=False, submit_get_forms=False, submit_post_forms=False, old_urls=[]):
+		elif element.tag == "select":
 
-	global get_submissions
-	global post_submissions
+			options = []
+			selected_options = []
 
-	tree = html.fromstring(html_text.encode())
+			for option in element.iter("option"):
 
-	link_data = []
-	get_form_data = []
-	post_form_data = []
-
-	input_xpath_query = "//input[@type and @name and @type!='checkbox' and @type!='radio']"
-	checkbox_xpath_query = "//input[@type='checkbox' and @name]"
-	radio_xpath_query = "//input[@type='radio' and @name]"
-	textarea_xpath_query = "//textarea[@name]"
-	select_xpath_query = "//select[@name]"
-	url_xpath_query = "//form[@action]"
+				if "value" not in option.attrib:
+					continue
 
-	# collect hrefs
-	if href:
-		links = extractLinks(tree, "a", "href", scheme, host, old_urls)
-	else:
-		links = []
+				options.append(option.attrib["value"])
+				if "selected" in option.attrib:
+					selected_options.append(option.attrib["value"])
 
-	# collect iframes
-	if iframe:
-		iframes = extractLinks(tree, "iframe", "src", scheme, host, old_urls)
-	else:
-		iframes = []
+			selects.append({"name":attributes["name"], "options":options, "selected":selected_options})
 
-	# collect GET forms
-	if submit_get_forms:
-		get_forms = extractForms(tree, "GET", scheme, host, old_urls)
-	else:
-		get_forms = []
+		elif "type" not in attributes:
+			continue
 
-	# collect POST forms
-	if submit_post_forms:
-		post_forms = extractForms(tree, "POST", scheme, host, old_urls)
-	else:
-		post_forms = []
+		elif attributes["type"] == "checkbox":
+			checkboxes.append(attributes)
 
+		elif attributes["type"] == "radio":
+			if "value" in attributes:
+				radio_groups.setdefault(attributes["name"], []).append(attributes["value"])
 
-	# iterate through GET forms, generating URLS
-	for get_form in get_forms:
+		else:
+			inputs.append(attributes)
 
-		try:
-			get_form = get_form.encode()
-		except:
-			pass
+	form_key = action + "&".join([parameter_name + "=null" for parameter_name in parameter_names])
 
-		form_tree = html.fromstring(get_form)
-		form_inputs = form_tree.xpath(input_xpath_query)
-		form_checkboxes = form_tree.xpath(checkbox_xpath_query)
-		form_radios = form_tree.xpath(radio_xpath_query)
-		form_textareas = form_tree.xpath(textarea_xpath_query)
-		form_selects = form_tree.xpath(select_xpath_query)
+	return {"type":form_type.upper(), "action":action, "key":form_key, "inputs":inputs, "checkboxes":checkboxes, "radios":list(radio_groups.items()), "textareas":textareas, "selects":selects}
 
-		for counter in range(0, get_submissions):
+# does everything
+# or at least everything you tell it to do
+# extracts hrefs, iframes, generates and submits GET and POST forms
+# page_url is the URL the page was fetched from, which relative links are resolved against (see getBaseUrl)
+# and sort_parameters puts the parameters of every link in alphabetical order (see crawler_normalizer.normalizeUrl)
+# and scope is the scope rules, if links and forms on other hosts than the given one are followed (see crawler_scope.getScope)
+def harvestAllData(html_text, scheme="https", host="www.example.com", href=False, iframe=False, submit_get_forms=False, submit_post_forms=False, old_urls=[], page_url=None, sort_parameters=False, scope=None):
 
-			complete_parameter_string = ""
+	page_data = extractPageData(html_text, scheme, host, href, iframe, submit_get_forms, submit_post_forms, page_url, sort_parameters, scope)
+	return filterPageData(page_data, old_urls)
 
-			form_action = form_tree.xpath(url_xpath_query)
-			form_action = getAbsoluteUrl(scheme, host, form_action[0].attrib["action"])
+# returns only the new URLs from the page data returned by extractPageData
+# this is the only part of harvesting a page that needs to know what has been discovered so far
+def filterPageData(page_data, old_urls=[]):
 
-			if "?" not in form_action:
-				form_action += "?"
+	filter_start = perf_counter()
+	new_urls = []
+	new_keys = []
 
-			if "=" in form_action and not form_action.endswith("&"):
-				form_action += "&"
+	for url_type, url_body, key_body, source in page_data:
 
-			for iteration in range(0, len(form_inputs)):
-				complete_parameter_string += crawler_generator.generateInputParameter(form_inputs[iteration], iteration, "GET")
+		key_url = crawler_index.Url(url_type, key_body)
 
-			for iteration in range(0, len(form_checkboxes)):
-				complete_parameter_string += crawler_generator.generateCheckBoxParameter(form_checkboxes[iteration], iteration, "GET")
+		if isOldUrl(old_urls, key_url):
+			# a form that was found again was found again with all of its submissions, even the ones without every one of its parameters (see crawler_baseline)
+			if key_body != url_body and isinstance(old_urls, crawler_index.DiscoveredUrls) and len(old_urls.unconfirmed_signatures) > 0:
+				old_urls.recordFound(crawler_index.Url(url_type, url_body))
+			continue
 
-			for iteration in range(0, len(form_radios)):
-				complete_parameter_string += crawler_generator.generateRadioParameter(form_radios[iteration], iteration, "GET")
+		new_urls.append(crawler_index.Url(url_type, url_body, source=source))
 
-			for iteration in range(0, len(form_textareas)):
-				complete_parameter_string += crawler_generator.generateTextAreaParameter(form_textareas[iteration], iteration, "GET")
+		if key_body != url_body:
+			new_keys.append(key_url)
 
-			for iteration in range(0, len(form_selects)):
-				complete_parameter_string += crawler_generator.generateSelectParameter(form_selects[iteration], iteration, "GET")
+	# a form's submissions don't always have every one of its parameters (e.g an unchecked checkbox), so they don't always have its key's signature,
+	# and unless the key itself is recorded as seen, the form would be submitted all over again on every page it is on
+	if isinstance(old_urls, crawler_index.DiscoveredUrls):
+		for key_url in new_keys:
+			old_urls.recordSeen(key_url)
 
-			complete_parameter_string = re.sub("\\&$", "", complete_parameter_string) # replace the trailing '&' at the end
-			get_form_data.append({"type":"GET", "body":form_action + complete_parameter_string})
+	crawler_metrics.recordTime("filter", perf_counter() - filter_start)
 
-	# and now do the same for the POST forms
-	for post_form in post_forms:
+	return new_urls
 
-		try:
-			form_tree = form_tree.encode()
-		except:
-			pass
+# does everything harvestAllData does, except for checking which of the URLs have already been discovered
+# returns compact (type, body, key, source) tuples, where the key is the URL body that is checked against the discovered URLs
+# (for links, that is the link itself, and for form submissions, it is the form's key from getFormDescriptor)
+# and the source is where on the page the URL was found: "href", "iframe", "get" or "post" (see crawler_frontier)
+# it doesn't depend on any crawler state, so it can be run in a separate worker process
+def extractPageData(html_text, scheme="https", host="www.example.com", href=False, iframe=False, submit_get_forms=False, submit_post_forms=False, page_url=None, sort_parameters=False, scope=None):
 
-		form_tree = html.fromstring(post_form)
-		form_inputs = form_tree.xpath(input_xpath_query)
-		form_checkboxes = form_tree.xpath(checkbox_xpath_query)
-		form_radios = form_tree.xpath(radio_xpath_query)
-		form_textareas = form_tree.xpath(textarea_xpath_query)
-		form_selects = form_tree.xpath(select_xpath_query)
+	# how long each stage takes is recorded (see crawler_metrics): parsing the page, extracting links and forms from it, and generating form data
+	parse_start = perf_counter()
+	tree = html.fromstring(html_text.encode(), parser=html_parser)
+	extraction_start = perf_counter()
+	crawler_metrics.recordTime("parse", extraction_start - parse_start)
 
-		form_action = form_tree.xpath(url_xpath_query)
-		form_action = getAbsoluteUrl(scheme, host, form_action[0].attrib["action"])
+	base_url = getBaseUrl(tree, scheme, host, page_url)
 
-		for counter in range(0, post_submissions):
+	link_data = []
+	form_data = []
 
-			complete_parameter_string = ""
+	# collect hrefs
+	if href:
+		links = extractLinks(tree, "a", "href", scheme, host, base_url=base_url, sort_parameters=sort_parameters, scope=scope)
+	else:
+		links = []
 
-			if "?" not in form_action:
-				form_action += "?"
+	# collect iframes
+	if iframe:
+		iframes = extractLinks(tree, "iframe", "src", scheme, host, source="iframe", base_url=base_url, sort_parameters=sort_parameters, scope=scope)
+	else:
+		iframes = []
 
-			if "=" not in form_action and not form_action.endswith("&"):
-				form_action += "&"
+	# collect GET forms
+	if submit_get_forms:
+		get_forms = getForms(tree, "GET", scheme, host, base_url, scope)
+	else:
+		get_forms = []
 
-			for iteration in range(0, len(form_inputs)):
-				complete_parameter_string += crawler_generator.generateInputParameter(form_inputs[iteration], iteration, "POST")
+	# collect POST forms
+	if submit_post_forms:
+		post_forms = getForms(tree, "POST", scheme, host, base_url, scope)
+	else:
+		post_forms = []
 
-			for iteration in range(0, len(form_checkboxes)):
-				complete_parameter_string += crawler_generator.generateCheckBoxParameter(form_checkboxes[iteration], iteration, "POST")
+	generation_start = perf_counter()
+	crawler_metrics.recordTime("extraction", generation_start - extraction_start)
 
-			for iteration in range(0, len(form_radios)):
-				complete_parameter_string += crawler_generator.generateRadioParameter(form_tree, iteration, "POST")
+	if len(get_forms) + len(post_forms) > 0:
+		crawler_generator.seedPage(base_url)
 
-			for iteration in range(0, len(form_textareas)):
-				complete_parameter_string += crawler_generator.generateTextAreaParameter(form_textareas[iteration], iteration, "POST")
+	# iterate through the forms, generating URLs
+	# (each form is compiled once, and all of its submissions are generated from that, see crawler_generator.compileForm)
+	for form in get_forms + post_forms:
 
-			for iteration in range(0, len(form_selects)):
-				complete_parameter_string += crawler_generator.generateSelectParameter(form_selects[iteration], iteration, "POST")
+		submissions = crawler_generator.plans[form["type"]].submissions
 
-			complete_parameter_string = re.sub("\\&$", "", complete_parameter_string)
-			post_form_data.append({"type":"POST", "body":form_action + complete_parameter_string})
+		for parameter_string in crawler_generator.generateFormSubmissions(form, submissions, form["type"]):
+			form_data.append((form["type"], form["action"] + parameter_string, form["key"], form["type"].lower()))
 
+	crawler_metrics.recordTime("form_generation", perf_counter() - generation_start)
 
 	all_links = crawler_generator.stripRedundancies(links + iframes)
 
 	for individual_link in all_links:
-		link_data.append({"type":"GET", "body":individual_link})
+		link_data.append((individual_link.type, individual_link.body, individual_link.body, individual_link.source))
 
-	return all_links + get_form_data + post_form_data
+	return link_data + form_data
 
 
-# output crawled data to file
+# output crawled data to file, all at once
+# the file is written over, so calling this more than once doesn't write the same URLs into it more than once
+# (jick.py itself writes each URL out as it is discovered, with crawler_output)
 def outputDiscoveredUrls(output_filename, output_urls):
-	handler = open(output_filename, "a")
-	for url in output_urls:
-		handler.write(url["type"] + " " + url["body"] + "\n")
-	handler.close()
+	output_sink = crawler_output.TextSink(output_filename, overwrite=True)
+	output_sink.writeUrls(output_urls)
+	output_sink.close()
@@ -1,3 +1,4 @@
+import os
 import configparser
 import random
 import datetime
@@ -7,18 +8,28 @@ from math import ceil
 config = configparser.ConfigParser()
 config.read("form_parameters.ini")
 
+# the characters that randomly generated values are made of
+letters = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+numbers = "0123456789"
+letters_and_numbers = letters + numbers
+
+# for passwords. I know there is more punctuation than this, but this will be safer, as some websites have passform submission forms that
+# forbid the use of more obscure punctuation marks, such as ^ or | or \ or ;
+# this password character set contains a combination of uppercase and lowercase letters, numbers, and punctuation
+# all in a constant, unchanging order, so that the password will not be randomized
+# this is crucial, in case a single form contains more than one <input type='password'> field,
+# and requires 2 different password inputs to be identical
+password_chars = "Ax1!By2?Cz3." * 10
+
 def stripRedundancies(array):
 
 	# receive an array as input
 	# and return an array with all redundancies removed, e.g
 	# [1, 1, 1, 2, 2, 3, 4, 4, 5] becomes [1, 2, 3, 4, 5]
+	# the first of each item is kept, in the same order, and it takes linear time,
+	# since the items have to be hashable (e.g strings, or crawler_index.Url records)
 
-	new_array = []
-	for item in array:
-		if new_array.count(item) == 0:
-			new_array.append(item)
-
-	return new_array
+	return list(dict.fromkeys(array))
 
 # return a number, representing the current week
 # it will be 01 - 53, zero-padded
@@ -40,339 +51,446 @@ def getCurrentWeek(now):
 
 	return current_week_of_year
 
+# where every random choice the form generator makes comes from
+# random strings (e.g for text inputs and textareas) are cut from a pool of random characters, rather than being built one character at a time:
+# the pool is filled pool_size random bytes at a time, which are mapped onto the characters of the string in a single bytes.translate() call
+# (the bytes that would make some characters likelier than others, i.e the last 256 % len(chars) of them, are dropped instead)
+# so a string costs a slice of the pool, however long it is
+# the random bytes come from os.urandom, unless it is given a seed (e.g with --seed), in which case they, and every other random choice
+# (which are made with its 'generator'), come from a random.Random seeded with it, so generating the same forms again generates the same values
+# and, with a seed, each page's forms are generated from a seed of their own, made from it and the page's URL (see seedPage),
+# so the values don't depend on which pages were harvested before it, or in which process
+# it is only ever used by one thread at a time in any one process (forms are generated while harvesting, see crawler_functions.extractPageData),
+# and without a seed, a process forked from this one (e.g a worker process, see crawler_engine.crawlConcurrently) throws away the pool
+# and starts over, as Python does for the random module itself, so that it doesn't generate the same values as its parent
+class RandomPool:
 
-# return the appropriate value from the list of options in the config file
-def getParameterValueFromIterationNumber(variable_name, iteration=0, form_type="GET"):
+	def __init__(self, pool_size=65536, seed=None):
 
-	global config
-	selection_method = config[form_type]["Method"]
+		self.pool_size = pool_size
+		self.translations = {} # maps each set of characters to the table its bytes are translated with, and the bytes that are dropped
+		self.setSeed(seed)
 
-	if variable_name in config[form_type]:
-		values = config[form_type][variable_name]
+	def setSeed(self, seed=None):
 
-	else:
-		values = config[form_type]["default"]
+		self.seed = seed
+		self.startOver(seed)
 
-	values = values.split(",")
+	# starts the generator and the pools over, from the given seed (None means a random one)
+	def startOver(self, seed=None):
 
-	if selection_method == "random":
-		return random.choice(values)
+		self.generator = random.Random(seed)
+		self.pools = {} # maps each set of characters to [the pool of them, how much of the pool has been used]
 
-	values_len = len(values)
+	def reseed(self):
 
-	while iteration >= values_len:
-		iteration -= values_len
+		if self.seed is None:
+			self.startOver()
 
-	return values[iteration]
+	# with a seed, starts over from a seed made from it and the URL of the page whose forms are about to be generated
+	def seedPage(self, page_url):
 
-def generateRadioParameter(tree, iteration=0, form_type="GET"):
+		if self.seed is not None:
+			self.startOver(str(self.seed) + " " + page_url)
 
-	# since radio buttons for a given name may be spread across a large area and not necessarily grouped together in the HTML document,
-	# the tree passed to this function will represent the entire <form> element, and not just a given radio selection
-	# and this function will locate all the different radio elements and work from there
+	def getRandomBytes(self, size):
 
-	xpath_query = "//input[@type='radio' and @name and @value]"
-	xpath_results = tree.xpath(xpath_query)
-	complete_parameter_string = ""
-	radio_names = []
+		if self.seed is not None:
+			return self.generator.randbytes(size)
 
-	for xpath_result in xpath_results:
-		radio_names.append(xpath_result.attrib["name"])
+		return os.urandom(size)
 
-	radio_names = stripRedundancies(radio_names)
+	def getTranslation(self, chars):
 
-	for index in range(0, len(radio_names)):
+		if chars not in self.translations:
 
-		radio_name = parameter_name = radio_names[index]
-		new_xpath_query = "//input[@type='radio' and @name='" + radio_name + "' and @value]"
-		new_xpath_results = tree.xpath(new_xpath_query)
+			usable_bytes = 256 - 256 % len(chars)
+			table = bytes([ord(chars[byte % len(chars)]) if byte < usable_bytes else 0 for byte in range(0, 256)])
+			self.translations[chars] = (table, bytes(range(usable_bytes, 256)))
 
-		current_value = getParameterValueFromIterationNumber("Radio", index, form_type)
+		return self.translations[chars]
 
-		if current_value == "first":
-			parameter_value = new_xpath_results[0].attrib["value"]
+	# returns at least 'size' random characters from 'chars' (which must be ASCII)
+	def fill(self, chars, size):
 
-		elif current_value == "last":
-			parameter_value = new_xpath_results[-1].attrib["value"]
+		table, dropped_bytes = self.getTranslation(chars)
+		characters = ""
 
-		elif current_value == "random":
-			parameter_value = random.choice(new_xpath_results).attrib["value"]
+		while len(characters) < size:
+			characters += self.getRandomBytes(max(size, self.pool_size)).translate(table, dropped_bytes).decode("ascii")
 
-		else:
+		return characters
+
+	# returns a string of 'length' characters picked at random from 'chars'
+	def getString(self, chars, length):
+
+		if length <= 0:
 			return ""
 
-		complete_parameter_string += parameter_name + "=" + parameter_value + "&"
+		pool = self.pools.get(chars)
 
-	return complete_parameter_string
+		if pool is None or pool[1] + length > len(pool[0]):
+			if pool is None:
+				remaining_characters = ""
+			else:
+				remaining_characters = pool[0][pool[1]:]
+			pool = [remaining_characters + self.fill(chars, length), 0]
+			self.pools[chars] = pool
 
-def generateCheckBoxParameter(tree, iteration=0, form_type="GET"):
+		position = pool[1]
+		pool[1] = position + length
 
-	complete_parameter_string = ""
-	checkbox_name = parameter_name = tree.attrib["name"]
-	current_value = getParameterValueFromIterationNumber("Checkbox", iteration, form_type)
+		return pool[0][position:position + length]
 
-	if current_value == "random":
+random_pool = RandomPool()
 
-		if random.choice([True, False]):
-			if "value" in tree.attrib:
-				parameter_value = tree.attrib["value"]
-			else:
-				parameter_value = "on"
-		else:
-			return ""
+if hasattr(os, "register_at_fork"):
+	os.register_at_fork(after_in_child=random_pool.reseed)
 
-	elif current_value == "all":
+# makes every value the form generator generates from now on reproducible, by seeding random_pool with the given seed
+def setSeed(seed):
 
-		if "value" in tree.attrib:
-			parameter_value = tree.attrib["value"]
-		else:
-			parameter_value = "on"
+	random_pool.setSeed(seed)
 
-	elif current_value == "none":
-		return ""
+# makes the values generated for a page's forms the same whichever order the pages are harvested in, if there is a seed (see RandomPool.seedPage)
+def seedPage(page_url):
 
-	else:
-		return ""
+	random_pool.seedPage(page_url)
 
-	complete_parameter_string += parameter_name + "=" + parameter_value + "&"
-	return complete_parameter_string
+# returns a string of 'length' characters picked at random from 'chars'
+def getRandomString(chars, length):
 
-def generateSelectParameter(tree, iteration=0, form_type="GET"):
+	return random_pool.getString(chars, length)
 
-	parameter_name = tree.xpath("//select[@name]")[0].attrib["name"]
-	current_value = getParameterValueFromIterationNumber("Select", iteration, form_type)
-	no_default_value = False
+# how to generate the form data for one type of form ("GET" or "POST"), i.e its section of form_parameters.ini,
+# which is read once, when the crawler starts, rather than being looked up (and its comma-separated lists split) for every field of every submission
+# values: maps each setting, in lower case (as configparser keeps them), to the tuple of values in its comma-separated list
+# every form is compiled against it (see compileForm), into a function that generates all of the form's submissions at once
+class GeneratorPlan:
 
-	if current_value == "default":
+	__slots__ = ("form_type", "random_method", "submissions", "values", "default")
 
-		xpath_query = "//option[@selected and @value]"
-		xpath_results = tree.xpath(xpath_query)
+	def __init__(self, form_type, section):
 
-		if len(xpath_results) < 1:
-			no_default_value = True
-			# since the user configured the crawler to use the default value for any <select> field
-			# but in this case, there is no select field,
-			# we will instead select one of the other options at random
-		else:
-			parameter_value = xpath_results[0].attrib["value"]
+		self.form_type = form_type
+		self.random_method = section["Method"] == "random"
+		self.submissions = int(section["Submissions"])
+		self.values = dict([(name, tuple(value.split(","))) for name, value in section.items()])
+		self.default = self.values["default"]
 
-	elif current_value == "first":
+	# returns the list of values for the given setting, e.g "Checkbox", or an input type, or the 'Default' list if there is no such setting
+	def getValues(self, variable_name):
 
-		xpath_query = "//option[@value]"
-		xpath_results = tree.xpath(xpath_query)
+		return self.values.get(variable_name.lower(), self.default)
 
-		if len(xpath_results) == 0:
-			parameter_value = ""
-			# if this happens, it means there are no options with values inside this form
-			# this shouldn't happen, because if it does, that means the crawled web page has invalid - or at least improper - HTML
-			# and we don' want this to crash our crawler, so we'll just return without sending any data
-		else:
-			parameter_value = xpath_results[0].attrib["value"]
+# the compiled [GET] and [POST] sections of the config file
+plans = {
+	"GET":GeneratorPlan("GET", config["GET"]),
+	"POST":GeneratorPlan("POST", config["POST"]),
+}
 
-	elif current_value == "last":
+# return the appropriate value from the list of options in the config file
+def getParameterValueFromIterationNumber(variable_name, iteration=0, form_type="GET"):
 
-		xpath_query = "//option[@value]"
-		xpath_results = tree.xpath(xpath_query)
+	plan = plans[form_type]
+	values = plan.getValues(variable_name)
 
-		if len(xpath_results) == 0:
-			parameter_value = ""
-			# same as above, this means there are literally no <option> tags to choose from
-		else:
-			parameter_value = xpath_results[-1].attrib["value"]
+	if plan.random_method:
+		return random_pool.generator.choice(values)
 
-	elif current_value == "random" or no_default_value == True:
+	return values[iteration % len(values)]
 
-		xpath_query = "//option[@value]"
-		xpath_results = tree.xpath(xpath_query)
+# returns a function that generates the parameter string for a field, from the setting its value is picked from
+# compileValue turns each of the setting's values into a function that generates the field's parameter string with that value,
+# and if the method is random, one of those is picked for each submission, or else the field's iteration (i.e its position among the fields
+# of its kind) always picks the same one, so the others don't even have to be compiled
+# the parameter string functions are all given the current time, which is only looked up once for each batch of submissions
+def compileSetting(plan, variable_name, iteration, compileValue):
 
-		if len(xpath_results) == 0:
-			parameter_value = ""
-		else:
-			parameter_value = random.choice(xpath_results).attrib["value"]
+	values = plan.getValues(variable_name)
 
-	elif current_value == "none":
-		# this means it is a value of 'none'
-		# so we will return nothing - no parameter name OR a parameter value
-		return ""
+	if not plan.random_method:
+		return compileValue(values[iteration % len(values)])
+
+	generators = tuple([compileValue(value) for value in values])
+
+	if len(generators) == 1:
+		return generators[0]
+
+	return lambda now: random_pool.generator.choice(generators)(now)
+
+# returns a function that always returns the same parameter string
+def compileConstant(parameter_string):
 
-	return parameter_name + "=" + parameter_value + "&"
+	return lambda now: parameter_string
 
+# returns the value of a numeric attribute, or the default if it doesn't have one
+def getNumericAttribute(attributes, attribute_name, default):
 
-def generateTextAreaParameter(tree, iteration=0, form_type="GET"):
+	if attribute_name not in attributes:
+		return default
 
-	xpath_query = "//textarea[@name]"
-	xpath_result = tree.xpath(xpath_query)
-	parameter_name = xpath_result[0].attrib["name"]
-	current_value = getParameterValueFromIterationNumber("Textarea", iteration, form_type)
+	try:
+		return int(attributes[attribute_name])
+	except:
+		# I made this into a try/except clause just in case the website erroneously uses a non-numerical value for it's maxlength attribute
+		# we wouldn't want that to crash our crawler
+		return default
 
-	if current_value != "intelligence":
-		return parameter_name + "=" + current_value + "&"
+# returns a function that generates the parameter string for a single <input> tag, given its attributes
+def compileInput(attributes, iteration, plan):
 
-	if "maxlength" in xpath_result[0].attrib:
-		try:
-			maxlength = int(xpath_result[0].attrib["maxlength"])
-		except:
-			maxlength = 0
+	input_name = attributes["name"]
 
+	def compileValue(value):
+
+		if value != "intelligence":
+			# this means that, in the case of these input types, if the value is not 'intelligence',
+			# it just uses the raw value provided in the .ini file as the parameter value, itself
+			return compileConstant(input_name + "=" + value + "&")
+
+		return compileIntelligentInput(attributes)
+
+	return compileSetting(plan, attributes["type"], iteration, compileValue)
+
+# returns a function that generates an intelligent value for an <input> tag, from whatever of its attributes may be helpful for doing so
+# the attributes are only looked at once, and everything that doesn't change from one submission to the next is worked out here
+def compileIntelligentInput(attributes):
+
+	input_type = attributes["type"]
+	input_name = attributes["name"]
+
+	# default values, in case there is no information in the tag attributes
+	maxlength = getNumericAttribute(attributes, "maxlength", 10)
+	min_value = getNumericAttribute(attributes, "min", 0)
+	max_value = getNumericAttribute(attributes, "max", 100)
+	placeholder = attributes.get("placeholder", "")
+	value = attributes.get("value", "")
+
+	prefix = input_name + "="
+
+	if input_type == "text" or input_type == "search":
+		if placeholder:
+			return compileConstant(prefix + placeholder + "&")
+		return lambda now: prefix + getRandomString(letters_and_numbers, maxlength-1) + "&"
+
+	elif input_type == "password":
+		if maxlength > len(password_chars):
+			maxlength = len(password_chars)
+		return compileConstant(prefix + password_chars[:max(maxlength-1, 0)] + "&")
+
+	elif input_type == "tel":
+		return compileConstant(prefix + "8882804331&")
+
+	elif input_type == "url":
+		return compileConstant(prefix + "http://www.example.com/&")
+
+	elif input_type == "hidden":
+		if len(value) > 1:
+			return compileConstant(prefix + value + "&")
+		return lambda now: prefix + getRandomString(letters_and_numbers, maxlength-1) + "&"
+
+	elif input_type == "email":
+		return lambda now: prefix + "nobody" + getRandomString(numbers, 4) + "@gmail.com&"
+
+	elif input_type == "date":
+		return lambda now: prefix + str(now.year) + "-" + str(now.month) + "-" + str(now.day) + "&"
+
+	elif input_type == "datetime-local":
+		return lambda now: prefix + str(now.year) + "-" + str(now.month) + "-" + str(now.day) + "T" + str(now.hour) + ":" + str(now.minute) + "&"
+
+	elif input_type == "time":
+		return lambda now: prefix + str(now.hour) + ":" + str(now.minute) + "&"
+
+	elif input_type == "month":
+		return lambda now: prefix + str(now.year) + "-" + str(now.month) + "&"
+
+	elif input_type == "week":
+		return lambda now: prefix + str(now.year) + "-W" + str(getCurrentWeek(now)) + "&"
+
+	elif input_type == "number" or input_type == "range":
+		return compileConstant(prefix + str(int((max_value - min_value) * 0.5)) + "&")
+
+	elif input_type == "color":
+		return compileConstant(prefix + "#2ec27e&")
+
+	return compileConstant(prefix + value + "&")
+
+def compileCheckBox(attributes, iteration, plan):
+
+	if "value" in attributes:
+		parameter_string = attributes["name"] + "=" + attributes["value"] + "&"
 	else:
-		maxlength = 0
+		parameter_string = attributes["name"] + "=on&"
+
+	def compileValue(value):
+
+		if value == "random":
+			return lambda now: parameter_string if random_pool.generator.random() < 0.5 else ""
+
+		elif value == "all":
+			return compileConstant(parameter_string)
+
+		# 'none', or anything else, means it is never checked
+		return compileConstant("")
+
+	return compileSetting(plan, "Checkbox", iteration, compileValue)
+
+def compileSelect(select, iteration, plan):
+
+	# 'select' is a dictionary with the name of the <select> tag, and the values of its <option> tags (all of them, and the selected ones)
+	prefix = select["name"] + "="
+	options = select["options"]
+
+	def compileValue(value):
+
+		if value == "default" and len(select["selected"]) == 0:
+			# since the user configured the crawler to use the default value for any <select> field
+			# but in this case, there is no default value,
+			# we will instead select one of the other options at random
+			value = "random"
+
+		if value == "default":
+			return compileConstant(prefix + select["selected"][0] + "&")
+
+		elif value in ["first", "last", "random"] and len(options) == 0:
+			# if this happens, it means there are no options with values inside this <select> tag
+			# this shouldn't happen, because if it does, that means the crawled web page has invalid - or at least improper - HTML
+			# and we don' want this to crash our crawler, so we'll just send an empty value
+			return compileConstant(prefix + "&")
+
+		elif value == "first":
+			return compileConstant(prefix + options[0] + "&")
+
+		elif value == "last":
+			return compileConstant(prefix + options[-1] + "&")
+
+		elif value == "random":
+			return lambda now: prefix + random_pool.generator.choice(options) + "&"
+
+		# this means it is a value of 'none'
+		# so we will return nothing - no parameter name OR a parameter value
+		return compileConstant("")
+
+	return compileSetting(plan, "Select", iteration, compileValue)
+
+def compileTextArea(attributes, iteration, plan):
+
+	prefix = attributes["name"] + "="
+
+	maxlength = getNumericAttribute(attributes, "maxlength", 0)
 
 	if maxlength == 0:
 		# this is still another way in which we can determine what the maximum length is likely to be
-		if "rows" in xpath_result[0].attrib and "cols" in xpath_result[0].attrib:
+		if "rows" in attributes and "cols" in attributes:
 			try:
-				maxlength = int(int(xpath_result[0].attrib["rows"]) * int(xpath_result[0].attrib["cols"]) * 0.5)
+				maxlength = int(int(attributes["rows"]) * int(attributes["cols"]) * 0.5)
 			except:
 				maxlength = 50
 		else:
 			maxlength = 50
 
-	# I figure that, for textareas, forms expect a longer string of text than they would expect for an <input type='text'/> tag
-	# for this reason, we will generate a slightly longer string of text than we would for a normal <input type='text'/> tag
+	def compileValue(value):
 
-	parameter_value = ""
-	chars = list("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+		if value != "intelligence":
+			return compileConstant(prefix + value + "&")
 
-	for counter in range(0, maxlength-1):
-		parameter_value += random.choice(chars)
+		# I figure that, for textareas, forms expect a longer string of text than they would expect for an <input type='text'/> tag
+		# for this reason, we will generate a slightly longer string of text than we would for a normal <input type='text'/> tag
+		return lambda now: prefix + getRandomString(letters_and_numbers, maxlength-1) + "&"
 
-	return parameter_name + "=" + parameter_value + "&"
+	return compileSetting(plan, "Textarea", iteration, compileValue)
 
-def generateInputParameter(tree, iteration=0, form_type="GET"):
+def compileRadios(radio_groups, plan):
 
-	input_type = tree.attrib["type"]
-	input_name = tree.attrib["name"]
+	# since radio buttons for a given name may be spread across a large area and not necessarily grouped together in the HTML document,
+	# this function receives every radio group in the form at once, as a list of (name, [values]) pairs, in the order they appear in the form
+	# if any group isn't to be selected (i.e 'none'), none of them are, so each group's function returns None for that
 
-	current_value = getParameterValueFromIterationNumber(input_type, iteration, form_type)
+	def compileGroup(parameter_name, radio_values):
 
-	if current_value != "intelligence":
+		def compileValue(value):
 
-		# this means that, in the case of these input types, if the value is not 'intelligence',
-		# it just uses the raw value provided in the .ini file as the parameter value, itself
-		return input_name + "=" + current_value + "&"
+			if value == "first":
+				return compileConstant(parameter_name + "=" + radio_values[0] + "&")
 
-	# If we haven't returned from this function yet, this means we must intelligently generate a parameter value
-	# So let us begin by attempting to collect all the tag attributes that may be helpful for us, in doing so
-	# And we will generate 'default' values, in case there is no information in the tag attributes
+			elif value == "last":
+				return compileConstant(parameter_name + "=" + radio_values[-1] + "&")
 
-	if "maxlength" in tree.attrib:
-		try:
-			maxlength = int(tree.attrib["maxlength"])
-		except:
-			# I made this into a try/except clause just in case the website erroneously uses a non-numerical value for it's maxlength attribute
-			# we wouldn't want that to crash our crawler
-			maxlength = 10
-	else:
-		maxlength = 10
+			elif value == "random":
+				return lambda now: parameter_name + "=" + random_pool.generator.choice(radio_values) + "&"
 
+			return compileConstant(None)
 
-	if "placeholder" in tree.attrib:
-		placeholder = tree.attrib["placeholder"]
-	else:
-		placeholder = ""
+		return compileValue
 
+	generators = [compileSetting(plan, "Radio", index, compileGroup(parameter_name, radio_values)) for index, (parameter_name, radio_values) in enumerate(radio_groups)]
 
-	if "min" in tree.attrib:
-		try:
-			min = int(tree.attrib["min"])
-		except:
-			min = 0
-	else:
-		min = 0
+	def generateRadios(now):
 
+		complete_parameter_string = ""
 
-	if "max" in tree.attrib:
-		try:
-			max = int(tree.attrib["max"])
-		except:
-			max = 100
-	else:
-		max = 100
+		for generator in generators:
 
+			parameter_string = generator(now)
+			if parameter_string is None:
+				return ""
 
-	if "value" in tree.attrib:
-		value = tree.attrib["value"]
-	else:
-		value = ""
+			complete_parameter_string += parameter_string
 
-	# we may need the current time, as well
-	now = datetime.datetime.now()
+		return complete_parameter_string
 
-	# we may need some other constants as well, for randomized data generation
-	letters = list("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ")
-	numbers = list("0123456789")
-	punctuation = list("!?.")
-	# for passwords. I know there is more punctuation than this, but this will be safer, as some websites have passform submission forms that
-	# forbid the use of more obscure punctuation marks, such as ^ or | or \ or ; 
-	letters_and_numbers = letters + numbers
-	all = letters + numbers + punctuation
-	password_chars = "Ax1!By2?Cz3." * 10
-	# this password character set contains a combination of uppercase and lowercase letters, numbers, and punctuation
-	# all in a constant, unchanging order, so that the password will not be randomized
-	# this is crucial, in case a single form contains more than one <input type='password'> field,
-	# and requires 2 different password inputs to be identical
+	return generateRadios
 
-	# we now have a default value for the following attributes:
-	# maxlength, min, max, placeholder, and value
+# returns a function that generates any number of submissions of a form at once, as a list of their parameter strings
+# 'form' is a form descriptor, as returned by crawler_functions.getFormDescriptor, which is compiled against the plan for form_type,
+# so its fields are only looked at once, however many submissions are generated
+# the parameters are in the same order as they always were: inputs, checkboxes, radios, textareas and then selects
+def compileForm(form, form_type="GET"):
 
+	plan = plans[form_type]
+	generators = []
 
-	if input_type == "text" or input_type == "search":
-		if placeholder:
-			parameter_value = placeholder
-		else:
-			parameter_value = ""
-			for counter in range(0, maxlength-1):
-				parameter_value += random.choice(letters_and_numbers)
+	for iteration in range(0, len(form["inputs"])):
+		generators.append(compileInput(form["inputs"][iteration], iteration, plan))
 
-	elif input_type == "password":
-		parameter_value = ""
-		if maxlength > len(password_chars):
-			maxlength = len(password_chars)
-		for counter in range(0, maxlength-1):
-			parameter_value += password_chars[counter]
+	for iteration in range(0, len(form["checkboxes"])):
+		generators.append(compileCheckBox(form["checkboxes"][iteration], iteration, plan))
 
-	elif input_type == "tel":
-		parameter_value = "8882804331"
+	generators.append(compileRadios(form["radios"], plan))
 
-	elif input_type == "url":
-		parameter_value = "http://www.example.com/"
+	for iteration in range(0, len(form["textareas"])):
+		generators.append(compileTextArea(form["textareas"][iteration], iteration, plan))
 
-	elif input_type == "hidden":
-		if len(value) > 1:
-			parameter_value = value
-		else:
-			parameter_value = ""
-			for counter in range(0, maxlength-1):
-				parameter_value += random.choice(letters_and_numbers)
+	for iteration in range(0, len(form["selects"])):
+		generators.append(compileSelect(form["selects"][iteration], iteration, plan))
 
-	elif input_type == "email":
-		random_number = ""
-		for counter in range(0, 4):
-			random_number += str(random.choice(range(0, 10)))
-		parameter_value = "nobody" + random_number + "@gmail.com"
+	def generateSubmissions(count):
 
-	elif input_type == "date":
-		parameter_value = str(now.year) + "-" + str(now.month) + "-" + str(now.day)
+		# we may need the current time, as well
+		now = datetime.datetime.now()
+		submissions = []
 
-	elif input_type == "datetime-local":
-		parameter_value = str(now.year) + "-" + str(now.month) + "-" + str(now.day) + "T" + str(now.hour) + ":" + str(now.minute)
+		for counter in range(0, count):
 
-	elif input_type == "time":
-		parameter_value = str(now.hour) + ":" + str(now.minute)
+			complete_parameter_string = "".join([generator(now) for generator in generators])
 
-	elif input_type == "month":
-		parameter_value = str(now.year) + "-" + str(now.month)
+			if complete_parameter_string.endswith("&"):
+				complete_parameter_string = complete_parameter_string[:-1] # remove the trailing '&' at the end
 
-	elif input_type == "week":
-		parameter_value = str(now.year) + "-W" + str(getCurrentWeek(now))
+			submissions.append(complete_parameter_string)
 
-	elif input_type == "number" or input_type == "range":
-		parameter_value = str(int((max - min) * 0.5))
+		return submissions
 
-	elif input_type == "color":
-		parameter_value = "#2ec27e"
+	return generateSubmissions
 
-	else:
-		parameter_value = value
+# returns the parameter strings for 'count' submissions of a form
+def generateFormSubmissions(form, count, form_type="GET"):
+
+	return compileForm(form, form_type)(count)
+
+# returns the parameter string for a single submission of a form
+# 'form' is a form descriptor, as returned by crawler_functions.getFormDescriptor
+def generateFormParameters(form, form_type="GET"):
 
-	return input_name + "=" + parameter_value + "&"
+	return generateFormSubmissions(form, 1, form_type)[0]
@@ -0,0 +1,264 @@
+import sys
+
+from urllib import parse
+
+# a single discovered URL, split into its parts once, when it is created, so it never has to be parsed again
+# url_type: "GET" or "POST" (for POST URLs, the query string is what gets sent as the request body)
+# body: the URL itself, which isn't kept as it is, but put back together from its origin and tail whenever it is needed
+# depth: how many links away from the start URLs it was found (see crawler_engine.addNewUrls)
+# source: where it was found, e.g "href" or "post" (see crawler_frontier.source_costs)
+# origin: the scheme and host, e.g "https://www.example.com", which is interned, so every URL on the same host shares the same string
+# tail: the rest of the URL, e.g "/search.php?q=whatever", which the path, query string and fragment are read from
+# signature: what 2 URLs are compared by, when deciding whether a URL has already been discovered (see getUrlSignature)
+# 2 URLs are the same URL if they have the same type and body, however they were found,
+# and since they can be hashed, a list of them can be stripped of duplicates in linear time (see crawler_generator.stripRedundancies)
+# it has slots rather than a __dict__, and keeps as few strings as it can, since a big crawl keeps millions of them around
+# (see benchmarks/bench_url_memory.py)
+class Url:
+
+	__slots__ = ("type", "origin", "tail", "signature", "depth", "source")
+
+	def __init__(self, url_type, body, depth=0, source=""):
+
+		self.type = sys.intern(url_type)
+		self.depth = depth
+		self.source = sys.intern(source)
+
+		scheme_end = body.find("://")
+		if scheme_end < 0:
+			path_start = 0
+		else:
+			path_start = len(body)
+			for separator in "/?#":
+				separator_position = body.find(separator, scheme_end + 3)
+				if 0 <= separator_position < path_start:
+					path_start = separator_position
+
+		self.origin = sys.intern(body[:path_start])
+		self.tail = body[path_start:]
+
+		# parameter names can't have a "&" in them, so the type and names can be joined into a single string,
+		# which is cheaper to keep, hash and compare than a tuple of them
+		parameter_names = [parameter.partition("=")[0] for parameter in self.getQueryString().split("&")]
+		parameter_names.sort()
+		self.signature = "&".join([self.type] + parameter_names)
+
+	@property
+	def body(self):
+
+		return self.origin + self.tail
+
+	# everything up to the query string, e.g "/search.php"
+	@property
+	def path(self):
+
+		return self.tail.partition("#")[0].partition("?")[0]
+
+	# the query string, without the "?", or None if there isn't one
+	# it is split the same way urllib.parse.urlsplit does, i.e after the fragment is split off
+	@property
+	def query(self):
+
+		rest, question_mark, query = self.tail.partition("#")[0].partition("?")
+		if question_mark:
+			return query
+		return None
+
+	# the query string, or "" if there isn't one
+	def getQueryString(self):
+
+		return self.tail.partition("#")[0].partition("?")[2]
+
+	# the names of the parameters in the query string, sorted, as they are in the signature
+	def getParameterNames(self):
+
+		return self.signature.split("&")[1:]
+
+	# the host, with the port (if there is one), in lower case, e.g "www.example.com:8080"
+	@property
+	def netloc(self):
+
+		return self.origin.partition("://")[2].lower()
+
+	# the host, without the port, in lower case, e.g "www.example.com"
+	@property
+	def hostname(self):
+
+		return parse.urlsplit(self.origin).hostname
+
+	def __eq__(self, other):
+
+		return isinstance(other, Url) and self.type == other.type and self.origin == other.origin and self.tail == other.tail
+
+	def __hash__(self):
+
+		return hash((self.type, self.origin, self.tail))
+
+	def __repr__(self):
+
+		return "Url(" + repr(self.type) + ", " + repr(self.body) + ")"
+
+# returns the signature that two URLs are compared by, when deciding whether a URL has already been discovered
+# i.e the URL type (e.g "GET" or "POST") plus the sorted list of parameter names
+# parameter values, and the rest of the URL, are deliberately ignored (see crawler_functions.isOldUrl)
+# it is worked out once, when the Url record is created
+def getUrlSignature(url):
+
+	return url.signature
+
+# a list of discovered URLs, which also keeps a set of the signatures of every URL added to it, for each host (see getHost)
+# this lets isOldUrl answer in constant time, instead of re-parsing every previously discovered URL on every call
+# and since each host has its own seen-index, a URL on one host is never taken to be old because another host has a URL with the same signature
+# it is still a list, so the main loop can keep iterating over it while new URLs are being appended
+# it also keeps track of which of its URLs have been visited, which is usually (but not always, see crawler_frontier) in the order they were discovered
+# so it keeps a count of how many URLs in a row, from the start, have been visited, plus a set of any later ones that were visited ahead of their turn
+# and it knows which parameters have turned out not to change the page at a given path (see crawler_fingerprint.PageIndex),
+# so a URL which only differs from an already discovered one by those parameters counts as already discovered too
+# and, when the crawl is a diff against a previous one (see crawler_baseline), it keeps the signatures of the previous crawl's URLs which haven't been found again yet
+# and it tells each of its listeners (e.g crawler_state.CrawlState, crawler_output.OutputSink) about every URL added to it,
+# and about the crawl's progress, through their recordDiscovered() and recordVisited() methods
+class DiscoveredUrls(list):
+
+	def __init__(self, urls=[]):
+
+		list.__init__(self)
+		self.signatures = {} # maps each host to the signatures of the URLs on it
+		self.hosts = {} # maps each origin to its host
+		self.origin_signatures = {} # maps each origin to the signatures of its host, so finding them only takes one lookup
+		self.visited = 0
+		self.visited_out_of_order = set()
+		self.listeners = []
+		self.ignored_parameters = {} # maps (type, path) to the names of the parameters that are ignored there
+		self.ignored_signatures = set() # the (host, signature) of the URLs which were only old because of their ignored parameters
+		self.seen_urls = None # if it is a list, every URL passed to recordSeen is added to it, see recordSeen
+		self.unconfirmed_signatures = set() # the (host, signature) of the previous crawl's URLs which haven't been found again yet
+		self.confirmed_signatures = None # if it is a list, the (host, signature) of each of them is added to it as it is found again, see confirm
+		self.extend(urls)
+
+	# returns the host whose seen-index a URL is in, i.e its host name, without the port
+	# (so http:// and https:// URLs, or URLs on different ports, of the same host share one, as they did when there was only one seen-index)
+	def getHost(self, url):
+
+		host = self.hosts.get(url.origin)
+
+		if host is None:
+			host = url.hostname or ""
+			self.hosts[url.origin] = host
+
+		return host
+
+	# returns the signatures of the URLs on the same host as the given URL
+	def getSignatures(self, url):
+
+		signatures = self.origin_signatures.get(url.origin)
+
+		if signatures is None:
+			signatures = self.signatures.setdefault(self.getHost(url), set())
+			self.origin_signatures[url.origin] = signatures
+
+		return signatures
+
+	# returns what a URL is told apart by, across every host, i.e (<host>, <signature>)
+	def getSeenKey(self, url, signature=None):
+
+		return (self.getHost(url), signature or url.signature)
+
+	def append(self, url):
+
+		self.getSignatures(url).add(url.signature)
+		if len(self.unconfirmed_signatures) > 0:
+			self.confirm(self.getSeenKey(url))
+		list.append(self, url)
+
+		for listener in self.listeners:
+			listener.recordDiscovered(url)
+
+	def extend(self, urls):
+
+		for url in urls:
+			self.append(url)
+
+	def __iadd__(self, urls):
+
+		self.extend(urls)
+		return self
+
+	# returns True if a URL with the same signature has already been added
+	# or if it would have, without the parameters that are ignored at its path
+	def isOld(self, url):
+
+		# (the first lookup of getSignatures, without the cost of calling it, since this is called for every URL found on every page)
+		signatures = self.origin_signatures.get(url.origin)
+		if signatures is None:
+			signatures = self.getSignatures(url)
+
+		if url.signature in signatures:
+			if len(self.unconfirmed_signatures) > 0:
+				self.confirm(self.getSeenKey(url))
+			return True
+
+		if len(self.ignored_parameters) == 0:
+			return False
+
+		ignored_parameters = self.ignored_parameters.get((url.type, url.origin + url.path))
+		if ignored_parameters is None:
+			return False
+
+		parameter_names = [parameter_name for parameter_name in url.getParameterNames() if parameter_name not in ignored_parameters]
+		signature = "&".join([url.type] + (parameter_names or [""]))
+		if signature in signatures:
+			if len(self.unconfirmed_signatures) > 0:
+				self.confirm(self.getSeenKey(url, signature))
+			self.ignored_signatures.add(self.getSeenKey(url))
+			return True
+
+		return False
+
+	# records that URLs with the same signature as the given URL count as discovered from now on, without adding the URL itself
+	# (see crawler_functions.filterPageData, which does this with the keys of the forms it submits)
+	# and, if seen_urls is a list, adds it to it, for crawler_state.CrawlState to write to disk at its next checkpoint
+	def recordSeen(self, url):
+
+		self.getSignatures(url).add(url.signature)
+
+		if self.seen_urls is not None:
+			self.seen_urls.append(url)
+
+	# records that a URL with the same signature as the given URL was found again, without checking whether it is old
+	def recordFound(self, url):
+
+		self.confirm(self.getSeenKey(url))
+
+	# records that the previous crawl's URLs with the given (host, signature) have been found again
+	# (and, if confirmed_signatures is a list, adds it to it, for crawler_state.CrawlState to write to disk at its next checkpoint)
+	def confirm(self, seen_key):
+
+		if seen_key in self.unconfirmed_signatures:
+			self.unconfirmed_signatures.remove(seen_key)
+			if self.confirmed_signatures is not None:
+				self.confirmed_signatures.append(seen_key)
+
+	# records that the given parameters don't change the page at the URL's path, whatever their values are
+	def ignoreParameters(self, url, parameter_names):
+
+		self.ignored_parameters.setdefault((url.type, url.origin + url.path), set()).update(parameter_names)
+
+	# returns True if the URL at the given position has been visited
+	def isVisited(self, position):
+
+		return position < self.visited or position in self.visited_out_of_order
+
+	# records that the URL at the given position has been visited
+	def recordVisited(self, position):
+
+		if position == self.visited:
+			self.visited += 1
+			while self.visited in self.visited_out_of_order:
+				self.visited_out_of_order.remove(self.visited)
+				self.visited += 1
+
+		elif position > self.visited:
+			self.visited_out_of_order.add(position)
+
+		for listener in self.listeners:
+			listener.recordVisited(position)
@@ -0,0 +1,221 @@
+import os
+import sys
+import json
+import time
+import threading
+
+# counters and timers for every stage of the crawl, so that it can be seen, while the crawl is running, which stage is holding it up
+# counters: how many times something has happened, e.g "requests", or "errors_timeout"
+# timers: how many times a stage has run, how long it took altogether, and how long its slowest run took, e.g "fetch", "parse", "output"
+# gauges: values which are read whenever a snapshot is taken, e.g how many URLs are waiting in the frontier
+# levels: values which go up and down as the crawl goes on, e.g how many requests are in flight, which are reported along with the gauges
+# the crawl only has one Metrics object, the module's 'metrics', which every module records into through count() and recordTime()
+# (requests are sent from more than one thread at once, when crawling concurrently, so everything is recorded under a lock)
+class Metrics:
+
+	def __init__(self):
+
+		self.counters = {}
+		self.timers = {} # maps each timer's name to [runs, seconds, slowest run in seconds]
+		self.gauges = {} # maps each gauge's name to a function that returns its value
+		self.levels = {}
+		self.lock = threading.Lock()
+		self.start_time = time.time()
+
+	def count(self, name, amount=1):
+
+		with self.lock:
+			self.counters[name] = self.counters.get(name, 0) + amount
+
+	def adjust(self, name, amount):
+
+		with self.lock:
+			self.levels[name] = self.levels.get(name, 0) + amount
+
+	def recordTime(self, name, elapsed):
+
+		with self.lock:
+
+			timer = self.timers.get(name)
+			if timer is None:
+				self.timers[name] = [1, elapsed, elapsed]
+			else:
+				timer[0] += 1
+				timer[1] += elapsed
+				timer[2] = max(timer[2], elapsed)
+
+	def addGauge(self, name, function):
+
+		self.gauges[name] = function
+
+	# returns the counters and timers recorded so far, and starts them over
+	# this is how worker processes hand their metrics back (see crawler_engine.extractTimedPageData), to be added in with merge()
+	def take(self):
+
+		with self.lock:
+			counters, timers = self.counters, self.timers
+			self.counters, self.timers = {}, {}
+
+		return counters, timers
+
+	def merge(self, taken):
+
+		counters, timers = taken
+
+		with self.lock:
+
+			for name in counters:
+				self.counters[name] = self.counters.get(name, 0) + counters[name]
+
+			for name in timers:
+				timer = self.timers.setdefault(name, [0, 0, 0])
+				timer[0] += timers[name][0]
+				timer[1] += timers[name][1]
+				timer[2] = max(timer[2], timers[name][2])
+
+	# returns everything as a dictionary, which can be written out as JSON
+	def getSnapshot(self):
+
+		with self.lock:
+			counters = dict(self.counters)
+			timers = dict([(name, {"runs":timer[0], "seconds":round(timer[1], 6), "max_seconds":round(timer[2], 6)}) for name, timer in self.timers.items()])
+			gauges = dict(self.levels)
+
+		for name, function in self.gauges.items():
+			try:
+				gauges[name] = function()
+			except Exception:
+				# e.g a dictionary changed size while it was being read, on another thread
+				continue
+
+		return {"time":time.time(), "elapsed_seconds":round(time.time() - self.start_time, 3), "counters":counters, "timers":timers, "gauges":gauges}
+
+metrics = Metrics()
+
+# gives this process a Metrics object of its own, and stops it from profiling
+# worker processes start with this (see crawler_engine.crawlConcurrently), because, when they are forked, they start with a copy of everything the crawler's process had recorded
+def resetMetrics():
+
+	global metrics
+	global profiler
+
+	metrics = Metrics()
+	profiler = None
+
+def count(name, amount=1):
+
+	metrics.count(name, amount)
+
+def adjust(name, amount):
+
+	metrics.adjust(name, amount)
+
+def recordTime(name, elapsed):
+
+	metrics.recordTime(name, elapsed)
+
+# the errors that requests can fail with, by the name they are counted under, e.g "errors_timeout"
+# (the first one of these that an exception is an instance of is the one it is counted as)
+def getErrorName(exception):
+
+	for base_class in type(exception).__mro__:
+		if base_class.__name__ == "Timeout":
+			return "errors_timeout"
+		if base_class.__name__ == "ConnectionError":
+			return "errors_connection"
+
+	return "errors_" + type(exception).__name__
+
+# returns the metrics in the Prometheus text exposition format, with every name prefixed with "jick_"
+def getPrometheusText(snapshot):
+
+	lines = []
+
+	for name, value in sorted(snapshot["counters"].items()):
+		lines.append("# TYPE jick_" + name + "_total counter")
+		lines.append("jick_" + name + "_total " + str(value))
+
+	for name, timer in sorted(snapshot["timers"].items()):
+		lines.append("# TYPE jick_" + name + "_seconds summary")
+		lines.append("jick_" + name + "_seconds_count " + str(timer["runs"]))
+		lines.append("jick_" + name + "_seconds_sum " + str(timer["seconds"]))
+
+	for name, value in sorted(snapshot["gauges"].items()):
+		lines.append("# TYPE jick_" + name + " gauge")
+		lines.append("jick_" + name + " " + str(value))
+
+	return "\n".join(lines) + "\n"
+
+# returns a single line summing up how the crawl is going, e.g
+# [30s] 1200 discovered, 410 visited (13.7/s), 790 queued, 8 in flight, 5.2 MB, 3 errors | fetch 24.1s parse 2.0s extraction 1.1s ...
+def getStatsLine(snapshot):
+
+	counters = snapshot["counters"]
+	gauges = snapshot["gauges"]
+	elapsed = max(snapshot["elapsed_seconds"], 0.001)
+
+	line = "[" + str(int(elapsed)) + "s] " + str(gauges.get("discovered", 0)) + " discovered, " + str(gauges.get("visited", 0)) + " visited (" + str(round(gauges.get("visited", 0) / elapsed, 1)) + "/s), "
+	line += str(gauges.get("queued", 0)) + " queued, " + str(gauges.get("in_flight", 0)) + " in flight, " + str(round(gauges.get("bytes_downloaded", 0) / 1024 / 1024, 1)) + " MB, "
+	line += str(sum([value for name, value in counters.items() if name.startswith("errors_")])) + " errors |"
+
+	for name, timer in sorted(snapshot["timers"].items(), key=lambda item: -item[1]["seconds"]):
+		line += " " + name + " " + str(round(timer["seconds"], 1)) + "s"
+
+	return line
+
+# one of the listeners of crawler_index.DiscoveredUrls, which, as the crawl progresses, every 'interval' seconds,
+# prints a stats line (see getStatsLine) if print_stats is True, and writes the metrics to metrics_file, if there is one,
+# as JSON, or in the Prometheus text format (if metrics_format is "prometheus"), which e.g the node exporter's textfile collector can pick up
+# the file is written to a temporary file first, and then moved into place, so whatever reads it never sees half of it
+class MetricsReporter:
+
+	def __init__(self, interval=5, print_stats=False, metrics_file="", metrics_format="json"):
+
+		self.interval = interval
+		self.print_stats = print_stats
+		self.metrics_file = metrics_file
+		self.metrics_format = metrics_format
+		self.last_report = time.time()
+
+	def recordDiscovered(self, url):
+
+		pass
+
+	def recordVisited(self, position):
+
+		if time.time() - self.last_report >= self.interval:
+			self.report()
+
+	def report(self):
+
+		snapshot = metrics.getSnapshot()
+
+		if self.print_stats:
+			print(getStatsLine(snapshot), file=sys.stderr)
+
+		if self.metrics_file:
+
+			if self.metrics_format == "prometheus":
+				text = getPrometheusText(snapshot)
+			else:
+				text = json.dumps(snapshot, indent=1, sort_keys=True) + "\n"
+
+			handler = open(self.metrics_file + ".tmp", "w")
+			handler.write(text)
+			handler.close()
+			os.replace(self.metrics_file + ".tmp", self.metrics_file)
+
+		self.last_report = time.time()
+
+# the profiler that harvesting runs under (see crawler_engine.harvestResponse), if the crawl is being profiled
+profiler = None
+
+def startProfiling():
+
+	if profiler is not None:
+		profiler.enable()
+
+def stopProfiling():
+
+	if profiler is not None:
+		profiler.disable()
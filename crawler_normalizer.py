@@ -0,0 +1,110 @@
+import re
+
+from urllib import parse
+
+# the characters that never need to be percent-encoded in a URL, so "%7E" and "~" are the same URL, and "~" is how it is written
+unreserved_characters = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~"
+
+# the characters that are left as they are in each part of the URL, with anything else (e.g spaces, or non-ASCII characters) being percent-encoded
+path_safe_characters = "/:@!$&'()*+,;=-._~%"
+query_safe_characters = path_safe_characters + "?"
+
+percent_encoding_pattern = re.compile("%([0-9a-fA-F]{2})")
+lone_percent_pattern = re.compile("%(?![0-9a-fA-F]{2})")
+
+default_ports = {"http":80, "https":443}
+
+# returns the canonical, absolute form of a link found on a page, or None if it isn't an HTTP(S) link (e.g "mailto:" or "javascript:")
+# so that the same page, spelled differently (e.g "../x", "/a/./x", "HTTPS://Example.com:443/x#top") is only ever discovered once
+# url: the link, as it is written on the page
+# base_url: the URL the link is relative to, i.e the page's own URL, or its <base href> (see crawler_functions.getBaseUrl)
+# sort_parameters: whether to put the query string's parameters in alphabetical order, which is only safe if the website doesn't care about their order
+# the link is:
+# resolved against the base URL, including "../", "./", "?q=1", "#fragment" and "//host/path" links
+# given a lower case scheme and host, and no port if it is the default one for the scheme
+# given "/" as its path if it doesn't have one, and has any "." and ".." segments in its path removed
+# percent-encoded consistently, i.e unreserved characters are decoded, escapes are upper case, and anything that should be encoded is
+# stripped of its fragment, since that is never sent to the server, and of its "?" if the query string is empty
+def normalizeUrl(url, base_url, sort_parameters=False):
+
+	absolute_url = parse.urljoin(base_url, url.strip())
+
+	try:
+		parsed_url = parse.urlsplit(absolute_url)
+		port = parsed_url.port
+	except ValueError:
+		# e.g an invalid port number, or a malformed IPv6 address
+		return None
+
+	scheme = parsed_url.scheme.lower()
+	if scheme not in default_ports or not parsed_url.hostname:
+		return None
+
+	netloc = parsed_url.hostname
+	if ":" in netloc:
+		# an IPv6 address
+		netloc = "[" + netloc + "]"
+
+	if port is not None and port != default_ports[scheme]:
+		netloc += ":" + str(port)
+
+	if "@" in parsed_url.netloc:
+		netloc = parsed_url.netloc.rpartition("@")[0] + "@" + netloc
+
+	path = normalizePercentEncoding(removeDotSegments(parsed_url.path), path_safe_characters)
+	if not path:
+		path = "/"
+
+	normalized_url = scheme + "://" + netloc + path
+
+	if parsed_url.query:
+
+		query = normalizePercentEncoding(parsed_url.query, query_safe_characters)
+
+		if sort_parameters:
+			query = "&".join(sorted(query.split("&"), key=lambda parameter: parameter.partition("=")[0]))
+
+		normalized_url += "?" + query
+
+	return normalized_url
+
+# removes the "." and ".." segments from a path, the way RFC 3986 (section 5.2.4) does it
+# e.g "/a/b/../c/./d" becomes "/a/c/d"
+def removeDotSegments(path):
+
+	if "." not in path:
+		return path
+
+	segments = []
+
+	for segment in path.split("/"):
+
+		if segment == "..":
+			if len(segments) > 1:
+				segments.pop()
+
+		elif segment != ".":
+			segments.append(segment)
+
+	# a path that ends in "." or ".." is a directory, so it keeps its trailing slash
+	if path.endswith("/.") or path.endswith("/.."):
+		segments.append("")
+
+	return "/".join(segments)
+
+# decodes escapes of unreserved characters, upper-cases every other escape, and encodes anything that should have been encoded
+def normalizePercentEncoding(text, safe_characters):
+
+	if "%" in text:
+		text = percent_encoding_pattern.sub(normalizeEscape, lone_percent_pattern.sub("%25", text))
+
+	return parse.quote(text, safe=safe_characters)
+
+def normalizeEscape(match):
+
+	character = chr(int(match.group(1), 16))
+
+	if character in unreserved_characters:
+		return character
+
+	return "%" + match.group(1).upper()
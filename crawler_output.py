@@ -0,0 +1,155 @@
+import json
+import time
+import sqlite3
+import crawler_metrics
+
+# writes each discovered URL to the output file as soon as it is discovered, rather than all at once when the crawl stops
+# so the output can be followed while the crawl is running, and a crash doesn't lose it
+# URLs are buffered, and only written to the file every flush_interval seconds
+# each format is a subclass, which only has to implement open(), writeUrls() and (optionally) close()
+# if diff is True, the output is a list of changes since a previous crawl (see crawler_baseline), in which every discovered URL is an added one,
+# and the URLs that weren't found again are written at the end, as removed ones (see writeRemoved)
+class OutputSink:
+
+	def __init__(self, filename, flush_interval=1, overwrite=False, diff=False):
+
+		self.filename = filename
+		self.flush_interval = flush_interval
+		self.buffer = []
+		self.last_flush = time.time()
+		self.diff = diff
+		self.change = "+" # what writeUrls is writing, when the output is a diff: "+" for added URLs, or "-" for removed ones
+		self.open(overwrite)
+
+	# called by crawler_index.DiscoveredUrls, with every new URL
+	def recordDiscovered(self, url):
+
+		self.buffer.append(url)
+		self.flushIfDue()
+
+	# called by crawler_index.DiscoveredUrls, as the crawl progresses
+	# so that the buffered URLs are still written on time, even when a lot of pages in a row don't turn up anything new
+	def recordVisited(self, visited):
+
+		self.flushIfDue()
+
+	def flushIfDue(self):
+
+		if time.time() - self.last_flush >= self.flush_interval:
+			self.flush()
+
+	def flush(self):
+
+		if len(self.buffer) > 0:
+			output_start = time.perf_counter()
+			self.writeUrls(self.buffer)
+			self.buffer = []
+			crawler_metrics.recordTime("output", time.perf_counter() - output_start)
+
+		self.last_flush = time.time()
+
+	def close(self):
+
+		self.flush()
+
+	def writeRemoved(self, urls):
+
+		self.flush()
+
+		self.change = "-"
+		self.writeUrls(urls)
+		self.change = "+"
+
+# the original output format: 1 line per URL, e.g "GET https://www.example.com/?q=whatever"
+# or, as a diff, with a "+ " or "- " in front of each line, e.g "+ GET https://www.example.com/?q=whatever"
+class TextSink(OutputSink):
+
+	def open(self, overwrite=False):
+
+		if overwrite:
+			self.handler = open(self.filename, "w")
+		else:
+			self.handler = open(self.filename, "a")
+
+	def writeUrls(self, urls):
+
+		if self.diff:
+			prefix = self.change + " "
+		else:
+			prefix = ""
+
+		self.handler.write("".join([prefix + url.type + " " + url.body + "\n" for url in urls]))
+		self.handler.flush()
+
+	def close(self):
+
+		self.flush()
+		self.handler.close()
+
+# JSON Lines: 1 JSON object per line, e.g {"type": "GET", "body": "https://www.example.com/?q=whatever"}
+# or, as a diff, with a "change" key, which is either "added" or "removed"
+class JsonLinesSink(TextSink):
+
+	def writeUrls(self, urls):
+
+		lines = []
+		for url in urls:
+			entry = {"type":url.type, "body":url.body}
+			if self.diff:
+				entry["change"] = changes[self.change]
+			lines.append(json.dumps(entry) + "\n")
+
+		self.handler.write("".join(lines))
+		self.handler.flush()
+
+# a SQLite database with a single 'urls' table, indexed by method and path
+# each URL is only ever stored once, even if the same output file is used for more than one crawl
+# as a diff, it is a 'changes' table instead, with the same columns plus 'change', which is either "added" or "removed"
+class SqliteSink(OutputSink):
+
+	def open(self, overwrite=False):
+
+		self.connection = sqlite3.connect(self.filename)
+		if self.diff:
+			self.connection.execute("CREATE TABLE IF NOT EXISTS changes (change TEXT NOT NULL, type TEXT NOT NULL, host TEXT, path TEXT, query TEXT, body TEXT NOT NULL, UNIQUE (change, type, body))")
+		else:
+			self.connection.execute("CREATE TABLE IF NOT EXISTS urls (type TEXT NOT NULL, host TEXT, path TEXT, query TEXT, body TEXT NOT NULL, UNIQUE (type, body))")
+			self.connection.execute("CREATE INDEX IF NOT EXISTS urls_type_path ON urls (type, path)")
+		self.connection.commit()
+
+	def writeUrls(self, urls):
+
+		rows = []
+		for url in urls:
+			rows.append((url.type, url.hostname, url.path, url.query or "", url.body))
+
+		if self.diff:
+			self.connection.executemany("INSERT OR IGNORE INTO changes (change, type, host, path, query, body) VALUES (?, ?, ?, ?, ?, ?)", [(changes[self.change],) + row for row in rows])
+		else:
+			self.connection.executemany("INSERT OR IGNORE INTO urls (type, host, path, query, body) VALUES (?, ?, ?, ?, ?)", rows)
+		self.connection.commit()
+
+	def close(self):
+
+		self.flush()
+		self.connection.close()
+
+# the names of the changes in a diff, for the formats that don't write them as "+" and "-"
+changes = {
+	"+":"added",
+	"-":"removed",
+}
+
+output_formats = {
+	"text":TextSink,
+	"jsonl":JsonLinesSink,
+	"sqlite":SqliteSink,
+}
+
+# returns the sink for the given output format, or None if there is no such format
+def getOutputSink(output_format, filename, flush_interval=1, overwrite=False, diff=False):
+
+	if output_format not in output_formats:
+		return None
+
+	return output_formats[output_format](filename, flush_interval, overwrite, diff)
@@ -0,0 +1,313 @@
+import re
+import time
+import requests
+import crawler_index
+import crawler_generator
+import crawler_normalizer
+import crawler_scheduler
+import crawler_scope
+
+# robots.txt is only read up to this many bytes, which is at least what RFC 9309 says a crawler has to read
+max_robots_size = 512 * 1024
+
+# a Crawl-delay longer than this many seconds is cut down to it, so a robots.txt can't stall the crawl completely
+max_crawl_delay = 60
+
+# a set of robots.txt-style path rules (e.g "/private", "/*.pdf$"), parsed once into a trie, so that finding the rules a path matches
+# only ever takes one walk down the trie, along the path, however many rules there are
+# the trie is keyed by the characters of each rule's path, up to its first wildcard:
+# a rule without wildcards is kept at the node its path ends on, since it matches any path that gets that far down the trie,
+# and a rule with wildcards is kept, as a regular expression for the rest of it, at the node its first wildcard is at,
+# so it is only ever tried on paths that start with everything before it
+# as RFC 9309 says, the rule with the longest path wins, and an Allow rule wins over a Disallow rule with a path of the same length
+# (see RobotsRules, and crawler_scope.Scope, which uses them for its path patterns)
+class PathRules:
+
+	def __init__(self):
+
+		self.trie = {}
+		self.rules = 0
+
+	# returns (the length of the longest rule that matches the path, whether it is an Allow rule), or (-1, True) if no rule matches it
+	# the path includes the query string, e.g "/search.php?q=whatever"
+	def getLongestMatch(self, path):
+
+		best_rule = (-1, True)
+		node = self.trie
+		position = 0
+
+		while True:
+
+			if "" in node:
+				best_rule = max(best_rule, node[""])
+
+			if "*" in node:
+				for rule_pattern, rule in node["*"]:
+					if rule > best_rule and rule_pattern.match(path, position):
+						best_rule = rule
+
+			if position == len(path):
+				break
+
+			node = node.get(path[position])
+			if node is None:
+				break
+
+			position += 1
+
+		return best_rule
+
+	# returns True if the path is allowed, i.e no rule matches it, or the one that wins is an Allow rule
+	def isAllowed(self, path):
+
+		return self.getLongestMatch(path)[1]
+
+	# returns True if any rule matches the path
+	def matches(self, path):
+
+		return self.getLongestMatch(path)[0] >= 0
+
+	def addRule(self, rule_path, allowed=False):
+
+		# the path is percent-encoded the same way the URLs it is checked against are (see crawler_normalizer)
+		rule_path = crawler_normalizer.normalizePercentEncoding(rule_path, crawler_normalizer.query_safe_characters)
+		rule = (len(rule_path), allowed)
+		self.rules += 1
+
+		wildcard = re.search("[*$]", rule_path)
+		literal_end = len(rule_path) if wildcard is None else wildcard.start()
+
+		node = self.trie
+		for character in rule_path[:literal_end]:
+			node = node.setdefault(character, {})
+
+		if literal_end == len(rule_path):
+			node[""] = max(node.get("", rule), rule)
+		else:
+			node.setdefault("*", []).append((compileWildcards(rule_path[literal_end:]), rule))
+
+# the rules of a website's robots.txt (see RFC 9309), for one user agent, in PathRules
+# robots_text: the contents of robots.txt
+# user_agent: the User-Agent the crawler sends; the rules followed are the ones of the group (or groups) whose User-agent line is its
+# product token (ignoring case, see getProductToken), or, if there isn't one, of the "User-agent: *" groups
+class RobotsRules(PathRules):
+
+	def __init__(self, robots_text="", user_agent=""):
+
+		PathRules.__init__(self)
+
+		self.crawl_delay = None # in seconds, or None if the group doesn't have a Crawl-delay line
+		self.sitemaps = [] # the URLs of every "Sitemap:" line
+		self.paths = [] # the path of every Allow and Disallow line, in every group, up to its first wildcard (see getRobotsUrls)
+		self.disallow_all = False # see getUnreachableRules
+
+		self.parse(robots_text, getProductToken(user_agent))
+
+	# returns True if the crawler may fetch the given path (with its query string, e.g "/search.php?q=whatever")
+	def isAllowed(self, path):
+
+		if self.disallow_all:
+			return path == "/robots.txt"
+
+		return PathRules.isAllowed(self, path)
+
+	def parse(self, robots_text, user_agent):
+
+		# [(<user agent names>, <rules>, <crawl delay>), ...], with each group being the User-agent lines, and the lines after them
+		groups = []
+		group = None
+
+		for line in robots_text.lstrip("\ufeff").splitlines():
+
+			name, colon, value = line.partition("#")[0].partition(":")
+			if not colon:
+				continue
+
+			name = name.strip().lower()
+			value = value.strip()
+
+			if name == "sitemap":
+				if value:
+					self.sitemaps.append(value)
+
+			elif name == "user-agent":
+				# several User-agent lines in a row share the lines that come after them
+				if group is None or len(group[1]) > 0 or group[2] is not None:
+					group = ([], [], None)
+					groups.append(group)
+				group[0].append(value.lower())
+
+			elif name in ["allow", "disallow"]:
+				if value:
+					self.paths.append(re.split("[*$]", value)[0])
+					if group is not None:
+						group[1].append((value, name == "allow"))
+
+			elif name == "crawl-delay" and group is not None:
+				try:
+					group = (group[0], group[1], float(value))
+					groups[-1] = group
+				except ValueError:
+					pass
+
+		for group_names, rules, crawl_delay in self.getGroups(groups, user_agent):
+
+			for rule_path, allowed in rules:
+				self.addRule(rule_path, allowed)
+
+			if crawl_delay is not None:
+				self.crawl_delay = max(self.crawl_delay or 0, min(crawl_delay, max_crawl_delay))
+
+	# returns the groups that apply to the user agent's product token, or if there aren't any, the "User-agent: *" groups
+	def getGroups(self, groups, product_token):
+
+		matching_groups = [group for group in groups if product_token and product_token in group[0]]
+
+		if len(matching_groups) == 0:
+			matching_groups = [group for group in groups if "*" in group[0]]
+
+		return matching_groups
+
+# returns the product token of a User-Agent, in lower case, i.e its first product's name, which is what robots.txt's User-agent lines are matched against
+# e.g "jick" for "jick/1.0 (+https://www.example.com/jick)", or "mozilla" for a browser's User-Agent
+def getProductToken(user_agent):
+
+	return user_agent.strip().partition(" ")[0].partition("/")[0].lower()
+
+# returns a regular expression for a rule's path, from its first wildcard on, where "*" is any number of characters,
+# and a "$" at the end means the path has to end there (anywhere else, it is just a "$")
+def compileWildcards(rule_path):
+
+	anchored = rule_path.endswith("$")
+	if anchored:
+		rule_path = rule_path[:-1]
+
+	rule_pattern = ".*".join([re.escape(part) for part in rule_path.split("*")])
+	if anchored:
+		rule_pattern += "$"
+
+	return re.compile(rule_pattern, re.DOTALL)
+
+# returns the rules for a robots.txt that couldn't be fetched because of a server or network error, which RFC 9309 says
+# have to be taken to disallow everything (whereas a robots.txt that doesn't exist, e.g a 404, allows everything)
+def getUnreachableRules():
+
+	rules = RobotsRules()
+	rules.disallow_all = True
+	return rules
+
+# fetches and parses the robots.txt of the website at origin (e.g "https://www.example.com"), see RobotsRules
+# if there is a scheduler (see crawler_scheduler.HostScheduler), the request waits its turn with it, like any other request to the website's host
+def fetchRobots(session, origin, user_agent, timeout=5, proxy={}, scheduler=None):
+
+	host = crawler_scheduler.getUrlHost(crawler_index.Url("GET", origin))
+	http_response = None
+
+	if scheduler is not None:
+		scheduler.wait(host)
+
+	request_start = time.time()
+
+	try:
+		http_response = session.get(origin + "/robots.txt", timeout=timeout, proxies=proxy, stream=True)
+	except requests.RequestException:
+		return getUnreachableRules()
+	finally:
+		if scheduler is not None:
+			scheduler.release(host, http_response, time.time() - request_start)
+
+	return readRobots(http_response, user_agent)
+
+# returns the rules of the robots.txt the (streamed) response is for, reading no more than max_robots_size bytes of it
+def readRobots(http_response, user_agent):
+
+	try:
+		if http_response.status_code >= 500:
+			return getUnreachableRules()
+
+		if http_response.status_code != 200:
+			return RobotsRules()
+
+		robots_bytes = b""
+		for chunk in http_response.iter_content(65536):
+			robots_bytes += chunk
+			if len(robots_bytes) >= max_robots_size:
+				break
+
+		robots_text = robots_bytes[:max_robots_size].decode("utf-8", "replace")
+
+	except requests.RequestException:
+		return getUnreachableRules()
+	finally:
+		http_response.close()
+
+	return RobotsRules(robots_text, user_agent)
+
+# the robots.txt rules of every website being crawled, which decide which of the discovered URLs the frontier lines up
+# (see crawler_frontier.Frontier), with each website's robots.txt having to be fetched before any of its URLs can be lined up
+# (or, without a session, the URLs of a website whose rules weren't added with addRules being allowed)
+# and each website's Crawl-delay being passed on to the scheduler, for the requests to its host
+# the policy never fetches anything by itself: the frontier holds back the URLs of a website whose rules it doesn't have yet,
+# and the crawl loop fetches its robots.txt (see crawler_engine), without holding up the requests to the other websites
+class RobotsPolicy:
+
+	def __init__(self, session=None, user_agent="", timeout=5, proxy={}, scheduler=None):
+
+		self.session = session
+		self.user_agent = user_agent
+		self.timeout = timeout
+		self.proxy = proxy
+		self.scheduler = scheduler
+		self.rules = {} # origin: RobotsRules
+		self.disallowed = 0
+
+	def addRules(self, origin, rules):
+
+		self.rules[origin] = rules
+
+		if self.scheduler is not None and rules.crawl_delay is not None:
+			self.scheduler.setCrawlDelay(crawler_scheduler.getUrlHost(crawler_index.Url("GET", origin)), rules.crawl_delay)
+
+	# returns True if the robots.txt of the website at origin has to be fetched before any of its URLs can be checked
+	def needsRules(self, origin):
+
+		return origin not in self.rules and self.session is not None
+
+	# fetches the robots.txt of the website at origin (waiting its turn with the scheduler), and returns its rules, without adding them
+	def fetchRules(self, origin):
+
+		return fetchRobots(self.session, origin, self.user_agent, self.timeout, self.proxy, self.scheduler)
+
+	# (a URL on a website whose rules haven't been added is allowed, see needsRules)
+	def isAllowed(self, url):
+
+		rules = self.rules.get(url.origin)
+		if rules is None or rules.isAllowed(url.tail.partition("#")[0]):
+			return True
+
+		self.disallowed += 1
+		return False
+
+# returns the paths of robots.txt's Allow and Disallow lines, as URLs on the website at origin, for crawling them,
+# leaving out the ones that have already been discovered, and, if there are scope rules, the ones that aren't in scope (see crawler_scope.getScope)
+def getRobotsUrls(rules, origin, old_urls, scope=None):
+
+	robots_urls = []
+
+	if scope is not None:
+		scope = crawler_scope.getScope(scope)
+
+	for rule_path in rules.paths:
+
+		absolute_url = crawler_normalizer.normalizeUrl(rule_path, origin + "/")
+		if absolute_url is None or not absolute_url.startswith(origin + "/"):
+			continue
+
+		if scope is not None and not scope.isInScope(absolute_url):
+			continue
+
+		url = crawler_index.Url("GET", absolute_url, source="robots")
+		if not old_urls.isOld(url):
+			robots_urls.append(url)
+
+	return crawler_generator.stripRedundancies(robots_urls)
@@ -0,0 +1,284 @@
+import time
+import random
+import asyncio
+import crawler_functions
+
+from email.utils import parsedate_to_datetime
+from collections import deque
+
+# HTTP status codes that mean the server is overloaded (or asking us to slow down), and the request is worth trying again
+retriable_statuses = [429, 502, 503, 504]
+
+# decides when each request is allowed to be sent, so that the crawler is polite to every host it crawls
+# it keeps a next-allowed time for each host, rather than sleeping after every request,
+# so waiting on one host never holds up requests to other hosts, or the parsing of pages that have already arrived
+# min_delay, max_delay: after each request to a host is sent, and again after it finishes, wait a random amount of time (in seconds) between these 2 before the next one
+# max_requests_per_second: never start more than this many requests a second to the same host (0 means no limit)
+# max_in_flight_per_host: never have more than this many requests to the same host in flight at once (0 means no limit)
+# max_retries: how many times to retry a request that timed out, failed to connect, or got one of the retriable_statuses back
+class HostScheduler:
+
+	def __init__(self, min_delay=0, max_delay=0, max_requests_per_second=0, max_in_flight_per_host=0, max_retries=0):
+
+		self.min_delay = min_delay
+		self.max_delay = max_delay
+		self.max_requests_per_second = max_requests_per_second
+		self.max_in_flight_per_host = max_in_flight_per_host
+		self.max_retries = max_retries
+		self.hosts = {}
+
+		# totals across every host, for reporting at the end of the crawl
+		self.requests = 0
+		self.errors = 0
+		self.retries = 0
+
+	# returns the scheduling state of the given host, creating it if this is the first request to it
+	def getHost(self, host):
+
+		if host not in self.hosts:
+			self.hosts[host] = self.newHost()
+
+		return self.hosts[host]
+
+	def newHost(self):
+
+		return {"next_allowed":0, "in_flight":0, "waiters":[], "crawl_delay":0}
+
+	# makes every request to the host start at least crawl_delay seconds after the one before it started, e.g for robots.txt's Crawl-delay
+	def setCrawlDelay(self, host, crawl_delay):
+
+		self.getHost(host)["crawl_delay"] = crawl_delay
+
+	# returns how many requests to the host may be in flight at once (0 means no limit)
+	def getInFlightLimit(self, host_state):
+
+		return self.max_in_flight_per_host
+
+	# returns how long to wait after a request to the host finishes, before the next one
+	def getDelay(self, host_state):
+
+		return crawler_functions.getBrowserDelay(self.min_delay, self.max_delay)
+
+	# if a request to the host is allowed right now, it is counted as in flight, and this returns 0
+	# (and the next request to the host is held back by the delay straight away, rather than once this one finishes,
+	# so that requests which are already waiting for the host, e.g with --concurrency, can't all be let through at once)
+	# otherwise it returns how many seconds to wait before trying again,
+	# or None if there are already too many requests to the host in flight, and we have to wait for one of them to finish
+	def tryAcquire(self, host):
+
+		host_state = self.getHost(host)
+		now = time.time()
+		in_flight_limit = self.getInFlightLimit(host_state)
+
+		if in_flight_limit > 0 and host_state["in_flight"] >= in_flight_limit:
+			return None
+
+		if now < host_state["next_allowed"]:
+			return host_state["next_allowed"] - now
+
+		host_state["in_flight"] += 1
+		host_state["next_allowed"] = now + self.getDelay(host_state)
+
+		if self.max_requests_per_second > 0:
+			host_state["next_allowed"] = max(host_state["next_allowed"], now + 1.0 / self.max_requests_per_second)
+
+		if host_state["crawl_delay"] > 0:
+			host_state["next_allowed"] = max(host_state["next_allowed"], now + host_state["crawl_delay"])
+
+		return 0
+
+	# blocks until a request to the host is allowed, for crawling one request at a time
+	def wait(self, host):
+
+		while True:
+
+			wait_time = self.tryAcquire(host)
+			if wait_time == 0:
+				return
+
+			if wait_time is None:
+				# this can only happen if requests are being made from more than one thread
+				wait_time = 0.01
+
+			time.sleep(wait_time)
+
+	# the same as wait(), but only the request that is waiting is held up, not the rest of the event loop
+	async def acquire(self, host):
+
+		while True:
+
+			wait_time = self.tryAcquire(host)
+			if wait_time == 0:
+				return
+
+			if wait_time is None:
+				waiter = asyncio.get_running_loop().create_future()
+				self.getHost(host)["waiters"].append(waiter)
+				await waiter
+			else:
+				await asyncio.sleep(wait_time)
+
+	# records that a request to the host has finished, and works out when the next one is allowed
+	# http_response is None if the request failed, e.g because it timed out, and latency is how long the request took (in seconds)
+	def release(self, host, http_response=None, latency=0):
+
+		host_state = self.getHost(host)
+
+		self.requests += 1
+		if http_response is None or http_response.status_code in retriable_statuses:
+			self.errors += 1
+
+		self.recordOutcome(host_state, http_response, latency)
+		host_state["next_allowed"] = max(host_state["next_allowed"], time.time() + self.getDelay(host_state))
+
+		self.cancel(host)
+
+	# records that a request to the host has finished without a response, because it was cancelled, so it isn't counted as a failure
+	def cancel(self, host):
+
+		host_state = self.getHost(host)
+		host_state["in_flight"] -= 1
+
+		# let the next request that is waiting for this host try again
+		while len(host_state["waiters"]) > 0:
+			waiter = host_state["waiters"].pop(0)
+			if not waiter.done():
+				waiter.set_result(None)
+				break
+
+	# called with the outcome of every request, see AdaptiveHostScheduler
+	def recordOutcome(self, host_state, http_response, latency):
+
+		pass
+
+	# returns True if a request should be tried again, after it failed (http_response is None) or got http_response back
+	# attempt is how many times it has already been retried
+	def shouldRetry(self, attempt, http_response=None):
+
+		if attempt >= self.max_retries:
+			return False
+
+		if http_response is not None and http_response.status_code not in retriable_statuses:
+			return False
+
+		self.retries += 1
+		return True
+
+	# returns how long to wait before a retry, which doubles with each attempt (with some randomness, so retries don't all land at once)
+	def getBackoff(self, attempt):
+
+		return min(0.5 * (2 ** attempt), 60) * random.uniform(0.5, 1)
+
+# a HostScheduler which also adapts how hard it crawls each host, to how that host is coping
+# for each host, it keeps a window of how many requests may be in flight, plus an extra delay between requests
+# every good response grows the window a little, and shrinks the extra delay (additive increase)
+# every error, 429 or 503, or a sharp rise in latency, halves the window and doubles the extra delay (multiplicative decrease)
+# a Retry-After header is always obeyed
+class AdaptiveHostScheduler(HostScheduler):
+
+	def __init__(self, min_delay=0, max_delay=0, max_requests_per_second=0, max_in_flight_per_host=0, max_retries=2, max_window=64):
+
+		HostScheduler.__init__(self, min_delay, max_delay, max_requests_per_second, max_in_flight_per_host, max_retries)
+
+		if max_in_flight_per_host > 0:
+			max_window = min(max_window, max_in_flight_per_host)
+
+		self.max_window = max(max_window, 1)
+
+	def newHost(self):
+
+		host_state = HostScheduler.newHost(self)
+		host_state["window"] = min(2.0, self.max_window)
+		host_state["extra_delay"] = 0.0
+		host_state["latencies"] = deque(maxlen=50) # the most recent latencies
+		host_state["baseline_latency"] = None # the lowest median latency seen so far
+		host_state["last_decrease"] = 0
+		return host_state
+
+	def getInFlightLimit(self, host_state):
+
+		return int(host_state["window"])
+
+	def getDelay(self, host_state):
+
+		return HostScheduler.getDelay(self, host_state) + host_state["extra_delay"]
+
+	def recordOutcome(self, host_state, http_response, latency):
+
+		now = time.time()
+
+		if http_response is not None:
+			host_state["latencies"].append(latency)
+
+			retry_after = getRetryAfter(http_response)
+			if retry_after is not None:
+				host_state["next_allowed"] = max(host_state["next_allowed"], now + retry_after)
+
+		if http_response is None or http_response.status_code in retriable_statuses or self.isSlowingDown(host_state):
+			self.decrease(host_state, now)
+		else:
+			self.increase(host_state)
+
+	# returns True if the host's recent latency has risen well above the best it has been
+	def isSlowingDown(self, host_state):
+
+		latencies = sorted(host_state["latencies"])
+		if len(latencies) < 10:
+			return False
+
+		median_latency = latencies[len(latencies) // 2]
+		if host_state["baseline_latency"] is None or median_latency < host_state["baseline_latency"]:
+			host_state["baseline_latency"] = median_latency
+
+		return getPercentile(latencies, 90) > max(3 * host_state["baseline_latency"], 0.05)
+
+	def increase(self, host_state):
+
+		host_state["window"] = min(host_state["window"] + 1.0 / host_state["window"], self.max_window)
+		host_state["extra_delay"] = host_state["extra_delay"] * 0.9
+		if host_state["extra_delay"] < 0.01:
+			host_state["extra_delay"] = 0.0
+
+	def decrease(self, host_state, now):
+
+		# the requests already in flight were sent at the old rate, so we only back off once for all of them
+		if len(host_state["latencies"]) > 0:
+			cool_down = getPercentile(sorted(host_state["latencies"]), 50)
+		else:
+			cool_down = 1
+
+		if now - host_state["last_decrease"] < cool_down:
+			return
+
+		host_state["window"] = max(host_state["window"] / 2, 1.0)
+		host_state["extra_delay"] = min(max(host_state["extra_delay"] * 2, 0.25), 30)
+		host_state["last_decrease"] = now
+
+# returns the value of the given percentile (0 - 100) from an already sorted list
+def getPercentile(sorted_values, percentile):
+
+	index = int(round((len(sorted_values) - 1) * percentile / 100.0))
+	return sorted_values[index]
+
+# returns how many seconds a response's Retry-After header asks us to wait, or None if there isn't one
+# the header may either be a number of seconds, or an HTTP date
+def getRetryAfter(http_response, max_wait=600):
+
+	retry_after = http_response.headers.get("Retry-After")
+	if retry_after is None:
+		return None
+
+	try:
+		seconds = float(retry_after)
+	except ValueError:
+		try:
+			seconds = parsedate_to_datetime(retry_after).timestamp() - time.time()
+		except (TypeError, ValueError):
+			return None
+
+	return min(max(seconds, 0), max_wait)
+
+# returns the host a URL will be requested from, which is what requests are scheduled by
+def getUrlHost(url):
+
+	return url.netloc
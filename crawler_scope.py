@@ -0,0 +1,112 @@
+import crawler_robots
+
+# a Scope is never dropped once it has been compiled, and each process (e.g every worker, see crawler_engine) compiles its own
+compiled_scopes = {}
+
+# how many hosts a Scope remembers whether they are in scope, before it starts over
+max_cached_hosts = 100000
+
+# decides which URLs are part of the crawl, i.e which of the links and forms found on a page are followed
+# hosts: the host names that are in scope, where "*.example.com" is any subdomain of example.com (but not example.com itself),
+# and "*" is any host
+# include_paths: if there are any, only URLs whose path (with the query string) matches one of them are in scope
+# exclude_paths: URLs whose path matches one of these are never in scope, even if it matches one of the include_paths as well
+# the paths are written the same way as the paths in robots.txt, e.g "/blog", "/*.pdf$" (see crawler_robots.PathRules)
+# a URL's host name is looked up in a set, and then each of its parent domains is, so checking a host takes a handful of set lookups,
+# and the outcome for each host is remembered, since most URLs are on a host that has been seen before
+# the paths are checked in a single walk along the URL's path, however many patterns there are
+class Scope:
+
+	def __init__(self, hosts=[], include_paths=[], exclude_paths=[]):
+
+		self.hosts = set()
+		self.domains = set() # the domains whose subdomains are all in scope
+		self.any_host = False
+		self.host_cache = {}
+
+		for host in hosts:
+			host = host.strip().lower()
+			if host == "*":
+				self.any_host = True
+			elif host.startswith("*."):
+				self.domains.add(host[2:])
+			elif host:
+				self.hosts.add(host)
+
+		self.include_paths = crawler_robots.PathRules()
+		for path in include_paths:
+			if path:
+				self.include_paths.addRule(path)
+
+		self.exclude_paths = crawler_robots.PathRules()
+		for path in exclude_paths:
+			if path:
+				self.exclude_paths.addRule(path)
+
+	# returns True if the URL (normalized, see crawler_normalizer.normalizeUrl) is in scope
+	def isInScope(self, url):
+
+		netloc_start = url.find("://") + 3
+		path_start = len(url)
+		for separator in "/?#":
+			separator_position = url.find(separator, netloc_start)
+			if 0 <= separator_position < path_start:
+				path_start = separator_position
+
+		netloc = url[netloc_start:path_start]
+		in_scope = self.host_cache.get(netloc)
+
+		if in_scope is None:
+			if len(self.host_cache) >= max_cached_hosts:
+				self.host_cache.clear()
+			in_scope = self.isHostInScope(getHostName(netloc))
+			self.host_cache[netloc] = in_scope
+
+		if not in_scope:
+			return False
+
+		if self.include_paths.rules == 0 and self.exclude_paths.rules == 0:
+			return True
+
+		path = url[path_start:].partition("#")[0] or "/"
+
+		if self.include_paths.rules > 0 and not self.include_paths.matches(path):
+			return False
+
+		return not self.exclude_paths.matches(path)
+
+	def isHostInScope(self, host):
+
+		if self.any_host or host in self.hosts:
+			return True
+
+		dot = host.find(".")
+		while dot >= 0:
+			if host[dot + 1:] in self.domains:
+				return True
+			dot = host.find(".", dot + 1)
+
+		return False
+
+# returns the host name of a netloc, without any user name, password or port, e.g "www.example.com" for "user@www.example.com:8080"
+def getHostName(netloc):
+
+	netloc = netloc.rpartition("@")[2].lower()
+
+	if netloc.startswith("["):
+		# an IPv6 address
+		return netloc[1:].partition("]")[0]
+
+	return netloc.partition(":")[0]
+
+# returns the compiled Scope for the given scope rules, i.e (<hosts>, <include paths>, <exclude paths>), compiling it the first time
+# (the rules are what is passed around, e.g to the worker processes, since they are much smaller than the Scope, which remembers every host it has seen)
+def getScope(scope_rules):
+
+	scope = compiled_scopes.get(scope_rules)
+
+	if scope is None:
+		scope = Scope(*scope_rules)
+		compiled_scopes[scope_rules] = scope
+
+	return scope
@@ -0,0 +1,298 @@
+import gzip
+import time
+import queue
+import requests
+import threading
+import crawler_index
+import crawler_metrics
+import crawler_functions
+import crawler_generator
+import crawler_scheduler
+import crawler_scope
+import crawler_normalizer
+
+from lxml import etree
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# how many sitemap indexes deep the reader follows, e.g 2 is a sitemap index that lists other sitemap indexes, which list sitemaps
+max_sitemap_depth = 5
+
+# a file-like object which reads the bytes that were already read from a stream (to see what kind of file it is) and then the rest of the stream
+class PrefixedStream:
+
+	def __init__(self, prefix, stream):
+
+		self.prefix = prefix
+		self.stream = stream
+
+	def read(self, size=-1):
+
+		if len(self.prefix) == 0:
+			return self.stream.read(size)
+
+		if size < 0:
+			data = self.prefix + self.stream.read()
+			self.prefix = b""
+			return data
+
+		data, self.prefix = self.prefix[:size], self.prefix[size:]
+		if len(data) < size:
+			data += self.stream.read(size - len(data))
+
+		return data
+
+# returns the body of a streamed response, as a file-like object, unzipped if it is gzipped (e.g sitemap.xml.gz)
+# whether it was sent with a "Content-Encoding: gzip" header (which urllib3 takes care of) or is a .gz file, which is only known by its first 2 bytes
+def getBodyStream(http_response):
+
+	http_response.raw.decode_content = True
+	magic_number = http_response.raw.read(2)
+	stream = PrefixedStream(magic_number, http_response.raw)
+
+	if magic_number == b"\x1f\x8b":
+		stream = gzip.GzipFile(fileobj=stream)
+
+	return stream
+
+# reads the sitemaps of a website, and every sitemap their sitemap indexes list, and passes each URL in them on as soon as it is read,
+# without ever having a whole sitemap in memory, so a sitemap with millions of URLs in it takes as little memory as one with 10
+# sitemaps are either XML (a <urlset> of <url><loc> tags, or a <sitemapindex> of <sitemap><loc> tags, see https://www.sitemaps.org/protocol.html),
+# gzipped or not, or plain text files with 1 URL per line
+# XML sitemaps are parsed incrementally, and every <url> and <sitemap> tag is thrown away once its <loc> has been read
+# up to 'concurrency' sitemaps are read at once, each on its own thread, and each request waits its turn with the scheduler (if there is one),
+# like any other request to the same host
+# the URLs are passed back to the thread read() was called on, in batches, through a queue with room for queue_size batches of them,
+# so the threads reading the sitemaps are held up whenever they get too far ahead of it
+class SitemapReader:
+
+	def __init__(self, session, timeout=5, proxy={}, scheduler=None, concurrency=4, queue_size=8):
+
+		self.session = session
+		self.timeout = timeout
+		self.proxy = proxy
+		self.scheduler = scheduler
+		self.concurrency = max(concurrency, 1)
+		self.queue_size = queue_size
+
+		self.lock = threading.Lock() # for the scheduler (which is only used by one thread at a time anywhere else), and the counts
+		self.stopped = False
+
+		self.sitemaps = 0 # how many sitemaps were read
+		self.errors = 0 # how many sitemaps couldn't be fetched, or were cut short because they were malformed
+		self.urls = 0
+
+	# reads the given sitemaps, and every sitemap they list, calling addUrl with each URL in them (as a string), on this thread
+	# addUrl returns False once it doesn't want any more URLs, which stops every sitemap from being read any further
+	def read(self, sitemap_urls, addUrl):
+
+		pending_sitemaps = deque([(sitemap_url, 0) for sitemap_url in crawler_generator.stripRedundancies(sitemap_urls)])
+		seen_sitemaps = set(sitemap_urls)
+		entries = queue.Queue(self.queue_size)
+		reading = 0
+		self.stopped = False
+
+		executor = ThreadPoolExecutor(max_workers=self.concurrency)
+
+		try:
+			while len(pending_sitemaps) > 0 or reading > 0:
+
+				while len(pending_sitemaps) > 0 and reading < self.concurrency and not self.stopped:
+					sitemap_url, depth = pending_sitemaps.popleft()
+					executor.submit(self.readSitemap, sitemap_url, depth, entries)
+					reading += 1
+
+				if self.stopped:
+					pending_sitemaps.clear()
+
+				if reading == 0:
+					continue
+
+				message_type, batch, depth = entries.get()
+
+				if message_type == "done":
+					reading -= 1
+					continue
+
+				for entry_type, body in batch:
+
+					if self.stopped:
+						# the threads are still finishing off what they had already read
+						break
+
+					if entry_type == "sitemap":
+						if body not in seen_sitemaps and depth < max_sitemap_depth:
+							seen_sitemaps.add(body)
+							pending_sitemaps.append((body, depth + 1))
+
+					else:
+						self.urls += 1
+						if not addUrl(body):
+							self.stopped = True
+
+		finally:
+			self.stopped = True
+
+			# the threads that are still reading can't finish until there is room in the queue for what they have read
+			while reading > 0:
+				if entries.get()[0] == "done":
+					reading -= 1
+
+			executor.shutdown()
+
+	# reads a single sitemap, on one of the executor's threads, putting ("entries", [(<"url" or "sitemap">, <url>), ...], depth) in the entries queue
+	# for every batch of batch_size URLs in it, and ("done", <sitemap url>, depth) once it is done
+	# (the URLs are passed on in batches, since passing each one through the queue on its own would take longer than parsing it)
+	def readSitemap(self, sitemap_url, depth, entries, batch_size=500):
+
+		batch = []
+
+		try:
+			for entry in self.getEntries(sitemap_url):
+
+				batch.append(entry)
+
+				if len(batch) >= batch_size:
+					if self.stopped:
+						break
+					entries.put(("entries", batch, depth))
+					batch = []
+
+			with self.lock:
+				self.sitemaps += 1
+
+		except Exception as exception:
+			with self.lock:
+				self.errors += 1
+			crawler_metrics.count(crawler_metrics.getErrorName(exception))
+
+		finally:
+			# what was read before a sitemap turned out to be malformed is still passed on
+			if len(batch) > 0 and not self.stopped:
+				entries.put(("entries", batch, depth))
+
+			entries.put(("done", sitemap_url, depth))
+
+	# yields ("url", <url>) for every page the sitemap lists, or ("sitemap", <url>) for every sitemap, if it is a sitemap index
+	def getEntries(self, sitemap_url):
+
+		http_response = self.fetch(sitemap_url)
+
+		try:
+			if http_response.status_code != 200:
+				raise requests.HTTPError(str(http_response.status_code) + " " + sitemap_url, response=http_response)
+
+			stream = getBodyStream(http_response)
+			start = stream.read(512)
+			stream = PrefixedStream(start, stream)
+
+			if start.lstrip()[:1] == b"<":
+				for entry in getXmlEntries(stream):
+					yield entry
+			else:
+				for entry in getTextEntries(stream):
+					yield entry
+
+		finally:
+			http_response.close()
+
+	# requests a sitemap, once the scheduler allows a request to its host, without reading its body yet
+	def fetch(self, sitemap_url):
+
+		if self.scheduler is None:
+			return self.session.get(sitemap_url, timeout=self.timeout, proxies=self.proxy, stream=True)
+
+		host = crawler_scheduler.getUrlHost(crawler_index.Url("GET", sitemap_url))
+
+		while True:
+
+			with self.lock:
+				wait_time = self.scheduler.tryAcquire(host)
+
+			if wait_time == 0:
+				break
+
+			time.sleep(wait_time or 0.01)
+
+		request_start = time.time()
+		http_response = None
+
+		try:
+			http_response = self.session.get(sitemap_url, timeout=self.timeout, proxies=self.proxy, stream=True)
+			return http_response
+		finally:
+			with self.lock:
+				self.scheduler.release(host, http_response, time.time() - request_start)
+
+# yields the entries of an XML sitemap, or sitemap index (see SitemapReader.getEntries), as it is parsed
+# a sitemap that turns out to be malformed part of the way through still has the entries before that yielded
+def getXmlEntries(stream):
+
+	# only the <loc> tags (in whatever namespace) are passed back from lxml, which is much faster than going through every tag
+	# entities aren't expanded, and nothing is fetched from the network, since a sitemap could be written by anyone
+	for event, element in etree.iterparse(stream, events=("end",), tag="{*}loc", resolve_entities=False, no_network=True, huge_tree=True):
+
+		parent = element.getparent()
+		if parent is None:
+			continue
+
+		if element.text and element.text.strip():
+			if parent.tag.endswith("sitemap"):
+				yield ("sitemap", element.text.strip())
+			elif parent.tag.endswith("url"):
+				yield ("url", element.text.strip())
+
+		# every <url> (or <sitemap>) tag before this one has been read, so it can be thrown away
+		root = parent.getparent()
+		if root is not None:
+			while parent.getprevious() is not None:
+				del root[0]
+
+# yields the entries of a plain text sitemap, i.e 1 URL per line
+def getTextEntries(stream):
+
+	remainder = b""
+
+	while True:
+
+		chunk = stream.read(65536)
+		lines = (remainder + chunk).split(b"\n")
+
+		if chunk:
+			remainder = lines.pop()
+		else:
+			remainder = b""
+
+		for line in lines:
+			line = line.strip().decode("utf-8", "replace")
+			if line:
+				yield ("url", line)
+
+		if not chunk:
+			break
+
+# reads the given sitemaps (see SitemapReader), adding every new URL on 'host' (or in scope, see crawler_scope.getScope) in them to the discovered URLs as it is read,
+# until there are max_results discovered URLs
+# the URLs are normalized in the same way links are (see crawler_normalizer), and count as being 1 link away from the start URLs
+# returns the reader, which counts how many sitemaps and URLs were read
+def addSitemapUrls(session, discovered_urls, sitemap_urls, host, timeout=5, proxy={}, scheduler=None, concurrency=4, max_results=0, scope=None):
+
+	reader = SitemapReader(session, timeout, proxy, scheduler, concurrency)
+
+	if scope is not None:
+		scope = crawler_scope.getScope(scope)
+
+	def addUrl(body):
+
+		absolute_url = crawler_normalizer.normalizeUrl(body, body)
+
+		if absolute_url is not None and crawler_functions.isValidHost(host, absolute_url, scope):
+			url = crawler_index.Url("GET", absolute_url, 1, "sitemap")
+			if not discovered_urls.isOld(url):
+				discovered_urls.append(url)
+
+		return max_results <= 0 or len(discovered_urls) < max_results
+
+	reader.read(sitemap_urls, addUrl)
+
+	return reader
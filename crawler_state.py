@@ -0,0 +1,180 @@
+import os
+import time
+import crawler_index
+import crawler_metrics
+
+# keeps a record of the crawl on disk, so that it can be resumed after a crash, an out-of-memory kill, or Ctrl-C
+# the state file is append-only, and each line is one of:
+# U <url>          a start URL the crawl was begun with
+# D <type> <depth> <source> <body>  a discovered URL, in the order it was discovered, with how it was found (see crawler_frontier)
+# S <type> <body>  a URL whose signature counts as discovered, without it being one of the discovered URLs (see crawler_index.DiscoveredUrls.recordSeen)
+# V <number>       how many of the discovered URLs, in a row from the first one, have been visited so far (the last one in the file is the one that counts)
+# P <position>     the discovered URL at that position was visited ahead of its turn (see crawler_index.DiscoveredUrls)
+# B <filename>     a file of the baseline the crawl is a diff against (see crawler_baseline), in the order they were given
+# C <host> <signature>  a signature of the baseline that was found again (see crawler_index.DiscoveredUrls.unconfirmed_signatures)
+# the discovered URLs are usually visited in the order they were discovered, so the V lines are usually all we need to know where to continue from
+# lines are only written to disk at each checkpoint, so a checkpoint only costs as much as what was found since the last one
+class CrawlState:
+
+	def __init__(self, filename, checkpoint_interval=5, resume=False):
+
+		self.filename = filename
+		self.checkpoint_interval = checkpoint_interval
+		self.start_urls = []
+		self.baseline_files = []
+		self.confirmed_signatures = set() # the (host, signature) of the C lines, when resuming
+		self.discovered_urls = crawler_index.DiscoveredUrls()
+
+		if resume:
+			self.load()
+			truncateTornLine(filename)
+			self.handler = open(filename, "a")
+		else:
+			self.handler = open(filename, "w")
+
+		self.lines = []
+		self.recorded_visited = self.discovered_urls.visited
+		self.discovered_urls.listeners.append(self)
+		self.discovered_urls.seen_urls = []
+		self.last_checkpoint = time.time()
+
+	# reads a previous crawl's state back in
+	def load(self):
+
+		handler = open(self.filename, "r")
+		visited = 0
+		visited_positions = []
+
+		for line in handler:
+
+			if not line.endswith("\n"):
+				# the crawler was stopped in the middle of writing this line
+				break
+
+			parsed_line = line[:-1].split(" ", 2)
+
+			if parsed_line[0] == "U" and len(parsed_line) >= 2:
+				self.start_urls.append(line[2:-1])
+
+			elif parsed_line[0] == "B" and len(parsed_line) >= 2:
+				self.baseline_files.append(line[2:-1])
+
+			elif parsed_line[0] == "C" and len(parsed_line) == 3:
+				self.confirmed_signatures.add((parsed_line[1], parsed_line[2]))
+
+			elif parsed_line[0] == "D":
+
+				parsed_url_line = line[:-1].split(" ", 4)
+
+				if len(parsed_url_line) == 5 and parsed_url_line[2].isdigit():
+					self.discovered_urls.append(crawler_index.Url(parsed_url_line[1], parsed_url_line[4], int(parsed_url_line[2]), parsed_url_line[3].strip("-")))
+
+			elif parsed_line[0] == "S" and len(parsed_line) == 3:
+				self.discovered_urls.recordSeen(crawler_index.Url(parsed_line[1], parsed_line[2]))
+
+			elif parsed_line[0] in ["V", "P"] and len(parsed_line) == 2:
+				try:
+					number = int(parsed_line[1])
+				except ValueError:
+					continue
+
+				if parsed_line[0] == "V":
+					visited = number
+				else:
+					visited_positions.append(number)
+
+		handler.close()
+
+		self.discovered_urls.visited = visited
+		for position in visited_positions:
+			self.discovered_urls.recordVisited(position)
+
+	def recordStartUrl(self, url):
+
+		self.start_urls.append(url)
+		self.lines.append("U " + url + "\n")
+
+	# records the files of the baseline the crawl is a diff against, so a resumed crawl carries on with the same one
+	def recordBaseline(self, baseline_files):
+
+		for filename in baseline_files:
+			self.baseline_files.append(os.path.abspath(filename))
+			self.lines.append("B " + os.path.abspath(filename) + "\n")
+
+	# from now on, records each of the baseline's signatures that is found again, at the next checkpoint,
+	# since a resumed crawl wouldn't otherwise know about the ones found on the pages that were visited before it was stopped
+	# (the discovered URLs keep a list of the ones found since the last checkpoint, so a checkpoint only costs as much as how many there are)
+	def trackBaseline(self):
+
+		self.discovered_urls.confirmed_signatures = []
+
+	def recordDiscovered(self, url):
+
+		self.lines.append("D " + url.type + " " + str(url.depth) + " " + (url.source or "-") + " " + url.body + "\n")
+
+	def recordVisited(self, position):
+
+		if position in self.discovered_urls.visited_out_of_order:
+			self.lines.append("P " + str(position) + "\n")
+
+		self.checkpoint()
+
+	# writes everything recorded since the last checkpoint to disk, but only if checkpoint_interval seconds have passed (or force is True)
+	def checkpoint(self, force=False):
+
+		if not force and time.time() - self.last_checkpoint < self.checkpoint_interval:
+			return
+
+		if self.discovered_urls.visited != self.recorded_visited:
+			self.lines.append("V " + str(self.discovered_urls.visited) + "\n")
+			self.recorded_visited = self.discovered_urls.visited
+
+		if self.discovered_urls.seen_urls:
+			for url in self.discovered_urls.seen_urls:
+				self.lines.append("S " + url.type + " " + url.body + "\n")
+			self.discovered_urls.seen_urls = []
+
+		if self.discovered_urls.confirmed_signatures:
+			for host, signature in self.discovered_urls.confirmed_signatures:
+				self.lines.append("C " + host + " " + signature + "\n")
+			self.discovered_urls.confirmed_signatures = []
+
+		if len(self.lines) > 0:
+			checkpoint_start = time.perf_counter()
+			self.handler.write("".join(self.lines))
+			self.handler.flush()
+			os.fsync(self.handler.fileno())
+			self.lines = []
+			crawler_metrics.recordTime("checkpoint", time.perf_counter() - checkpoint_start)
+
+		self.last_checkpoint = time.time()
+
+	def close(self):
+
+		self.checkpoint(force=True)
+		self.handler.close()
+
+# cuts off the last line of a state file if the crawler was stopped in the middle of writing it (i.e it doesn't end with a newline),
+# so that what a resumed crawl writes after it doesn't end up on the end of it, and spoil every line from there on
+# only the end of the file is read, however big it is
+def truncateTornLine(filename):
+
+	with open(filename, "rb+") as handler:
+
+		end = handler.seek(0, os.SEEK_END)
+		position = end
+
+		while position > 0:
+
+			chunk_start = max(position - 65536, 0)
+			handler.seek(chunk_start)
+			newline = handler.read(position - chunk_start).rfind(b"\n")
+
+			if newline >= 0:
+				position = chunk_start + newline + 1
+				break
+
+			position = chunk_start
+
+		if position < end:
+			handler.truncate(position)
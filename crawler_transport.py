@@ -0,0 +1,212 @@
+import os
+import ssl
+import time
+import socket
+import requests
+
+from urllib3.connection import HTTPConnection
+
+# httpx (with h2) is only needed for --http2, so the crawler works without it
+try:
+	import httpx
+except ImportError:
+	httpx = None
+
+# returns the Accept-Encoding header to send, which only offers brotli if urllib3 is able to decode it, i.e if brotli (or brotlicffi) is installed
+def getAcceptEncoding():
+
+	try:
+		import brotli
+	except ImportError:
+		try:
+			import brotlicffi
+		except ImportError:
+			return "gzip, deflate"
+
+	return "gzip, deflate, br"
+
+# returns True if HTTP/2 can be used, i.e if httpx and h2 are installed
+def isHttp2Available():
+
+	if httpx is None:
+		return False
+
+	try:
+		import h2
+	except ImportError:
+		return False
+
+	return True
+
+# caches the results of DNS lookups for 'ttl' seconds, so that a crawl doesn't look up the same host name every time it opens a connection to it
+# install() puts it in place of socket.getaddrinfo, which is what urllib3 looks host names up with, for the whole process
+# failed lookups aren't cached, so a host that couldn't be looked up once will be looked up again next time
+class DnsCache:
+
+	def __init__(self, ttl=300):
+
+		self.ttl = ttl
+		self.results = {} # maps each lookup's arguments to (when it expires, its result)
+		self.lookups = 0
+		self.hits = 0
+		self.resolve = socket.getaddrinfo
+
+	def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+
+		key = (host, port, family, type, proto, flags)
+		cached = self.results.get(key)
+		self.lookups += 1
+
+		if cached is not None and cached[0] > time.monotonic():
+			self.hits += 1
+			return cached[1]
+
+		result = self.resolve(host, port, family, type, proto, flags)
+		self.results[key] = (time.monotonic() + self.ttl, result)
+
+		return result
+
+	def install(self):
+
+		socket.getaddrinfo = self.getaddrinfo
+
+# the adapter every HTTP and HTTPS request is sent through, unless --http2 is used (see Http2Adapter)
+# it is the same as requests' own, except that TCP keep-alive is turned on for its connections, so that idle connections in the pool
+# (e.g to a host that is being waited on, because of --min-delay) aren't silently dropped by a firewall or NAT in between
+class TransportAdapter(requests.adapters.HTTPAdapter):
+
+	def init_poolmanager(self, *args, **kwargs):
+
+		kwargs["socket_options"] = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+		requests.adapters.HTTPAdapter.init_poolmanager(self, *args, **kwargs)
+
+# headers that are only about the connection they are sent over, which HTTP/2 doesn't allow
+hop_by_hop_headers = ["connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"]
+
+# a streamed HTTP/2 response body, in the form requests reads response bodies in (see Http2Adapter)
+class Http2Body:
+
+	def __init__(self, http_response):
+
+		self.http_response = http_response
+		self.chunks = http_response.iter_bytes()
+		self.buffer = b""
+
+	def read(self, size=-1):
+
+		while size < 0 or len(self.buffer) < size:
+			try:
+				self.buffer += next(self.chunks)
+			except StopIteration:
+				break
+
+		if size < 0:
+			size = len(self.buffer)
+
+		data, self.buffer = self.buffer[:size], self.buffer[size:]
+		return data
+
+	# how much of the body has been read, as it came over the wire (i.e before it was decompressed, if it was compressed)
+	def tell(self):
+
+		return self.http_response.num_bytes_downloaded
+
+	def close(self):
+
+		self.http_response.close()
+
+	def release_conn(self):
+
+		self.close()
+
+# sends requests over HTTP/2 (or HTTP/1.1, to servers that don't support HTTP/2) with httpx, for requests' sessions
+# every request to the same host is multiplexed over a single connection, instead of each request in flight needing its own
+# the responses are requests' own responses, so the rest of the crawler doesn't have to know the difference
+# (cookies set over HTTP/2 aren't kept, because requests only knows how to read them from its own responses)
+class Http2Adapter(requests.adapters.BaseAdapter):
+
+	def __init__(self, pool_size=10):
+
+		requests.adapters.BaseAdapter.__init__(self)
+
+		self.pool_size = pool_size
+		self.clients = {} # one httpx client for each proxy (or None, for no proxy) and certificate verification setting
+
+	def getClient(self, proxies, verify=True):
+
+		proxy = (proxies or {}).get("https")
+		if proxy and "://" not in proxy:
+			proxy = "http://" + proxy
+
+		if (proxy, verify) not in self.clients:
+
+			# requests passes the CA bundle to verify with as a path (e.g from REQUESTS_CA_BUNDLE), which httpx wants as an SSL context
+			if isinstance(verify, str) and os.path.isdir(verify):
+				ssl_context = ssl.create_default_context(capath=verify)
+			elif isinstance(verify, str):
+				ssl_context = ssl.create_default_context(cafile=verify)
+			else:
+				ssl_context = verify
+
+			limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+			# redirects are followed by requests' session, as they are with its own adapters
+			self.clients[(proxy, verify)] = httpx.Client(http2=True, limits=limits, proxy=proxy, verify=ssl_context, follow_redirects=False)
+
+		return self.clients[(proxy, verify)]
+
+	def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+
+		if isinstance(timeout, tuple):
+			timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+		else:
+			timeout = httpx.Timeout(timeout)
+
+		client = self.getClient(proxies, verify)
+		headers = dict([(name, value) for name, value in request.headers.items() if name.lower() not in hop_by_hop_headers])
+		http2_request = client.build_request(request.method, request.url, headers=headers, content=request.body, timeout=timeout)
+
+		try:
+			http2_response = client.send(http2_request, stream=True)
+		except httpx.TimeoutException as exception:
+			raise requests.exceptions.Timeout(exception, request=request)
+		except httpx.TransportError as exception:
+			raise requests.exceptions.ConnectionError(exception, request=request)
+
+		http_response = requests.Response()
+		http_response.status_code = http2_response.status_code
+		http_response.reason = http2_response.reason_phrase
+		http_response.headers = requests.structures.CaseInsensitiveDict(http2_response.headers)
+		http_response.encoding = requests.utils.get_encoding_from_headers(http_response.headers)
+		http_response.raw = Http2Body(http2_response)
+		http_response.url = request.url
+		http_response.request = request
+		http_response.connection = self
+
+		if not stream:
+			http_response.content
+
+		return http_response
+
+	def close(self):
+
+		for client in self.clients.values():
+			client.close()
+
+# returns the session every request of the crawl is sent with
+# it keeps up to pool_size connections open to each host (which should be at least as many as there are requests in flight at once,
+# or else the connections over that number are opened, used once and thrown away), asks for compressed responses, and keeps connections alive
+# if http2 is True (and httpx and h2 are installed), HTTPS requests are sent over HTTP/2
+# the Host header is left to requests, which sets it for each request, so it is right for redirects to other hosts, and has the port in it
+def getSession(user_agent, pool_size=10, http2=False):
+
+	session = requests.session()
+	session.headers.update({"User-Agent":user_agent, "Accept-Encoding":getAcceptEncoding(), "Connection":"keep-alive"})
+
+	adapter = TransportAdapter(pool_connections=10, pool_maxsize=pool_size)
+	session.mount("http://", adapter)
+	session.mount("https://", adapter)
+
+	if http2:
+		session.mount("https://", Http2Adapter(pool_size))
+
+	return session
@@ -1,10 +1,28 @@
 #!/usr/bin/python
 
-import requests
 import sys
 import time
 import datetime
-import crawler_functions
+import asyncio
+import json
+import sqlite3
+import cProfile
+import crawler_baseline
+import crawler_cache
+import crawler_download
+import crawler_engine
+import crawler_fingerprint
+import crawler_frontier
+import crawler_generator
+import crawler_index
+import crawler_metrics
+import crawler_normalizer
+import crawler_output
+import crawler_robots
+import crawler_scheduler
+import crawler_sitemap
+import crawler_state
+import crawler_transport
 
 from urllib import parse
 from lxml import html
@@ -12,9 +30,20 @@ from lxml import html
 now = datetime.datetime.now()
 
 # SETTINGS
+if "--resume" in sys.argv:
+	try:
+		resume_file = sys.argv[sys.argv.index("--resume")+1]
+	except:
+		print("You must specify the state file of the crawl to resume.")
+		sys.exit(1)
+else:
+	resume_file = ""
+
 if "--urls" not in sys.argv:
-	print("You must enter a URL to start crawling at, with the --urls argument.")
-	sys.exit(1)
+	if not resume_file:
+		print("You must enter a URL to start crawling at, with the --urls argument.")
+		sys.exit(1)
+	start_urls = []
 else:
 	try:
 		start_urls = sys.argv[sys.argv.index("--urls")+1].split(",")
@@ -47,6 +76,35 @@ if "--robots" in sys.argv:
 else:
 	robots = False
 
+if "--respect-robots" in sys.argv:
+	respect_robots = True
+else:
+	respect_robots = False
+
+if "--scope-hosts" in sys.argv:
+	try:
+		scope_hosts = sys.argv[sys.argv.index("--scope-hosts")+1].split(",")
+	except:
+		scope_hosts = []
+else:
+	scope_hosts = []
+
+if "--include-paths" in sys.argv:
+	try:
+		include_paths = sys.argv[sys.argv.index("--include-paths")+1].split(",")
+	except:
+		include_paths = []
+else:
+	include_paths = []
+
+if "--exclude-paths" in sys.argv:
+	try:
+		exclude_paths = sys.argv[sys.argv.index("--exclude-paths")+1].split(",")
+	except:
+		exclude_paths = []
+else:
+	exclude_paths = []
+
 if "--site-map" in sys.argv:
 	site_map = True
 else:
@@ -76,7 +134,7 @@ else:
 
 if "--min-delay" in sys.argv:
 	try:
-		min_delay = int(sys.argv[sys.argv.index("--min-delay")+1])
+		min_delay = float(sys.argv[sys.argv.index("--min-delay")+1])
 	except:
 		min_delay = 0
 else:
@@ -84,23 +142,84 @@ else:
 
 if "--max-delay" in sys.argv:
 	try:
-		max_delay = int(sys.argv[sys.argv.index("--max-delay")+1])
+		max_delay = float(sys.argv[sys.argv.index("--max-delay")+1])
 	except:
-		max_delay = int(min_delay * 3)
+		max_delay = min_delay * 3
 else:
-	max_delay = int(min_delay * 3)
+	max_delay = min_delay * 3
 
 if (min_delay < 0) or (max_delay < 0) or (max_delay < min_delay):
 	min_delay = max_delay = 0
 
+if "--max-rps" in sys.argv:
+	try:
+		max_rps = float(sys.argv[sys.argv.index("--max-rps")+1])
+	except:
+		max_rps = 0
+else:
+	max_rps = 0
+
+if "--max-in-flight-per-host" in sys.argv:
+	try:
+		max_in_flight_per_host = int(sys.argv[sys.argv.index("--max-in-flight-per-host")+1])
+	except:
+		max_in_flight_per_host = 0
+else:
+	max_in_flight_per_host = 0
+
+if "--adaptive" in sys.argv:
+	adaptive = True
+else:
+	adaptive = False
+
+if "--max-retries" in sys.argv:
+	try:
+		max_retries = int(sys.argv[sys.argv.index("--max-retries")+1])
+	except:
+		max_retries = 0
+elif adaptive:
+	max_retries = 2
+else:
+	max_retries = 0
+
+if max_retries < 0:
+	max_retries = 0
+
+if max_rps < 0:
+	max_rps = 0
+
+if max_in_flight_per_host < 0:
+	max_in_flight_per_host = 0
+
+
+if "--output-format" in sys.argv:
+	try:
+		output_format = sys.argv[sys.argv.index("--output-format")+1]
+	except:
+		output_format = "text"
+else:
+	output_format = "text"
+
+if output_format not in crawler_output.output_formats:
+	output_format = "text"
+
+output_extensions = {"text":".txt", "jsonl":".jsonl", "sqlite":".sqlite"}
 
 if "--output" in sys.argv:
 	try:
 		output_file = sys.argv[sys.argv.index("--output")+1]
 	except:
-		output_file = "web_crawler_output_" + str(now.year) + "-" + str(now.month) + "-" + str(now.day) + "_" + str(now.hour) + "_" + str(now.minute) + ".txt"
+		output_file = "web_crawler_output_" + str(now.year) + "-" + str(now.month) + "-" + str(now.day) + "_" + str(now.hour) + "_" + str(now.minute) + output_extensions[output_format]
+else:
+	output_file = "web_crawler_output_" + str(now.year) + "-" + str(now.month) + "-" + str(now.day) + "_" + str(now.hour) + "_" + str(now.minute) + output_extensions[output_format]
+
+if "--flush-interval" in sys.argv:
+	try:
+		flush_interval = float(sys.argv[sys.argv.index("--flush-interval")+1])
+	except:
+		flush_interval = 1
 else:
-	output_file = "web_crawler_output_" + str(now.year) + "-" + str(now.month) + "-" + str(now.day) + "_" + str(now.hour) + "_" + str(now.minute) + ".txt"
+	flush_interval = 1
 
 if "--max-time" in sys.argv:
 	try:
@@ -126,99 +245,455 @@ if "--timeout" in sys.argv:
 else:
 	timeout = 5
 
+if "--max-size" in sys.argv:
+	try:
+		max_size = int(sys.argv[sys.argv.index("--max-size")+1])
+	except:
+		max_size = 0
+else:
+	max_size = 0
+
+if max_size < 0:
+	max_size = 0
+
+if "--probe-binary" in sys.argv:
+	probe_binary = True
+else:
+	probe_binary = False
+
+if "--concurrency" in sys.argv:
+	try:
+		concurrency = int(sys.argv[sys.argv.index("--concurrency")+1])
+	except:
+		concurrency = 1
+else:
+	concurrency = 1
+
+if concurrency < 1:
+	concurrency = 1
+
+if "--pool-size" in sys.argv:
+	try:
+		pool_size = int(sys.argv[sys.argv.index("--pool-size")+1])
+	except:
+		pool_size = max(concurrency, 10)
+else:
+	pool_size = max(concurrency, 10)
+
+if pool_size < 1:
+	pool_size = max(concurrency, 10)
+
+if "--http2" in sys.argv:
+	http2 = True
+else:
+	http2 = False
+
+if http2 and not crawler_transport.isHttp2Available():
+	print("HTTP/2 needs httpx and h2 to be installed (pip install httpx[http2]). Continuing with HTTP/1.1.")
+	http2 = False
+
+if "--workers" in sys.argv:
+	try:
+		workers = int(sys.argv[sys.argv.index("--workers")+1])
+	except:
+		workers = 0
+else:
+	workers = 0
+
+if workers < 0:
+	workers = 0
+
+if "--priority" in sys.argv:
+	priority = True
+else:
+	priority = False
+
+if "--max-depth" in sys.argv:
+	try:
+		max_depth = int(sys.argv[sys.argv.index("--max-depth")+1])
+	except:
+		max_depth = -1
+else:
+	max_depth = -1
+
+if "--path-quota" in sys.argv:
+	try:
+		path_quota = int(sys.argv[sys.argv.index("--path-quota")+1])
+	except:
+		path_quota = 0
+else:
+	path_quota = 0
+
+if path_quota < 0:
+	path_quota = 0
+
+if "--sort-parameters" in sys.argv:
+	sort_parameters = True
+else:
+	sort_parameters = False
+
+if "--seed" in sys.argv:
+	try:
+		seed = int(sys.argv[sys.argv.index("--seed")+1])
+	except:
+		seed = None
+else:
+	seed = None
+
+if seed is not None:
+	crawler_generator.setSeed(seed)
+
+if "--skip-duplicates" in sys.argv:
+	skip_duplicates = True
+else:
+	skip_duplicates = False
+
+if "--state" in sys.argv:
+	try:
+		state_file = sys.argv[sys.argv.index("--state")+1]
+	except:
+		state_file = ""
+else:
+	state_file = ""
+
+if "--checkpoint-interval" in sys.argv:
+	try:
+		checkpoint_interval = float(sys.argv[sys.argv.index("--checkpoint-interval")+1])
+	except:
+		checkpoint_interval = 5
+else:
+	checkpoint_interval = 5
+
+if "--baseline" in sys.argv:
+	try:
+		baseline_files = sys.argv[sys.argv.index("--baseline")+1].split(",")
+	except:
+		print("You must specify the output of the crawl to compare against.")
+		sys.exit(1)
+else:
+	baseline_files = []
+
+if "--cache-dir" in sys.argv:
+	try:
+		cache_dir = sys.argv[sys.argv.index("--cache-dir")+1]
+	except:
+		cache_dir = ""
+else:
+	cache_dir = ""
+
+if "--cache-size" in sys.argv:
+	try:
+		cache_size = float(sys.argv[sys.argv.index("--cache-size")+1])
+	except:
+		cache_size = 100
+else:
+	cache_size = 100
+
+if cache_size <= 0:
+	cache_size = 100
+
+if "--stats-interval" in sys.argv:
+	try:
+		stats_interval = float(sys.argv[sys.argv.index("--stats-interval")+1])
+	except:
+		stats_interval = 0
+else:
+	stats_interval = 0
+
+if stats_interval < 0:
+	stats_interval = 0
+
+if "--metrics-file" in sys.argv:
+	try:
+		metrics_file = sys.argv[sys.argv.index("--metrics-file")+1]
+	except:
+		metrics_file = ""
+else:
+	metrics_file = ""
+
+if "--metrics-format" in sys.argv:
+	try:
+		metrics_format = sys.argv[sys.argv.index("--metrics-format")+1]
+	except:
+		metrics_format = "json"
+else:
+	metrics_format = "json"
+
+if metrics_format not in ["json", "prometheus"]:
+	metrics_format = "json"
+
+if "--profile" in sys.argv:
+	try:
+		profile_file = sys.argv[sys.argv.index("--profile")+1]
+	except:
+		profile_file = ""
+else:
+	profile_file = ""
+
+if profile_file and workers > 0:
+	print("--profile is ignored with --workers, since the pages are harvested in the worker processes, which are not profiled.")
+	profile_file = ""
+
 if (follow_hrefs == False) and (follow_iframes == False) and (submit_get_forms == False) and (submit_post_forms == False) and (robots == False) and (site_map == False):
 	print("Nothing to do. You must configure the crawler to either follow hrefs, iframes, submit get forms, or submit post forms, or call robots.txt (with the --href, --iframe, --get, --post, --robots or --site-map arguments, respectively)")
 	sys.exit(3)
 
+# The crawl state, which lets the crawl be resumed if it is interrupted
+if resume_file:
+	try:
+		state = crawler_state.CrawlState(resume_file, checkpoint_interval, resume=True)
+	except OSError:
+		print("Unable to read the state file " + resume_file)
+		sys.exit(5)
+
+	if len(start_urls) == 0:
+		start_urls = state.start_urls
+
+	if len(start_urls) == 0:
+		print("The state file does not record any start URLs. Enter them with the --urls argument.")
+		sys.exit(1)
+
+	if baseline_files:
+		print("--baseline is ignored when resuming a crawl, which carries on with the baseline it was started with.")
+
+	baseline_files = state.baseline_files
+
+elif state_file:
+	state = crawler_state.CrawlState(state_file, checkpoint_interval)
+	for url in start_urls:
+		state.recordStartUrl(url)
+	state.recordBaseline(baseline_files)
+
+else:
+	state = None
+
 # All the information regarding the host
 parsed_url = parse.urlparse(start_urls[0])
 
+# The start URLs, normalized the same way the URLs found on pages are, and the websites they are on
+seed_urls = [crawler_index.Url("GET", crawler_normalizer.normalizeUrl(url, url) or url) for url in start_urls]
+seed_origins = crawler_generator.stripRedundancies([url.origin for url in seed_urls])
+
+# The scope decides which of the links and forms found on a page are followed: the ones on the hosts of the start URLs, or on --scope-hosts,
+# within --include-paths and --exclude-paths (see crawler_scope)
+scope_hosts = [url.hostname for url in seed_urls if url.hostname] + scope_hosts
+scope_rules = (tuple(crawler_generator.stripRedundancies(scope_hosts)), tuple(include_paths), tuple(exclude_paths))
+
 # Keep a record of the time the crawler began, so that we know when we want to quit
 start_time = int(time.time())
 
 # A list of all URLs (which includes GET forms) and all POST forms, found so far
-discovered_urls = []
+if state is not None:
+	discovered_urls = state.discovered_urls
+else:
+	discovered_urls = crawler_index.DiscoveredUrls()
+
+# A previous crawl's output to compare against, which the crawl starts from
+if baseline_files:
+	try:
+		baseline = crawler_baseline.Baseline(baseline_files)
+	except (OSError, sqlite3.Error):
+		print("Unable to read the baseline " + ",".join(baseline_files))
+		sys.exit(5)
+else:
+	baseline = None
+
+# Every URL is written to the output as soon as it is discovered
+# when resuming a crawl, the output is started over, with everything the previous crawl had discovered
+# when comparing against a baseline, the output is only what has been added to it, and, at the end, what has been removed from it
+output_sink = crawler_output.getOutputSink(output_format, output_file, flush_interval, overwrite=bool(resume_file), diff=baseline is not None)
+
+if baseline is not None:
+	# the baseline's URLs don't count towards --max-results, which only counts what is new
+	# when resuming, the discovered URLs already start with them, and only the ones discovered after them are written again
+	if resume_file:
+		seeds = baseline.resume(discovered_urls, output_sink, state.confirmed_signatures)
+		if seeds is None:
+			print("The baseline " + ",".join(baseline_files) + " has changed since the crawl was started.")
+			sys.exit(5)
+	else:
+		seeds = baseline.seed(discovered_urls, output_sink)
+	max_results += len(seeds)
+
+	if state is not None:
+		state.trackBaseline()
+else:
+	for url in discovered_urls:
+		output_sink.recordDiscovered(url)
+
+	discovered_urls.listeners.append(output_sink)
+
+# The page index keeps the fingerprints of the pages that have been harvested, so duplicates of them don't have to be
+if skip_duplicates:
+	page_index = crawler_fingerprint.PageIndex(discovered_urls)
+else:
+	page_index = None
 
 # Let us now construct our crawler
-http_headers = {"User-Agent":user_agent, "Host":parsed_url.hostname}
-session = requests.session()
-session.headers.update(http_headers)
+# (host names are only looked up once every 5 minutes, rather than every time a connection is opened)
+crawler_transport.DnsCache().install()
+session = crawler_transport.getSession(user_agent, pool_size, http2)
 
-# Now we will crawl the first pages to (hopefully) yield more pages
-for url in start_urls:
+# Every request waits its turn with the scheduler, which keeps the crawler from hammering any one host
+if adaptive:
+	scheduler = crawler_scheduler.AdaptiveHostScheduler(min_delay, max_delay, max_rps, max_in_flight_per_host, max_retries, max(concurrency, 1))
+else:
+	scheduler = crawler_scheduler.HostScheduler(min_delay, max_delay, max_rps, max_in_flight_per_host, max_retries)
 
-	try:
-		http_response = session.get(url, timeout=timeout, proxies=proxy)
-		crawler_functions.manageSession(use_cookies=use_cookies, min_delay=min_delay, max_delay=max_delay, session=session)
-		discovered_urls += crawler_functions.harvestAllData(str(http_response.text), parsed_url.scheme, parsed_url.hostname, follow_hrefs, follow_iframes, submit_get_forms, submit_post_forms, discovered_urls)
-	except:
-		continue
+# robots.txt is only read once for each start URL's website, for the paths it lists (--robots), the sitemaps it lists (--site-map),
+# and the rules it sets (--respect-robots), which the robots policy keeps for every website the crawl gets to, along with its Crawl-delay
+# (which is kept to on top of --min-delay and --max-delay)
+if respect_robots:
+	robots_policy = crawler_robots.RobotsPolicy(session, user_agent, timeout, proxy, scheduler)
+else:
+	robots_policy = None
 
-# now we will crawl sitemap.xml, if site_map == True
-if site_map == True:
-	discovered_urls += crawler_functions.extractSiteMap(session, parsed_url.scheme, parsed_url.hostname, discovered_urls, timeout, proxy)
+robots_rules = {}
 
-# now we will do robots.txt, if robots == True
-if robots == True:
-	discovered_urls += crawler_functions.extractRobotsUrls(parsed_url.scheme, parsed_url.hostname, session, timeout, discovered_urls, proxy)
+for origin in seed_origins:
 
-# if no result were found, exit
-if len(discovered_urls) == 0:
-	print("Did not find any new URLs. Done.")
-	sys.exit(4)
+	if respect_robots:
+		robots_rules[origin] = robots_policy.fetchRules(origin)
+		robots_policy.addRules(origin, robots_rules[origin])
+		if robots_rules[origin].disallow_all:
+			print("Unable to read " + origin + "/robots.txt, so every URL on it counts as disallowed by it.")
 
-# And now we can finally begin crawling everywhere!
+	elif not resume_file and (robots or site_map):
+		robots_rules[origin] = crawler_robots.fetchRobots(session, origin, user_agent, timeout, proxy)
 
-for url in discovered_urls:
+# The frontier decides which of the discovered URLs to visit next
+if priority:
+	frontier = crawler_frontier.PriorityFrontier(discovered_urls, max_depth, path_quota, robots_policy)
+else:
+	frontier = crawler_frontier.Frontier(discovered_urls, max_depth, path_quota, robots_policy)
 
-	if url["type"] == "GET":
+# Responses are streamed, so that anything that isn't HTML, and anything over --max-size, isn't downloaded
+download_limits = crawler_download.DownloadLimits(max_size, probe_binary)
 
-		try:
-			http_response = session.get(url["body"], timeout=timeout, proxies=proxy)
-		except:
-			# this will probably only happen due to an HTTP timeout
-			continue
+# The metrics say how the crawl is going while it is running, and which stage of it is holding it up
+crawler_metrics.metrics.addGauge("discovered", lambda: len(discovered_urls))
+crawler_metrics.metrics.addGauge("visited", lambda: discovered_urls.visited + len(discovered_urls.visited_out_of_order))
+crawler_metrics.metrics.addGauge("queued", lambda: len(frontier))
+crawler_metrics.metrics.addGauge("bytes_downloaded", lambda: download_limits.bytes_downloaded)
+
+if page_index is not None:
+	crawler_metrics.metrics.addGauge("duplicates", lambda: page_index.duplicates)
 
-	elif url["type"] == "POST":
-		try:
+if stats_interval > 0 or metrics_file:
+	metrics_reporter = crawler_metrics.MetricsReporter(stats_interval or 5, stats_interval > 0, metrics_file, metrics_format)
+	discovered_urls.listeners.append(metrics_reporter)
+else:
+	metrics_reporter = None
+
+if profile_file:
+	crawler_metrics.profiler = cProfile.Profile()
 
-			parsed_post_url = type["body"].split("?")
-			if len(parsed_post_url) != 2:
-				continue
+harvest_options = {"scheme":parsed_url.scheme, "host":parsed_url.hostname, "href":follow_hrefs, "iframe":follow_iframes, "submit_get_forms":submit_get_forms, "submit_post_forms":submit_post_forms, "sort_parameters":sort_parameters, "scope":scope_rules}
 
-			direct_url = parsed_post_url[0]
-			post_parameters = parsed_post_url[1]
-			post_parameters = crawler_functions.getDictionaryFromQueryString(post_parameters)
+# The HTTP cache remembers what was found on each page, so that pages which haven't changed since the last crawl don't have to be harvested again
+# (what is found on a page depends on the harvest options, so pages are only taken from the cache if they were cached with the same ones)
+if cache_dir:
+	http_cache = crawler_cache.HttpCache(cache_dir, int(cache_size * 1024 * 1024), json.dumps(harvest_options, sort_keys=True))
+else:
+	http_cache = None
 
-			http_response = session.post(direct_url, data=post_parameters, proxies=proxy)
-		except:
-			# again, this is presumably because of an HTTP timeout
+crawl_options = {"timeout":timeout, "proxy":proxy, "use_cookies":use_cookies, "scheduler":scheduler, "start_time":start_time, "max_time":max_time, "max_results":max_results, "frontier":frontier, "page_index":page_index, "download_limits":download_limits, "http_cache":http_cache}
+
+# Now we will crawl the first pages to (hopefully) yield more pages
+# (unless we are resuming a crawl, in which case that has already been done)
+if not resume_file:
+
+	for url, seed_url in zip(start_urls, seed_urls):
+		if robots_policy is not None and not robots_policy.isAllowed(seed_url):
+			print(url + " is disallowed by robots.txt, so it was not visited.")
 			continue
+		crawler_engine.visitUrl(session, crawler_index.Url("GET", url), discovered_urls, harvest_options, timeout, proxy, use_cookies, scheduler, page_index, download_limits, http_cache)
+
+	# now we will crawl sitemap.xml (and any other sitemaps robots.txt lists) of each start URL's website, if site_map == True
+	# its URLs are added as they are read, and it is only read for as long as there is room for more URLs under --max-results
+	if site_map == True:
+		sitemap_urls = []
+		for origin in seed_origins:
+			sitemap_urls += [origin + "/sitemap.xml"] + robots_rules[origin].sitemaps
+		sitemap_reader = crawler_sitemap.addSitemapUrls(session, discovered_urls, sitemap_urls, parsed_url.hostname, timeout, proxy, scheduler, concurrency, max_results, scope_rules)
+		print("Read " + str(sitemap_reader.urls) + " URLs from " + str(sitemap_reader.sitemaps) + " sitemaps" + (" (" + str(sitemap_reader.errors) + " sitemaps could not be read)." if sitemap_reader.errors > 0 else "."))
+
+	# now we will do robots.txt of each start URL's website, if robots == True
+	if robots == True:
+		for origin in seed_origins:
+			crawler_engine.addNewUrls(discovered_urls, crawler_robots.getRobotsUrls(robots_rules[origin], origin, discovered_urls, scope_rules))
+
+	# if no result were found, exit
+	if len(discovered_urls) == 0:
+		print("Did not find any new URLs. Done.")
+		output_sink.close()
+		if http_cache is not None:
+			http_cache.close()
+		if metrics_reporter is not None:
+			metrics_reporter.report()
+		sys.exit(4)
+
+# And now we can finally begin crawling everywhere!
 
+try:
+	if concurrency > 1 or workers > 0:
+		stop_reason = asyncio.run(crawler_engine.crawlConcurrently(session, discovered_urls, harvest_options, concurrency, workers=workers, **crawl_options))
 	else:
-		# this should never happen, but I will put this else clause in here, just in case
-		continue
+		stop_reason = crawler_engine.crawlSerially(session, discovered_urls, harvest_options, **crawl_options)
+except KeyboardInterrupt:
+	stop_reason = "interrupted"
+
+if stop_reason == "max-time":
+	print("Maximum run-time reached. Exiting.")
+elif stop_reason == "max-results":
+	print("Maximum discovered URLs reached. Exiting.")
+elif stop_reason == "interrupted":
+	print("Interrupted. Exiting.")
+else:
+	print("Finished crawling. Exiting.")
 
-	crawler_functions.manageSession(use_cookies=use_cookies, min_delay=min_delay, max_delay=max_delay, session=session)
+if scheduler.errors > 0:
+	print(str(scheduler.errors) + " of " + str(scheduler.requests) + " requests failed or were turned away by the server, and " + str(scheduler.retries) + " were retried.")
 
-	try:
-		discovered_urls += crawler_functions.harvestAllData(str(http_response.text), parsed_url.scheme, parsed_url.hostname, follow_hrefs, follow_iframes, submit_get_forms, submit_post_forms, discovered_urls)
-	except ValueError:
-		# just in case the HTML document is weird and lxml isn't able to parse it
-		continue
+if frontier.skipped > 0:
+	print(str(frontier.skipped) + " of the discovered URLs were not visited, because of the --max-depth or --path-quota limits.")
+
+if robots_policy is not None and robots_policy.disallowed > 0:
+	print(str(robots_policy.disallowed) + " of the discovered URLs were not visited, because robots.txt disallows them.")
+
+if download_limits.skipped + download_limits.probed + download_limits.truncated > 0:
+	print(str(download_limits.skipped + download_limits.probed) + " responses were not downloaded because they weren't HTML, and " + str(download_limits.truncated) + " were cut off at --max-size, which saved downloading at least " + str(round(download_limits.bytes_saved / 1024)) + " KB (" + str(round(download_limits.bytes_downloaded / 1024)) + " KB were downloaded).")
+
+if page_index is not None and page_index.duplicates > 0:
+	print(str(page_index.duplicates) + " of the pages visited were duplicates of another page, and were not harvested. Harvesting them would have taken about " + str(round(page_index.getHarvestTimeSkipped(), 2)) + " seconds, and fingerprinting every page took " + str(round(page_index.fingerprint_time, 2)) + " seconds.")
+
+if page_index is not None and len(discovered_urls.ignored_signatures) > 0:
+	print(str(len(discovered_urls.ignored_signatures)) + " URLs were not visited, because they only differed from another URL by parameters that don't change the page.")
+
+if http_cache is not None:
+	print(str(http_cache.not_modified + http_cache.unchanged) + " pages hadn't changed since they were cached (" + str(http_cache.not_modified) + " of them were answered with 304 Not Modified), and were not harvested again. " + str(http_cache.stored) + " pages were cached, and " + str(http_cache.evicted) + " were evicted from the cache.")
+	http_cache.close()
+
+if baseline is not None:
+	removed_urls = baseline.getRemovedUrls(discovered_urls, seeds)
+
+	# a seed that wasn't found again might just not have been reached, unless the crawl ran to the end
+	if stop_reason == "finished":
+		output_sink.writeRemoved(removed_urls)
+		print(str(baseline.added) + " URLs were added since the baseline, and " + str(len(removed_urls)) + " were removed.")
+	else:
+		print(str(baseline.added) + " URLs were added since the baseline. Removed URLs are only written when the crawl runs to the end, and " + str(len(removed_urls)) + " of the baseline's URLs had not been found again yet.")
+
+if state is not None:
+	state.close()
 
-	# and now to determine whether or not to exit the script
+output_sink.close()
 
-	if int(time.time()) - start_time > max_time:
-		print("Maximum run-time reached. Exiting.")
-		crawler_functions.outputDiscoveredUrls(output_file, discovered_urls)
-		sys.exit(0)
+if metrics_reporter is not None:
+	metrics_reporter.report()
 
-	if len(discovered_urls) >= max_results:
-		print("Maximum discovered URLs reached. Exiting.")
-		crawler_functions.outputDiscoveredUrls(output_file, discovered_urls)
-		sys.exit(0)
+if profile_file:
+	crawler_metrics.profiler.dump_stats(profile_file)
+	print("The profile of harvesting the pages was written to " + profile_file + ", which can be read with e.g python -m pstats " + profile_file)
 
-print("Finished crawling. Exiting.")
-crawler_functions.outputDiscoveredUrls(output_file, discovered_urls)
 sys.exit(0)
@@ -0,0 +1,52 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler_index
+import crawler_frontier
+
+class FrontierTest(unittest.TestCase):
+
+	# returns the bodies of the URLs the frontier hands out, in order, until there are none left
+	def popAll(self, frontier, discovered_urls):
+
+		bodies = []
+
+		while True:
+			position = frontier.pop()
+			if position is None:
+				return bodies
+			bodies.append(discovered_urls[position].body)
+
+	def testPathQuotaIsKeptForEachWebsite(self):
+
+		discovered_urls = crawler_index.DiscoveredUrls()
+		frontier = crawler_frontier.Frontier(discovered_urls, path_quota=2)
+
+		for number in range(0, 3):
+			discovered_urls.append(crawler_index.Url("GET", "https://a.example.com/blog/post" + str(number) + "?id" + str(number) + "=1"))
+			discovered_urls.append(crawler_index.Url("GET", "https://b.example.com/blog/post" + str(number) + "?id" + str(number) + "=1"))
+
+		bodies = self.popAll(frontier, discovered_urls)
+
+		self.assertEqual(len([body for body in bodies if body.startswith("https://a.example.com/")]), 2)
+		self.assertEqual(len([body for body in bodies if body.startswith("https://b.example.com/")]), 2)
+		self.assertEqual(frontier.skipped, 2)
+
+	def testCrowdingIsKeptForEachWebsite(self):
+
+		discovered_urls = crawler_index.DiscoveredUrls()
+		frontier = crawler_frontier.PriorityFrontier(discovered_urls)
+
+		for number in range(0, 5):
+			discovered_urls.append(crawler_index.Url("GET", "https://a.example.com/blog/post" + str(number)))
+
+		# the first URL under /blog on another website isn't held back by how crowded /blog is on the first one
+		discovered_urls.append(crawler_index.Url("GET", "https://b.example.com/blog/post0"))
+
+		self.assertEqual(self.popAll(frontier, discovered_urls)[:2], ["https://a.example.com/blog/post0", "https://b.example.com/blog/post0"])
+
+if __name__ == "__main__":
+	unittest.main()
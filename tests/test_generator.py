@@ -0,0 +1,46 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler_generator
+
+class RandomPoolTest(unittest.TestCase):
+
+	# returns a few values generated for the page at page_url
+	def generatePage(self, random_pool, page_url):
+
+		random_pool.seedPage(page_url)
+		return [random_pool.getString(crawler_generator.letters, 12), random_pool.getString(crawler_generator.numbers, 5), random_pool.generator.random()]
+
+	def testPagesDontDependOnTheOrderTheyAreGeneratedIn(self):
+
+		random_pool = crawler_generator.RandomPool(seed=42)
+		first_page = self.generatePage(random_pool, "https://www.example.com/a")
+		second_page = self.generatePage(random_pool, "https://www.example.com/b")
+
+		# e.g in another worker process, or after the pages were harvested the other way round
+		other_pool = crawler_generator.RandomPool(seed=42)
+		self.assertEqual(self.generatePage(other_pool, "https://www.example.com/b"), second_page)
+		self.assertEqual(self.generatePage(other_pool, "https://www.example.com/a"), first_page)
+
+		self.assertNotEqual(first_page, second_page)
+		self.assertNotEqual(self.generatePage(crawler_generator.RandomPool(seed=43), "https://www.example.com/a"), first_page)
+
+	def testReseedKeepsTheSeed(self):
+
+		random_pool = crawler_generator.RandomPool(seed=42)
+		first_page = self.generatePage(random_pool, "https://www.example.com/a")
+
+		# what a forked worker process does
+		random_pool.reseed()
+		self.assertEqual(self.generatePage(random_pool, "https://www.example.com/a"), first_page)
+
+	def testWithoutSeed(self):
+
+		random_pool = crawler_generator.RandomPool()
+		self.assertNotEqual(self.generatePage(random_pool, "https://www.example.com/a"), self.generatePage(random_pool, "https://www.example.com/a"))
+
+if __name__ == "__main__":
+	unittest.main()
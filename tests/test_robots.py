@@ -0,0 +1,69 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler_robots
+
+robots_text = """User-agent: *
+Disallow: /private
+
+User-agent: jick
+Disallow: /jick-only
+Crawl-delay: 2
+
+User-agent: bot
+User-agent: mozilla
+Disallow: /
+"""
+
+class RobotsRulesTest(unittest.TestCase):
+
+	def testProductToken(self):
+
+		self.assertEqual(crawler_robots.getProductToken("jick/1.0 (+https://www.example.com/jick)"), "jick")
+		self.assertEqual(crawler_robots.getProductToken("Jick"), "jick")
+		self.assertEqual(crawler_robots.getProductToken("Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0"), "mozilla")
+		self.assertEqual(crawler_robots.getProductToken(""), "")
+
+	def testGroupOfTheProductToken(self):
+
+		rules = crawler_robots.RobotsRules(robots_text, "Jick/1.0 (compatible; bot)")
+
+		self.assertFalse(rules.isAllowed("/jick-only/page"))
+		self.assertTrue(rules.isAllowed("/private"))
+		self.assertTrue(rules.isAllowed("/"))
+		self.assertEqual(rules.crawl_delay, 2)
+
+	def testShortGroupNameDoesNotMatch(self):
+
+		# "bot" is part of the User-Agent, and "jick" is part of "jickbot", but neither is its product token
+		for user_agent in ["jickbot/2.0", "crawlerbot/1.0 (like jick)"]:
+
+			rules = crawler_robots.RobotsRules(robots_text, user_agent)
+
+			self.assertFalse(rules.isAllowed("/private"))
+			self.assertTrue(rules.isAllowed("/jick-only/page"))
+			self.assertTrue(rules.isAllowed("/"))
+			self.assertIsNone(rules.crawl_delay)
+
+	def testGroupWithSeveralUserAgents(self):
+
+		rules = crawler_robots.RobotsRules(robots_text, "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0")
+		self.assertFalse(rules.isAllowed("/anything"))
+
+		rules = crawler_robots.RobotsRules(robots_text, "Bot")
+		self.assertFalse(rules.isAllowed("/anything"))
+
+	def testLongestMatchWins(self):
+
+		rules = crawler_robots.RobotsRules("User-agent: *\nDisallow: /shop\nAllow: /shop/public\nDisallow: /*.pdf$\n", "jick")
+
+		self.assertFalse(rules.isAllowed("/shop/cart"))
+		self.assertTrue(rules.isAllowed("/shop/public/page"))
+		self.assertFalse(rules.isAllowed("/files/report.pdf"))
+		self.assertTrue(rules.isAllowed("/files/report.pdf?download=1"))
+
+if __name__ == "__main__":
+	unittest.main()
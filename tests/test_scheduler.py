@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+import asyncio
+import unittest
+
+from urllib import parse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler_index
+import crawler_engine
+import crawler_scheduler
+
+# a response, with just enough of requests.Response for fetchAsync
+class FakeResponse:
+
+	def __init__(self, url):
+
+		self.url = url
+		self.status_code = 200
+		self.headers = {"Content-Type":"text/html; charset=utf-8"}
+
+# a session which takes latency seconds to answer every request, and records when each request to each host was sent
+class FakeSession:
+
+	def __init__(self, latency=0.01):
+
+		self.latency = latency
+		self.cookies = {}
+		self.sent = {} # host: [the time each request to it was sent, ...]
+
+	def get(self, url, timeout=5, proxies={}, headers=None):
+
+		self.sent.setdefault(parse.urlsplit(url).netloc, []).append(time.time())
+		time.sleep(self.latency)
+		return FakeResponse(url)
+
+# returns the gaps between the times each request to a host was sent
+def getGaps(times):
+
+	times = sorted(times)
+	return [later - earlier for earlier, later in zip(times, times[1:])]
+
+class HostSchedulerTest(unittest.TestCase):
+
+	# fetches the URLs with fetchAsync, with up to 'concurrency' requests in flight, the way crawlConcurrently does
+	def fetchConcurrently(self, session, urls, scheduler, concurrency=4):
+
+		async def fetchAll():
+
+			loop = asyncio.get_running_loop()
+			executor = ThreadPoolExecutor(max_workers=concurrency)
+			in_flight = asyncio.Semaphore(concurrency)
+
+			try:
+				await asyncio.gather(*[crawler_engine.fetchAsync(loop, executor, in_flight, session, url, scheduler=scheduler) for url in urls])
+			finally:
+				executor.shutdown()
+
+		asyncio.run(fetchAll())
+
+	def testDelayBetweenRequestsUnderConcurrency(self):
+
+		session = FakeSession()
+		scheduler = crawler_scheduler.HostScheduler(min_delay=0.1, max_delay=0.12)
+		urls = [crawler_index.Url("GET", "http://127.0.0.1:8000/page" + str(number)) for number in range(0, 8)]
+
+		self.fetchConcurrently(session, urls, scheduler)
+
+		gaps = getGaps(session.sent["127.0.0.1:8000"])
+		self.assertEqual(len(gaps), 7)
+		self.assertGreaterEqual(min(gaps), 0.095)
+
+	def testDelayIsKeptForEachHostSeparately(self):
+
+		session = FakeSession()
+		scheduler = crawler_scheduler.HostScheduler(min_delay=0.1, max_delay=0.12)
+		hosts = ["127.0.0.1:8000", "127.0.0.1:8001", "127.0.0.1:8002"]
+		urls = [crawler_index.Url("GET", "http://" + host + "/page" + str(number)) for number in range(0, 5) for host in hosts]
+
+		start = time.time()
+		self.fetchConcurrently(session, urls, scheduler, concurrency=6)
+		elapsed = time.time() - start
+
+		for host in hosts:
+			self.assertGreaterEqual(min(getGaps(session.sent[host])), 0.095)
+
+		# each host's requests are spaced out, but the hosts don't wait on each other
+		self.assertLess(elapsed, 0.12 * 5 * 2)
+
+	def testDelayIsReservedWhenTheRequestStarts(self):
+
+		scheduler = crawler_scheduler.HostScheduler(min_delay=1, max_delay=1.5)
+
+		self.assertEqual(scheduler.tryAcquire("www.example.com"), 0)
+		self.assertGreater(scheduler.tryAcquire("www.example.com"), 0.9)
+		self.assertEqual(scheduler.tryAcquire("www.example.org"), 0)
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,120 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler_index
+import crawler_state
+
+class CrawlStateTest(unittest.TestCase):
+
+	def setUp(self):
+
+		self.directory = tempfile.mkdtemp()
+		self.filename = os.path.join(self.directory, "state.txt")
+
+	def tearDown(self):
+
+		shutil.rmtree(self.directory)
+
+	# starts a crawl state, with a start URL and the given discovered URLs, of which the first 'visited' have been visited
+	def writeState(self, bodies, visited=0):
+
+		state = crawler_state.CrawlState(self.filename, checkpoint_interval=0)
+		state.recordStartUrl("http://www.example.com/")
+
+		for body in bodies:
+			state.discovered_urls.append(crawler_index.Url("GET", body, 1, "href"))
+
+		for position in range(0, visited):
+			state.discovered_urls.recordVisited(position)
+
+		state.close()
+
+	def getBodies(self, state):
+
+		return [url.body for url in state.discovered_urls]
+
+	def testResume(self):
+
+		self.writeState(["http://www.example.com/a?x=1", "http://www.example.com/b?y=1"], visited=1)
+
+		state = crawler_state.CrawlState(self.filename, resume=True)
+		state.close()
+
+		self.assertEqual(state.start_urls, ["http://www.example.com/"])
+		self.assertEqual(self.getBodies(state), ["http://www.example.com/a?x=1", "http://www.example.com/b?y=1"])
+		self.assertEqual(state.discovered_urls[0].depth, 1)
+		self.assertEqual(state.discovered_urls[0].source, "href")
+		self.assertTrue(state.discovered_urls.isVisited(0))
+		self.assertFalse(state.discovered_urls.isVisited(1))
+
+	def testResumeAfterATornLine(self):
+
+		self.writeState(["http://www.example.com/a?x=1"])
+
+		# the crawler was killed in the middle of writing a line
+		with open(self.filename, "a") as handler:
+			handler.write("D GET 1 href http://www.example.com/tor")
+
+		state = crawler_state.CrawlState(self.filename, checkpoint_interval=0, resume=True)
+		self.assertEqual(self.getBodies(state), ["http://www.example.com/a?x=1"])
+
+		state.discovered_urls.append(crawler_index.Url("GET", "http://www.example.com/c?z=1", 2, "get"))
+		state.close()
+
+		# what the resumed crawl wrote is read back, and so is everything after it the next time
+		state = crawler_state.CrawlState(self.filename, checkpoint_interval=0, resume=True)
+		state.discovered_urls.append(crawler_index.Url("GET", "http://www.example.com/d?w=1", 2, "get"))
+		state.close()
+
+		state = crawler_state.CrawlState(self.filename, resume=True)
+		state.close()
+
+		self.assertEqual(self.getBodies(state), ["http://www.example.com/a?x=1", "http://www.example.com/c?z=1", "http://www.example.com/d?w=1"])
+
+		with open(self.filename) as handler:
+			self.assertNotIn("tor", handler.read())
+
+	def testResumeKeepsWhatWasSeen(self):
+
+		state = crawler_state.CrawlState(self.filename, checkpoint_interval=0)
+		state.recordStartUrl("http://www.example.com/")
+
+		# e.g the key of a form, whose submissions don't have all of its parameters
+		state.discovered_urls.append(crawler_index.Url("GET", "http://www.example.com/search?q=1"))
+		state.discovered_urls.recordSeen(crawler_index.Url("GET", "http://www.example.com/search?q=&sort="))
+		state.close()
+
+		state = crawler_state.CrawlState(self.filename, resume=True)
+		state.close()
+
+		self.assertEqual(self.getBodies(state), ["http://www.example.com/search?q=1"])
+		self.assertTrue(state.discovered_urls.isOld(crawler_index.Url("GET", "http://www.example.com/search?q=2&sort=3")))
+		self.assertFalse(state.discovered_urls.isOld(crawler_index.Url("GET", "http://www.example.com/search?sort=3")))
+
+	def testTruncateTornLine(self):
+
+		with open(self.filename, "w") as handler:
+			handler.write("U http://www.example.com/\n" + "D GET 0 - http://www.example.com/" + "x" * 200000)
+
+		crawler_state.truncateTornLine(self.filename)
+
+		with open(self.filename) as handler:
+			self.assertEqual(handler.read(), "U http://www.example.com/\n")
+
+		# a file whose last line is whole is left alone, and so is an empty one
+		crawler_state.truncateTornLine(self.filename)
+
+		with open(self.filename) as handler:
+			self.assertEqual(handler.read(), "U http://www.example.com/\n")
+
+		open(self.filename, "w").close()
+		crawler_state.truncateTornLine(self.filename)
+		self.assertEqual(os.path.getsize(self.filename), 0)
+
+if __name__ == "__main__":
+	unittest.main()